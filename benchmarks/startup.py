@@ -0,0 +1,307 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup benchmarks
+
+Measures the time and the memory taken by importing pywayland and the
+generated protocols, each in a fresh interpreter, and the latency from
+connecting a client to receiving the globals of the registry.  The client is
+connected over a socketpair to a server running in the same process, so no
+compositor is needed.
+
+The results depend on the machine, so they are compared against a baseline
+measured in the same run, and the script exits with an error if any of them
+regressed by more than the tolerance.  The baseline is a git ref, which is
+checked out into a temporary worktree, where the cffi module is built and the
+protocols are generated, or a directory with a tree that has already been
+built.  The runs of the two trees are interleaved, so both are measured under
+the same load.
+
+The tree of the script is measured, the cffi module must be built and the
+protocols generated as for running the tests, it does not need to be
+installed::
+
+    python benchmarks/startup.py --baseline main
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(this_dir)
+
+# Run in a fresh interpreter, prints the time taken by the import in
+# milliseconds and the growth of the resident memory in KiB
+IMPORT_SCRIPT = """
+import time
+
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * {page_size} // 1024
+
+rss_start = rss()
+start = time.perf_counter()
+{code}
+end = time.perf_counter()
+print((end - start) * 1000, rss() - rss_start)
+"""
+
+ALL_PROTOCOLS = """
+import importlib
+import pkgutil
+
+import pywayland.protocol
+
+for module in pkgutil.iter_modules(pywayland.protocol.__path__):
+    if not module.name.startswith("_"):
+        importlib.import_module(f"pywayland.protocol.{module.name}")
+"""
+
+ALL_INTERFACES = (
+    ALL_PROTOCOLS
+    + """
+from pywayland.protocol_core import Interface
+
+def build(cls):
+    for subclass in cls.__subclasses__():
+        subclass._ptr
+        build(subclass)
+
+build(Interface)
+"""
+)
+
+IMPORTS = {
+    "import_client": "import pywayland.client",
+    "import_server": "import pywayland.server",
+    "import_wayland": "import pywayland.protocol.wayland",
+    "import_all_protocols": ALL_PROTOCOLS,
+    "import_all_interfaces": ALL_INTERFACES,
+}
+
+
+def _run(root: str, args: list[str]) -> str:
+    """Run the interpreter with pywayland imported from the tree at the root"""
+    env = dict(os.environ, PYTHONPATH=root)
+    return subprocess.check_output(
+        [sys.executable, *args], cwd=root, env=env, text=True
+    )
+
+
+def bench_import(code: str, roots: list[str], repeat: int) -> list[dict[str, float]]:
+    """Time the import in a fresh interpreter, taking the best of the runs
+
+    The runs of the trees are interleaved, the results are in the order of
+    the roots of the trees.
+    """
+    script = IMPORT_SCRIPT.format(code=code, page_size=os.sysconf("SC_PAGE_SIZE"))
+
+    times: list[list[float]] = [[] for _ in roots]
+    rss: list[list[int]] = [[] for _ in roots]
+    for _ in range(repeat):
+        for i, root in enumerate(roots):
+            time_ms, rss_kib = _run(root, ["-c", script]).split()
+            times[i].append(float(time_ms))
+            rss[i].append(int(rss_kib))
+
+    return [
+        {"time_ms": min(root_times), "rss_kib": min(root_rss)}
+        for root_times, root_rss in zip(times, rss)
+    ]
+
+
+def bench_connect_trees(
+    roots: list[str], repeat: int, rounds: int = 3
+) -> list[dict[str, float]]:
+    """Time connecting to the registry with each tree, see :func:`bench_connect`
+
+    Each round runs the benchmark in a fresh interpreter for each tree, taking
+    the median of the rounds.
+    """
+    script = os.path.abspath(__file__)
+    times: list[list[float]] = [[] for _ in roots]
+    for _ in range(rounds):
+        for i, root in enumerate(roots):
+            output = _run(root, [script, "--connect", f"--repeat={repeat}"])
+            times[i].append(json.loads(output)["time_us"])
+
+    return [{"time_us": statistics.median(root_times)} for root_times in times]
+
+
+def bench_connect(repeat: int) -> dict[str, float]:
+    """Time connecting a client until the globals of the registry are received"""
+    from pywayland.client import Display as ClientDisplay
+    from pywayland.protocol.wayland import WlCompositor, WlOutput, WlSeat, WlShm
+    from pywayland.server import Client
+    from pywayland.server import Display as ServerDisplay
+
+    server = ServerDisplay()
+    for interface in (WlCompositor, WlOutput, WlSeat, WlShm):
+        interface.global_class(server)
+    event_loop = server.get_event_loop()
+
+    times = []
+    connected = threading.Event()
+    destroyed = threading.Event()
+
+    def run_client(fd: int) -> None:
+        globals_ = []
+
+        start = time.perf_counter()
+        display = ClientDisplay(fd)
+        display.connect()
+        registry = display.get_registry()
+        registry.dispatcher["global"] = lambda registry, *args: globals_.append(args)
+        display.roundtrip()
+        end = time.perf_counter()
+
+        assert len(globals_) == 4
+        times.append((end - start) * 1e6)
+
+        # disconnect once the server is done with the client, otherwise the
+        # server destroys the client when it sees the hang up
+        connected.set()
+        destroyed.wait()
+        display.disconnect()
+
+    for _ in range(repeat):
+        server_socket, client_socket = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC
+        )
+        client = Client(server, server_socket.detach())
+        connected.clear()
+        destroyed.clear()
+
+        # the client blocks on the roundtrip, so it is run in a thread while
+        # the server is dispatched here
+        client_thread = threading.Thread(
+            target=run_client, args=(client_socket.detach(),)
+        )
+        client_thread.start()
+        while not connected.is_set():
+            event_loop.dispatch(1)
+            server.flush_clients()
+        client.destroy()
+        destroyed.set()
+        client_thread.join()
+
+    server.destroy()
+
+    return {"time_us": statistics.median(times)}
+
+
+@contextlib.contextmanager
+def baseline_tree(ref: str, scanner_args: list[str]) -> Iterator[str]:
+    """Check out the ref into a temporary worktree and build it"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tree = os.path.join(tmpdir, "baseline")
+        subprocess.check_call(
+            ["git", "worktree", "add", "--quiet", "--detach", tree, ref], cwd=root_dir
+        )
+        try:
+            subprocess.check_call(
+                [sys.executable, os.path.join("pywayland", "ffi_build.py")], cwd=tree
+            )
+            _run(tree, ["-m", "pywayland.scanner", *scanner_args])
+            yield tree
+        finally:
+            subprocess.check_call(
+                ["git", "worktree", "remove", "--force", tree], cwd=root_dir
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--baseline",
+        metavar="REF",
+        default="main",
+        help="Git ref of the baseline, which is built in a temporary worktree",
+    )
+    parser.add_argument(
+        "--baseline-dir",
+        metavar="DIR",
+        help="Directory of an already built tree to use as the baseline, instead of a git ref",
+    )
+    parser.add_argument(
+        "--scanner-args",
+        default="--with-protocols",
+        help="Arguments to the scanner when generating the protocols of the baseline ref, "
+        "these should match the protocols generated in this tree",
+    )
+    parser.add_argument(
+        "--repeat",
+        default=10,
+        type=int,
+        help="Number of times each benchmark is run",
+    )
+    parser.add_argument(
+        "--tolerance",
+        default=0.25,
+        type=float,
+        help="Allowed regression relative to the baseline",
+    )
+    parser.add_argument("--connect", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.connect:
+        # run by bench_connect_trees with the tree to measure on the path
+        print(json.dumps(bench_connect(args.repeat)))
+        return
+
+    baseline: contextlib.AbstractContextManager[str]
+    if args.baseline_dir is not None:
+        baseline = contextlib.nullcontext(os.path.abspath(args.baseline_dir))
+    else:
+        baseline = baseline_tree(args.baseline, shlex.split(args.scanner_args))
+
+    with baseline as baseline_dir:
+        roots = [baseline_dir, root_dir]
+        results = {
+            name: bench_import(code, roots, args.repeat)
+            for name, code in IMPORTS.items()
+        }
+        results["connect_registry"] = bench_connect_trees(roots, args.repeat)
+
+    regressions = []
+    for name, (base_values, values) in results.items():
+        for key, value in values.items():
+            base = base_values[key]
+            change = (value - base) / base if base else 0.0
+            print(f"{name:24}{key:8}{base:10.1f}{value:10.1f}{change:+8.1%}")
+            # allow for noise in results that are close to zero
+            if value > base * (1 + args.tolerance) and value - base > 1:
+                regressions.append(f"{name} {key}: {value:.1f} > {base:.1f}")
+
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
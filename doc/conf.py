@@ -58,11 +58,13 @@ protocol_rst = """\
 # There is probably a better way to do this in Sphinx, templating or something
 # ... but this works
 def protocol_doc(input_dir, output_dir):
-    modules = os.listdir(input_dir)
+    # the package also has private modules and the data files of the scanner
     modules = [
-        module.rstrip(".py")
-        for module in modules
-        if os.path.isfile(os.path.join(input_dir, module)) and module != "__init__.py"
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(input_dir)
+        if os.path.isfile(os.path.join(input_dir, filename))
+        and filename.endswith(".py")
+        and not filename.startswith("_")
     ]
 
     existing_files = [
@@ -1,6 +1,8 @@
 from collections.abc import Callable
 from typing import Any, Self, TypeVar, overload
 
+from typing_extensions import Buffer
+
 class CData:
     def __getitem__(self, idx: int) -> Self: ...
     def __setitem__(self, idx: int, elem: Self) -> None: ...
@@ -15,7 +17,8 @@ class GlobalBindFuncT: ...
 class NotifyFuncT: ...
 
 # built-in cdata types
-class CharCData(CData): ...
+class CharCData(CData):
+    def __len__(self) -> int: ...
 
 # wayland cdata types
 class WlArgumentCData(CData):
@@ -82,6 +85,8 @@ _CDataO = TypeVar("_CDataO", bound=CData)
 
 # Any type of CData
 NULL: Any
+# errno of the last C call
+errno: int
 
 @overload
 def new(cdecl: str) -> _CDataT: ...  # type: ignore [type-var, misc]
@@ -91,6 +96,9 @@ def gc(
     cdata: _CDataT, destructor: None | Callable[[_CDataT], None], size: int = 0
 ) -> _CDataT: ...
 def buffer(cdata: _CDataT, size: int = -1) -> bytearray: ...
+def from_buffer(
+    cdecl: str, python_buffer: Buffer, require_writable: bool = False
+) -> _CDataT: ...  # type: ignore [type-var]
 def string(cdata: CharCData) -> bytes: ...
 def release(cdata: _CDataT) -> None: ...
 def def_extern() -> Callable[[_F], _F]: ...
@@ -20,6 +20,7 @@ from .ffi import (
     WlInterfaceCData,
     WlListCData,
     WlListenerCData,
+    WlObjectCData,
     WlProxyCData,
     WlQueueCData,
     WlResourceCData,
@@ -29,6 +30,7 @@ from .ffi import (
 WAYLAND_VERSION_MAJOR: int
 WAYLAND_VERSION_MINOR: int
 WAYLAND_VERSION_MICRO: int
+PYWAYLAND_HAS_DISPATCH_TIMEOUT: int
 
 dispatcher_func: DispatcherFuncT
 resource_destroy_func: ResourceDestroyFuncT
@@ -72,6 +74,10 @@ def wl_display_prepare_read(display: WlDisplayCData) -> int: ...
 def wl_display_prepare_read_queue(
     display: WlDisplayCData, queue: WlQueueCData
 ) -> int: ...
+def wl_display_cancel_read(display: WlDisplayCData) -> None: ...
+def pywayland_display_dispatch_queue_timeout(
+    display: WlDisplayCData, queue: WlQueueCData, timeout: float
+) -> int: ...
 def wl_display_flush(display: WlDisplayCData) -> int: ...
 def wl_display_create_queue(display: WlDisplayCData) -> WlQueueCData: ...
 
@@ -118,6 +124,14 @@ def wl_proxy_add_dispatcher(
     dispatcher_data: CData,
     data: CData,
 ) -> int: ...
+def wl_proxy_get_listener(proxy: WlProxyCData) -> CData: ...
+def wl_proxy_set_tag(proxy: WlProxyCData, tag: CData) -> None: ...
+def wl_proxy_get_tag(proxy: WlProxyCData) -> CData: ...
+def wl_proxy_set_queue(proxy: WlProxyCData, queue: WlQueueCData) -> None: ...
+def wl_proxy_create_wrapper(proxy: CData) -> WlProxyCData: ...
+def wl_proxy_wrapper_destroy(proxy_wrapper: CData) -> None: ...
+def pywayland_proxy_set_tag(proxy: WlProxyCData) -> None: ...
+def pywayland_proxy_get_handle(object: WlObjectCData) -> CData: ...
 
 # Resource functionality
 def wl_resource_post_event_array(
@@ -141,6 +155,12 @@ def wl_resource_get_id(resource: WlResourceCData) -> int: ...
 def wl_resource_get_user_data(resource: WlResourceCData) -> CData: ...
 def wl_resource_get_version(resource: WlResourceCData) -> int: ...
 def wl_resource_get_client(resource: WlResourceCData) -> WlClientCData: ...
+def wl_resource_instance_of(
+    resource: WlResourceCData, interface: WlInterfaceCData, implementation: CData
+) -> int: ...
+def pywayland_resource_get_handle(
+    object: WlObjectCData, interface: WlInterfaceCData
+) -> CData: ...
 def wl_resource_add_destroy_listener(
     resource: WlResourceCData, listener: WlListenerCData
 ) -> None: ...
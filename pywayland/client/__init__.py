@@ -12,5 +12,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .display import Display  # noqa: F401
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .display import Display, FlushStats  # noqa: F401
 from .eventqueue import EventQueue  # noqa: F401
+
+if TYPE_CHECKING:
+    from .reactor import Reactor  # noqa: F401
+    from .reader import ReaderThread  # noqa: F401
+
+# The classes that bring in their own imports, e.g. selectors and threading,
+# are only imported when they are first used
+_LAZY = {"Reactor": "reactor", "ReaderThread": "reader"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        module = importlib.import_module(f"{__name__}.{_LAZY[name]}")
+        value = globals()[name] = getattr(module, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY})
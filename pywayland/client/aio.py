@@ -0,0 +1,246 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, TypeVar
+
+from pywayland import ffi
+
+if TYPE_CHECKING:
+    from types import TracebackType
+    from typing import Any
+
+    from .display import Display
+    from .eventqueue import EventQueue
+
+_T = TypeVar("_T")
+
+
+class AsyncDisplay:
+    """Run a :class:`~pywayland.client.Display` on an asyncio event loop
+
+    The file descriptor of the display is watched by the event loop, so the
+    connection is serviced alongside the other I/O of the loop, without
+    blocking the thread.  When the file descriptor is readable, the events are
+    read with :func:`~pywayland.client.Display.prepare_read` and
+    :func:`~pywayland.client.Display.read_events`, and the events on the
+    default queue are dispatched.  The events on other queues are dispatched
+    by awaiting :meth:`dispatch` with the queue.
+
+    Requests are sent by :meth:`flush`, which is called after each dispatch,
+    when the socket is full, the remaining requests are sent once it is
+    writable.  The display must only be used from the thread of the event
+    loop.
+
+    .. code-block:: python
+
+        display = Display()
+        display.connect()
+        async with AsyncDisplay(display) as async_display:
+            registry = display.get_registry()
+            registry.dispatcher["global"] = handle_global
+            await async_display.roundtrip()
+
+    :param display: The connected display
+    :type display: :class:`~pywayland.client.Display`
+    """
+
+    def __init__(self, display: Display) -> None:
+        self.display = display
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fd = -1
+        self._writing = False
+        self._error: BaseException | None = None
+        # the dispatches waiting for events to be read, by queue
+        self._waiters: list[tuple[EventQueue | None, asyncio.Future[int]]] = []
+        # all of the futures being awaited, which fail with the connection
+        self._futures: set[asyncio.Future[Any]] = set()
+
+    async def __aenter__(self) -> AsyncDisplay:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start watching the display on the running event loop"""
+        if self._loop is not None:
+            raise RuntimeError("AsyncDisplay has already been started")
+
+        self._loop = asyncio.get_running_loop()
+        self._fd = self.display.get_fd()
+        self._loop.add_reader(self._fd, self._on_readable)
+        self.flush()
+
+    def close(self) -> None:
+        """Stop watching the display
+
+        Pending calls to :meth:`roundtrip` and :meth:`dispatch` are cancelled.
+        The display is not disconnected.
+        """
+        if self._loop is None:
+            return
+
+        self._loop.remove_reader(self._fd)
+        if self._writing:
+            self._loop.remove_writer(self._fd)
+            self._writing = False
+        for future in self._futures:
+            future.cancel()
+        self._waiters.clear()
+        self._loop = None
+
+    def flush(self) -> None:
+        """Send the buffered requests to the server
+
+        If the socket is full, the requests are sent once it is writable.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._loop is None or self._writing:
+            return
+
+        if self.display.flush() == -1:
+            if not self.display.flush_pending:
+                error = OSError(ffi.errno, "Failed to flush the display")
+                self._fail(error)
+                raise error
+            self._loop.add_writer(self._fd, self._on_writable)
+            self._writing = True
+
+    async def roundtrip(self, *, queue: EventQueue | None = None) -> None:
+        """Wait until the server has processed the requests sent so far
+
+        The events sent by the server in response to the requests are
+        dispatched before returning.
+
+        :param queue:
+            If given, the events on the queue are also dispatched, otherwise
+            only the events on the default queue are dispatched
+        :type queue: :class:`~pywayland.client.EventQueue`
+        """
+        loop = self._running_loop()
+        done: asyncio.Future[None] = loop.create_future()
+
+        def callback_done(callback: Any, data: int) -> None:
+            if not done.done():
+                done.set_result(None)
+
+        callback = self.display.sync()
+        callback.dispatcher["done"] = callback_done
+        try:
+            self.flush()
+            # the server processes the requests, and sends their events, in
+            # order, so all of the events have been queued when done is
+            # dispatched
+            await self._wait(done)
+        finally:
+            callback.destroy()
+
+        if queue is not None:
+            self.display.dispatch(queue=queue)
+
+    async def dispatch(self, *, queue: EventQueue | None = None) -> int:
+        """Wait for events on the queue and dispatch them
+
+        Events already on the queue are dispatched without waiting.
+
+        :param queue:
+            The queue to dispatch, if not given, uses the default queue
+        :type queue: :class:`~pywayland.client.EventQueue`
+        :returns: The number of events dispatched
+        """
+        loop = self._running_loop()
+
+        count: int = self.display.dispatch(queue=queue)
+        if count > 0:
+            return count
+
+        future: asyncio.Future[int] = loop.create_future()
+        self._waiters.append((queue, future))
+        self.flush()
+        return await self._wait(future)
+
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        if self._error is not None:
+            raise self._error
+        if self._loop is None:
+            raise RuntimeError("AsyncDisplay has not been started")
+        return self._loop
+
+    async def _wait(self, future: asyncio.Future[_T]) -> _T:
+        self._futures.add(future)
+        try:
+            return await future
+        finally:
+            self._futures.discard(future)
+
+    def _on_readable(self) -> None:
+        display = self.display
+        try:
+            # the queue must be empty before reading
+            while not display.prepare_read():
+                display.dispatch()
+            display.read_events()
+            count = display.dispatch()
+        except Exception as e:
+            self._fail(e)
+            return
+
+        waiters = self._waiters
+        self._waiters = []
+        for queue, future in waiters:
+            if future.done():
+                continue
+            if queue is not None:
+                try:
+                    queue_count = display.dispatch(queue=queue)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+            else:
+                queue_count = count
+            if queue_count > 0:
+                future.set_result(queue_count)
+            else:
+                self._waiters.append((queue, future))
+
+        # the handlers of the events may have sent requests
+        if self._error is None:
+            self.flush()
+
+    def _on_writable(self) -> None:
+        if self.display.flush() != -1:
+            assert self._loop is not None
+            self._loop.remove_writer(self._fd)
+            self._writing = False
+        elif not self.display.flush_pending:
+            self._fail(OSError(ffi.errno, "Failed to flush the display"))
+
+    def _fail(self, error: BaseException) -> None:
+        """Stop watching the display after an error of the connection"""
+        self._error = error
+        for future in self._futures:
+            if not future.done():
+                future.set_exception(error)
+        self.close()
@@ -14,11 +14,16 @@
 
 from __future__ import annotations
 
+import dataclasses
+import errno
+import select
+import threading
+import time
 from typing import TYPE_CHECKING
 from weakref import WeakSet
 
 from pywayland import ffi, lib
-from pywayland.protocol.wayland import WlDisplayProxy
+from pywayland.protocol.wayland import WlCallback, WlDisplayProxy
 from pywayland.utils import ensure_valid
 
 if TYPE_CHECKING:
@@ -29,6 +34,32 @@ if TYPE_CHECKING:
     from pywayland.protocol_core import Proxy
 
 
+@dataclasses.dataclass
+class FlushStats:
+    """Statistics of the flushes of a :class:`Display`
+
+    :param flushes: The number of calls to :func:`Display.flush`
+    :type flushes: `int`
+    :param bytes_sent: The number of bytes sent by the successful flushes
+    :type bytes_sent: `int`
+    :param eagain: The number of flushes that found the socket full
+    :type eagain: `int`
+    :param blocked_time:
+        The seconds the requests have waited on a full socket to be sent
+    :type blocked_time: `float`
+    :param pending:
+        If the last flush found the socket full, so requests are waiting to
+        be sent
+    :type pending: `bool`
+    """
+
+    flushes: int = 0
+    bytes_sent: int = 0
+    eagain: int = 0
+    blocked_time: float = 0.0
+    pending: bool = False
+
+
 class Display(WlDisplayProxy):
     """Represents a connection to the compositor
 
@@ -97,6 +128,11 @@ class Display(WlDisplayProxy):
         self._name_or_fd = name_or_fd
         self._ptr: ffi.WlDisplayCData | None = None  # type: ignore [assignment]
 
+        # flushes can come from any thread, e.g. a ReaderThread
+        self._flush_lock = threading.Lock()
+        self._flush_stats = FlushStats()
+        self._blocked_since: float | None = None
+
     def __enter__(self) -> Display:
         """Connect to the display in a context manager"""
         self.connect()
@@ -170,7 +206,13 @@ class Display(WlDisplayProxy):
         return lib.wl_display_get_fd(self._ptr)
 
     @ensure_valid
-    def dispatch(self, *, block: bool = False, queue: EventQueue | None = None) -> int:
+    def dispatch(
+        self,
+        *,
+        block: bool = False,
+        queue: EventQueue | None = None,
+        timeout: float | None = None,
+    ) -> int:
         """Process incoming events
 
         If block is `False`, it does not attempt to read the display fd or
@@ -181,13 +223,37 @@ class Display(WlDisplayProxy):
         and queued on the appropriate event queues. Finally, events on the
         default event queue are dispatched.
 
+        If `timeout` is given, this blocks as if `block` were `True`, but for
+        at most `timeout` seconds, and returns zero if no events were
+        dispatched before it expired.  This uses
+        ``wl_display_dispatch_queue_timeout`` when the linked libwayland
+        provides it, otherwise it waits for the display fd with
+        :func:`Display.prepare_read` and :func:`Display.read_events`.
+
         .. note::
 
             It is not possible to check if there are events on the queue or
             not.
+
+        :param block: If the queue is empty, wait for events to be read
+        :type block: `bool`
+        :param queue: The queue to dispatch, if not given, uses the default
+                      queue
+        :type queue: :class:`~pywayland.client.EventQueue`
+        :param timeout: The most seconds to wait for events
+        :type timeout: `float` or `None`
+        :returns: The number of events dispatched
         """
         assert self._ptr is not None
-        if block:
+        if timeout is not None:
+            if not lib.PYWAYLAND_HAS_DISPATCH_TIMEOUT:
+                return self._dispatch_timeout(queue, timeout)
+            queue_ptr = ffi.NULL if queue is None else queue._ptr
+            assert queue_ptr is not None
+            ret = lib.pywayland_display_dispatch_queue_timeout(
+                self._ptr, queue_ptr, max(timeout, 0)
+            )
+        elif block:
             if queue is None:
                 ret = lib.wl_display_dispatch(self._ptr)
             else:
@@ -206,8 +272,36 @@ class Display(WlDisplayProxy):
 
         return ret
 
+    def _dispatch_timeout(self, queue: EventQueue | None, timeout: float) -> int:
+        """Dispatch with a timeout, for libwayland before 1.23"""
+        deadline = time.monotonic() + timeout
+        poller = select.poll()
+        poller.register(self.get_fd(), select.POLLIN)
+
+        while True:
+            # otherwise, there are events on the queue to dispatch
+            if self.prepare_read(queue=queue):
+                if self.flush() == -1 and not self.flush_pending:
+                    self.cancel_read()
+                    raise OSError(ffi.errno, "Failed to flush the display")
+
+                remaining = deadline - time.monotonic()
+                # round up, so the deadline has passed when it times out
+                if remaining <= 0 or not poller.poll(remaining * 1000 + 1):
+                    self.cancel_read()
+                    return 0
+
+                self.read_events()
+
+            count: int = self.dispatch(queue=queue)
+            # the events read may have all been for other queues
+            if count > 0:
+                return count
+
     @ensure_valid
-    def roundtrip(self, *, queue: EventQueue | None = None) -> int:
+    def roundtrip(
+        self, *, queue: EventQueue | None = None, timeout: float | None = None
+    ) -> int:
         """Block until all pending request are processed by the server
 
         This function blocks until the server has processed all currently
@@ -226,15 +320,76 @@ class Display(WlDisplayProxy):
         :param queue: The queue on which to run the roundtrip, if not given,
                       uses the default queue.
         :type queue: :class:`~pywayland.client.EventQueue`
+        :param timeout: If given, the most seconds to wait for the server,
+                        :class:`TimeoutError` is raised if it has not replied
+                        before then.
+        :type timeout: `float` or `None`
         :returns: The number of dispatched events on success or -1 on failure
         """
         assert self._ptr is not None
+        if timeout is not None:
+            return self._roundtrip_timeout(queue, timeout)
+
         if queue is None:
             return lib.wl_display_roundtrip(self._ptr)
         else:
             assert queue._ptr is not None
             return lib.wl_display_roundtrip_queue(self._ptr, queue._ptr)
 
+    def _roundtrip_timeout(self, queue: EventQueue | None, timeout: float) -> int:
+        deadline = time.monotonic() + timeout
+        done = False
+
+        def callback_done(callback: Any, data: int) -> None:
+            nonlocal done
+            done = True
+
+        callback = self._sync_on_queue(queue)
+        callback.dispatcher["done"] = callback_done
+
+        count = 0
+        try:
+            while not done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for the server")
+                count += self.dispatch(queue=queue, timeout=remaining)
+        finally:
+            callback.destroy()
+
+        return count
+
+    def _sync_on_queue(self, queue: EventQueue | None) -> Proxy[WlCallback]:
+        """Send a sync request, with the callback created on the queue
+
+        The request is sent on a wrapper of the display that is assigned to
+        the queue, as in ``wl_display_roundtrip_queue``, so the done event is
+        never queued onto another queue, where it could be dispatched by
+        another thread.
+        """
+        assert self._ptr is not None
+        wrapper = lib.wl_proxy_create_wrapper(self._ptr)
+        if wrapper == ffi.NULL:
+            raise MemoryError("Unable to create the display wrapper")
+
+        try:
+            if queue is not None:
+                assert queue._ptr is not None
+                lib.wl_proxy_set_queue(wrapper, queue._ptr)
+
+            # the sync request, with the new_id of the callback
+            arguments = self.interface.requests[0].marshal_arguments()
+            try:
+                callback_ptr = lib.wl_proxy_marshal_array_constructor(
+                    wrapper, 0, arguments.args_ptr, WlCallback._ptr
+                )
+            finally:
+                arguments.release()
+        finally:
+            lib.wl_proxy_wrapper_destroy(wrapper)
+
+        return WlCallback.proxy_class(callback_ptr, self)
+
     @ensure_valid
     def read(self, *, queue: EventQueue | None = None) -> None:
         """Read events from display file descriptor
@@ -246,21 +401,62 @@ class Display(WlDisplayProxy):
         :param queue: If specified, queue the events onto the given event
                       queue, otherwise the default display queue will be used.
         """
-        assert self._ptr is not None
-        while True:
-            if queue is None:
-                prepared = lib.wl_display_prepare_read(self._ptr)
-            else:
-                assert queue._ptr is not None
-                prepared = lib.wl_display_prepare_read_queue(self._ptr, queue._ptr)
-
-            if prepared == 0:
-                break
-
+        while not self.prepare_read(queue=queue):
             # TODO: add a blocking/non-blocking condition here
 
             self.dispatch(block=False, queue=queue)
 
+        self.read_events()
+
+    @ensure_valid
+    def prepare_read(self, *, queue: EventQueue | None = None) -> bool:
+        """Prepare to read events from the display file descriptor
+
+        This must be called before reading from the file descriptor of the
+        display, and announces the intention of the calling thread to read.
+        After preparing, the thread should wait until the file descriptor is
+        readable, then call :func:`Display.read_events`, or call
+        :func:`Display.cancel_read` if it no longer wants to read.
+
+        If the queue is not empty, the thread is not prepared to read, and the
+        events on the queue must first be dispatched with
+        :func:`Display.dispatch`.
+
+        :param queue: If specified, the queue to check is empty, otherwise the
+                      default display queue will be used.
+        :returns: True if the thread is prepared to read, False if the queue
+                  is not empty
+        """
+        assert self._ptr is not None
+        if queue is None:
+            prepared = lib.wl_display_prepare_read(self._ptr)
+        else:
+            assert queue._ptr is not None
+            prepared = lib.wl_display_prepare_read_queue(self._ptr, queue._ptr)
+        return prepared == 0
+
+    @ensure_valid
+    def cancel_read(self) -> None:
+        """Cancel a read prepared with :func:`Display.prepare_read`
+
+        Releases the intention of the calling thread to read, so that the
+        other threads waiting on it to read can continue.
+        """
+        assert self._ptr is not None
+        lib.wl_display_cancel_read(self._ptr)
+
+    @ensure_valid
+    def read_events(self) -> None:
+        """Read events after :func:`Display.prepare_read`
+
+        Reads the data available on the display file descriptor, and queues
+        the events read on their corresponding event queues.  If other
+        threads have prepared to read, this waits until they have read or
+        canceled, and the last of the threads reads from the file descriptor.
+        If there is no data available, this returns without queuing any
+        events.
+        """
+        assert self._ptr is not None
         status = lib.wl_display_read_events(self._ptr)
         if status != 0:
             raise RuntimeError("Failed to read events")
@@ -276,8 +472,92 @@ class Display(WlDisplayProxy):
 
         :func:`Display.flush` never blocks.  It will write as much data as
         possible, but if all data could not be written, errno will be set to
-        EAGAIN and -1 returned.  In that case, use poll on the display file
-        descriptor to wait for it to become writable again.
+        EAGAIN and -1 returned.  In that case, :attr:`Display.flush_pending`
+        is set, and the flush should be retried once the display file
+        descriptor is writable, see :func:`Display.wait_flush`.  The flushes
+        are counted in :attr:`Display.flush_stats`.
         """
         assert self._ptr is not None
-        return lib.wl_display_flush(self._ptr)
+        ret = lib.wl_display_flush(self._ptr)
+        socket_full = ret == -1 and ffi.errno == errno.EAGAIN
+        now = time.monotonic()
+
+        with self._flush_lock:
+            stats = self._flush_stats
+            stats.flushes += 1
+            if ret > 0:
+                stats.bytes_sent += ret
+            if socket_full:
+                stats.eagain += 1
+                if self._blocked_since is None:
+                    self._blocked_since = now
+            elif self._blocked_since is not None:
+                stats.blocked_time += now - self._blocked_since
+                self._blocked_since = None
+
+        return ret
+
+    @property
+    def flush_pending(self) -> bool:
+        """If requests are waiting for the socket to be writable to be sent
+
+        Set when :func:`Display.flush` finds the socket full.  While set, the
+        display file descriptor should be polled for ``POLLOUT``, e.g. with
+        :func:`Display.poll_events`, and flushed again when it is writable.
+        """
+        return self._blocked_since is not None
+
+    @property
+    def flush_stats(self) -> FlushStats:
+        """A snapshot of the statistics of the flushes of the display
+
+        The time blocked includes the time the requests have been waiting
+        since the last flush, if they are still pending.
+        """
+        with self._flush_lock:
+            stats = dataclasses.replace(self._flush_stats)
+            if self._blocked_since is not None:
+                stats.blocked_time += time.monotonic() - self._blocked_since
+                stats.pending = True
+        return stats
+
+    def poll_events(self) -> int:
+        """The events to poll the display file descriptor for
+
+        Always includes ``POLLIN``, and ``POLLOUT`` while
+        :attr:`Display.flush_pending` is set, to register the file descriptor
+        of :func:`Display.get_fd` with an event loop.
+        """
+        if self.flush_pending:
+            return select.POLLIN | select.POLLOUT
+        return select.POLLIN
+
+    @ensure_valid
+    def wait_flush(self, timeout: float | None = None) -> bool:
+        """Flush the display, waiting for the socket to be writable if full
+
+        :param timeout:
+            The most seconds to wait for the socket, or `None` to wait until
+            all the requests are sent
+        :type timeout: `float` or `None`
+        :returns:
+            True if all the requests were sent, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        poller = select.poll()
+        poller.register(self.get_fd(), select.POLLOUT)
+
+        while self.flush() == -1:
+            if not self.flush_pending:
+                raise OSError(ffi.errno, "Failed to flush the display")
+
+            if deadline is None:
+                poller.poll()
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # round up, so the deadline has passed when it times out
+            poller.poll(remaining * 1000 + 1)
+
+        return True
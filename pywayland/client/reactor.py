@@ -0,0 +1,246 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import logging
+import selectors
+import socket
+from typing import TYPE_CHECKING
+
+from pywayland import ffi
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import TracebackType
+
+    from .display import Display
+
+logger = logging.getLogger(__name__)
+
+
+class Reactor:
+    """Service many displays from a single thread
+
+    The file descriptors of the registered displays are watched with a
+    :mod:`selectors` selector.  Each iteration prepares every display to
+    read, flushing its requests, then waits for any of them to be readable,
+    reads the events of the readable displays, and dispatches the default
+    queue of each display.  The displays with requests waiting on a full
+    socket are also watched for being writable, so they are flushed as soon
+    as possible.
+
+    When servicing a display fails, e.g. the compositor disconnected, the
+    display is unregistered, and the error is passed to ``on_error``, so the
+    other displays are still serviced on the next iteration.  If ``on_error``
+    is not set, the error is raised once all of the displays have been
+    serviced, when several displays failed in the same iteration, the errors
+    of the others are logged, and the first error is raised.
+
+    .. code-block:: python
+
+        with Reactor() as reactor:
+            for display in displays:
+                reactor.register(display)
+            reactor.run()
+
+    :param on_error:
+        Called with the display and the exception when servicing a display
+        fails
+    :type on_error: callable or `None`
+    """
+
+    def __init__(
+        self, on_error: Callable[[Display, Exception], None] | None = None
+    ) -> None:
+        self.on_error = on_error
+
+        self._selector = selectors.DefaultSelector()
+        # the events each display is registered for
+        self._displays: dict[Display, int] = {}
+        self._stopping = False
+
+        # wakes the reactor to stop it from another thread
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+
+    def __enter__(self) -> Reactor:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def displays(self) -> list[Display]:
+        """The registered displays"""
+        return list(self._displays)
+
+    def register(self, display: Display) -> None:
+        """Service the events of the connected display
+
+        :param display: The display to register
+        :type display: :class:`~pywayland.client.Display`
+        """
+        if display in self._displays:
+            raise ValueError("Display is already registered")
+
+        self._selector.register(display.get_fd(), selectors.EVENT_READ, display)
+        self._displays[display] = selectors.EVENT_READ
+
+    def unregister(self, display: Display) -> None:
+        """Stop servicing the display
+
+        The display is not disconnected.
+
+        :param display: The display to unregister
+        :type display: :class:`~pywayland.client.Display`
+        """
+        if self._displays.pop(display, None) is None:
+            raise ValueError("Display is not registered")
+
+        for key in list(self._selector.get_map().values()):
+            if key.data is display:
+                self._selector.unregister(key.fileobj)
+
+    def run_once(self, timeout: float | None = None) -> int:
+        """Wait for events on any of the displays and dispatch them
+
+        :param timeout:
+            The most seconds to wait for events, or `None` to wait until
+            there are events
+        :type timeout: `float` or `None`
+        :returns: The number of events dispatched
+        """
+        count = 0
+        prepared = []
+        # the failed displays are handled once the others are no longer
+        # prepared to read
+        failed: list[tuple[Display, Exception]] = []
+
+        for display in list(self._displays):
+            try:
+                # dispatch the events already queued, which may be all that
+                # is waiting, so do not block
+                while not display.prepare_read():
+                    count += display.dispatch()
+                    timeout = 0
+            except Exception as e:
+                failed.append((display, e))
+                continue
+
+            try:
+                self._flush(display)
+            except Exception as e:
+                display.cancel_read()
+                failed.append((display, e))
+                continue
+            prepared.append(display)
+
+        try:
+            ready = self._selector.select(timeout)
+        except BaseException:
+            for display in prepared:
+                display.cancel_read()
+            raise
+
+        readable = set()
+        writable = set()
+        for key, events in ready:
+            if key.data is None:
+                self._drain_wakeup()
+                continue
+            if events & selectors.EVENT_READ:
+                readable.add(key.data)
+            if events & selectors.EVENT_WRITE:
+                writable.add(key.data)
+
+        for display in prepared:
+            try:
+                if display in readable:
+                    display.read_events()
+                else:
+                    display.cancel_read()
+                if display in writable:
+                    self._flush(display)
+                count += display.dispatch()
+            except Exception as e:
+                failed.append((display, e))
+
+        for display, _ in failed:
+            if display in self._displays:
+                self.unregister(display)
+        if self.on_error is None:
+            if failed:
+                for display, error in failed[1:]:
+                    logger.error(
+                        f"Failed to service display: {display}", exc_info=error
+                    )
+                raise failed[0][1]
+        else:
+            for display, error in failed:
+                self.on_error(display, error)
+
+        return count
+
+    def run(self) -> None:
+        """Service the displays until :meth:`stop` is called"""
+        try:
+            while not self._stopping:
+                self.run_once()
+        finally:
+            self._stopping = False
+
+    def stop(self) -> None:
+        """Stop running the reactor, can be called from another thread
+
+        If the reactor is not running, the next call to :meth:`run` returns
+        immediately.
+        """
+        self._stopping = True
+        self._wakeup_send.send(b"\0")
+
+    def close(self) -> None:
+        """Unregister all of the displays and close the selector"""
+        self._displays.clear()
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+    def _flush(self, display: Display) -> None:
+        """Flush the display, and watch it for being writable if it is full"""
+        if display.flush() == -1:
+            # the socket is full, the rest of the requests are sent once it
+            # is writable, anything else is an error
+            if not display.flush_pending:
+                raise OSError(ffi.errno, "Failed to flush the display")
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        else:
+            events = selectors.EVENT_READ
+
+        if events != self._displays[display]:
+            self._selector.modify(display.get_fd(), events, display)
+            self._displays[display] = events
+
+    def _drain_wakeup(self) -> None:
+        try:
+            while self._wakeup_recv.recv(64):
+                pass
+        except BlockingIOError:
+            pass
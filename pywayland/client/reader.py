@@ -0,0 +1,221 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import select
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from .eventqueue import EventQueue
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .display import Display
+
+
+class ReaderThread:
+    """Read the events of a display on a dedicated thread
+
+    The reader thread waits for the display file descriptor to be readable,
+    reads the events and queues them onto their event queues, then wakes the
+    threads waiting in :meth:`dispatch`.  Each thread dispatches the events
+    of its own :class:`~pywayland.client.EventQueue`, so the events of the
+    proxies assigned to the queue with
+    :func:`~pywayland.protocol_core.Proxy.set_queue` are handled concurrently
+    with the events of the other queues.  The GIL is released while the
+    reader thread waits on, and reads from, the file descriptor.
+
+    The reader prepares to read on a private queue, so it never needs to
+    dispatch, and the default queue is dispatched like any other queue, by
+    calling :meth:`dispatch` without a queue.  The requests are flushed by
+    the reader before each wait, requests sent while it waits should be
+    flushed with :func:`~pywayland.client.Display.flush`, which is thread
+    safe.
+
+    .. code-block:: python
+
+        with ReaderThread(display) as reader:
+            # in each thread
+            while running:
+                reader.dispatch(queue=queue)
+
+    :param display: The connected display
+    :type display: :class:`~pywayland.client.Display`
+    """
+
+    def __init__(self, display: Display) -> None:
+        self.display = display
+
+        self._thread: threading.Thread | None = None
+        self._queue: EventQueue | None = None
+        self._wakeup: tuple[int, int] | None = None
+
+        # incremented each time the reader has read, waiters wait for it to
+        # change after finding their queue empty
+        self._condition = threading.Condition()
+        self._serial = 0
+        self._running = False
+        self._error: BaseException | None = None
+
+    def __enter__(self) -> ReaderThread:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        """If the reader thread is reading events"""
+        return self._running
+
+    def start(self) -> None:
+        """Start the reader thread"""
+        if self._thread is not None:
+            raise RuntimeError("Reader thread has already been started")
+
+        self._queue = EventQueue(self.display)
+        self._wakeup = os.pipe2(os.O_CLOEXEC)
+        self._running = True
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="pywayland-reader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader thread and wait for it to exit
+
+        The threads waiting in :meth:`dispatch` are woken and raise
+        :class:`RuntimeError`.
+        """
+        if self._thread is None:
+            return
+
+        assert self._wakeup is not None
+        os.write(self._wakeup[1], b"\0")
+        self._thread.join()
+        self._thread = None
+
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        if self._queue is not None:
+            self._queue.destroy()
+            self._queue = None
+
+    def dispatch(
+        self, *, queue: EventQueue | None = None, timeout: float | None = None
+    ) -> int:
+        """Wait for events on the queue and dispatch them
+
+        Events already on the queue are dispatched without waiting.  This can
+        be called from any thread, but each queue should only be dispatched
+        by one thread at a time.
+
+        :param queue:
+            The queue to dispatch, if not given, uses the default queue
+        :type queue: :class:`~pywayland.client.EventQueue`
+        :param timeout:
+            The most seconds to wait for events, or `None` to wait until
+            there are events
+        :type timeout: `float` or `None`
+        :returns: The number of events dispatched, 0 if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                self._check_running()
+                serial = self._serial
+
+            count: int = self.display.dispatch(queue=queue)
+            if count > 0:
+                return count
+
+            with self._condition:
+                while self._serial == serial:
+                    self._check_running()
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return 0
+                    self._condition.wait(remaining)
+
+    def _check_running(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Failed to read events") from self._error
+        if not self._running:
+            raise RuntimeError("Reader thread is not running")
+
+    def _run(self) -> None:
+        assert self._wakeup is not None
+        display = self.display
+        display_fd = display.get_fd()
+        wakeup_fd = self._wakeup[0]
+
+        poller = select.poll()
+        poller.register(display_fd, select.POLLIN)
+        poller.register(wakeup_fd, select.POLLIN)
+        registered = select.POLLIN
+
+        try:
+            while True:
+                # no proxies are assigned to the private queue, so it is
+                # normally empty and prepared on the first try
+                while not display.prepare_read(queue=self._queue):
+                    display.dispatch(queue=self._queue)
+
+                try:
+                    # wait for the socket to be writable if it is full
+                    display.flush()
+                    events = display.poll_events()
+                    if events != registered:
+                        registered = events
+                        poller.modify(display_fd, events)
+
+                    ready = dict(poller.poll())
+                except BaseException:
+                    display.cancel_read()
+                    raise
+
+                if wakeup_fd in ready:
+                    display.cancel_read()
+                    break
+                if ready.get(display_fd, 0) & ~select.POLLOUT:
+                    display.read_events()
+                else:
+                    display.cancel_read()
+                    continue
+
+                with self._condition:
+                    self._serial += 1
+                    self._condition.notify_all()
+        except Exception as e:
+            with self._condition:
+                self._error = e
+        finally:
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
@@ -15,8 +15,9 @@
 from __future__ import annotations
 
 import traceback
+import warnings
 from collections.abc import Callable
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from pywayland import ffi, lib
 
@@ -24,6 +25,7 @@ if TYPE_CHECKING:
     from pywayland.protocol_core.message import Message
 
 CallbackT = Callable[..., int | None]
+RawCallbackT = Callable[[Any, int, "RawArguments"], int | None]
 
 
 # int (*wl_dispatcher_func_t)(const void *, void *, uint32_t, const struct wl_message *, union wl_argument *)
@@ -42,21 +44,45 @@ def dispatcher_func(
 
     # get the proxy/resource object from the user data handle
     self = ffi.from_handle(data)
+    # the dispatcher of the object, which may be the defaults of its class
+    dispatcher = self._dispatcher
+
+    ret: int | None
+
+    # raw callbacks are given the arguments without converting them
+    raw_func = dispatcher._raw_callback[opcode]
+    if raw_func is not None:
+        try:
+            ret = raw_func(
+                self, opcode, RawArguments(c_args, dispatcher.messages[opcode])
+            )
+        except Exception:
+            traceback.print_exc()
+            return 0
+        return 0 if ret is None else ret
 
     # get the callback
-    func = self.dispatcher[opcode]
+    func = dispatcher._callback[opcode]
     if func is None:
         return 0
 
-    # rebuild the args into python objects
-    args = self.dispatcher.messages[opcode].c_to_arguments(c_args)
+    # rebuild the args into python objects, new proxies are created on the
+    # display of the receiving proxy
+    array_views = dispatcher.array_views
+    args = dispatcher.messages[opcode].c_to_arguments(
+        c_args, getattr(self, "_display", None), array_views
+    )
 
-    ret: int | None
     try:
         ret = func(self, *args)
     except Exception:
         traceback.print_exc()
         return 0
+    finally:
+        # the array data is freed after dispatching, so make sure the views
+        # cannot be used after the callback
+        if array_views:
+            _release_views(args)
 
     if ret is None:
         return 0
@@ -64,6 +90,24 @@ def dispatcher_func(
         return ret
 
 
+def _release_views(args: list[Any]) -> None:
+    # only the views given to the callback can be released, views derived
+    # from them (e.g. slices) remain pointing at the freed data
+    for arg in args:
+        if isinstance(arg, memoryview):
+            try:
+                arg.release()
+            except BufferError:
+                # the buffer of the view is used by another object, which
+                # would read the freed data
+                warnings.warn(
+                    "The buffer of an array view is still in use after the "
+                    "callback, the data it refers to has been freed",
+                    RuntimeWarning,
+                    stacklevel=1,
+                )
+
+
 # void (*wl_resource_destroy_func_t)(struct wl_resource *resource)
 @ffi.def_extern()
 def resource_destroy_func(res_ptr: ffi.WlResourceCData) -> None:
@@ -72,11 +116,73 @@ def resource_destroy_func(res_ptr: ffi.WlResourceCData) -> None:
     resource = ffi.from_handle(resource_handle)
 
     # if the destructor has been set, run it
-    func = resource.dispatcher.destructor
+    func = resource._dispatcher.destructor
     if func is not None:
         func(resource)
 
 
+class RawArguments:
+    """Accessor for the arguments of a message given to a raw callback
+
+    The values are read from the `union wl_argument` array when they are
+    requested, so no objects are created for arguments that are not used.
+    Arguments are given by their index in the message, as in the protocol
+    XML, and mapped to the slots of the array, which differ after an
+    untyped new_id, e.g. for ``wl_registry.bind(name, id)`` the id is the
+    argument at index 1, which is read with ``args.uint32(1)``, although the
+    interface name and version of the new_id take the preceding slots.  The
+    accessor is only valid during the callback.
+
+    :param args_ptr: The arguments of the message
+    :type args_ptr: cdata `union wl_argument []`
+    :param message: The message the arguments are for
+    :type message: :class:`~pywayland.protocol_core.message.Message`
+    """
+
+    __slots__ = ("args_ptr", "message")
+
+    def __init__(self, args_ptr: ffi.WlArgumentCData, message: Message) -> None:
+        self.args_ptr = args_ptr
+        self.message = message
+
+    def int32(self, index: int) -> int:
+        """Get the signed integer argument at the given index"""
+        return self.args_ptr[self.message.slots[index]].i
+
+    def uint32(self, index: int) -> int:
+        """Get the unsigned integer argument, or the new_id, at the given index"""
+        return self.args_ptr[self.message.slots[index]].u
+
+    def fixed(self, index: int) -> float:
+        """Get the fixed point argument at the given index as a float"""
+        return lib.wl_fixed_to_double(self.args_ptr[self.message.slots[index]].f)
+
+    def fd(self, index: int) -> int:
+        """Get the file descriptor argument at the given index"""
+        return self.args_ptr[self.message.slots[index]].h
+
+    def string(self, index: int) -> str | None:
+        """Get the string argument at the given index"""
+        string_ptr = self.args_ptr[self.message.slots[index]].s
+        if string_ptr == ffi.NULL:
+            return None
+        return ffi.string(string_ptr).decode()
+
+    def object(self, index: int) -> Any:
+        """Get the object argument at the given index
+
+        Gives the :class:`~pywayland.protocol_core.Proxy` or
+        :class:`~pywayland.protocol_core.Resource`, or None for a null
+        object.
+        """
+        return self.message.decode_argument(self.args_ptr, index)
+
+    def array(self, index: int) -> bytes:
+        """Get a copy of the array argument at the given index"""
+        data: bytes = self.message.decode_argument(self.args_ptr, index)
+        return data
+
+
 class Dispatcher:
     """Dispatches events or requests from an interface
 
@@ -94,6 +200,27 @@ class Dispatcher:
         Create destructor dispatcher (for Resources)
     :type destructor:
         `bool`
+
+    By default, array arguments are copied into `bytes` that are passed
+    to the callback.  When :attr:`array_views` is set, array arguments are
+    instead given as a read-only `memoryview` of the received data, without
+    copying it.  The view is only valid during the callback and is released
+    after it returns, a callback that needs to keep the data must copy it,
+    e.g. with ``view.tobytes()``.
+
+    .. warning::
+
+        Only the view given to the callback is released.  Views derived from
+        it, e.g. slices such as ``view[2:]`` or ``view.cast("I")``, and
+        objects using its buffer, e.g. ``ffi.from_buffer(view)``, point
+        at the same data, which is freed once the callback returns.  They
+        must not be kept past the callback.  If the view is still exported
+        when the callback returns, a `RuntimeWarning` is emitted.
+
+    For messages on hot paths, a raw callback can be set with
+    :func:`set_raw`.  A raw callback is called with the object, the opcode and
+    a :class:`RawArguments` to read the arguments from, and takes precedence
+    over the callback set by indexing the dispatcher.
     """
 
     def __init__(self, messages: list[Message], destructor: bool = False) -> None:
@@ -102,9 +229,28 @@ class Dispatcher:
         # Create a map of message names to message opcodes
         self._names = {msg.name: opcode for opcode, msg in enumerate(messages)}
         self._callback: list[CallbackT | None] = [None] * len(messages)
+        self._raw_callback: list[RawCallbackT | None] = [None] * len(messages)
+        self.array_views = False
 
         if destructor:
-            self.destructor = None
+            self.destructor: CallbackT | None = None
+
+    def copy(self) -> Dispatcher:
+        """Create a copy of the dispatcher
+
+        The copy starts with the same callbacks, which can then be changed
+        without affecting this dispatcher.  The messages and the map of
+        message names are shared.
+        """
+        dispatcher = Dispatcher.__new__(Dispatcher)
+        dispatcher.messages = self.messages
+        dispatcher._names = self._names
+        dispatcher._callback = self._callback.copy()
+        dispatcher._raw_callback = self._raw_callback.copy()
+        dispatcher.array_views = self.array_views
+        if hasattr(self, "destructor"):
+            dispatcher.destructor = self.destructor
+        return dispatcher
 
     def __getitem__(self, opcode_or_name: str | int) -> CallbackT | None:
         if isinstance(opcode_or_name, str):
@@ -116,3 +262,144 @@ class Dispatcher:
         if isinstance(opcode_or_name, str):
             opcode_or_name = self._names[opcode_or_name]
         self._callback[opcode_or_name] = function
+
+    def get_raw(self, opcode_or_name: str | int) -> RawCallbackT | None:
+        """Get the raw callback for the given message
+
+        :param opcode_or_name: The opcode or the name of the message
+        :type opcode_or_name: `int` or `str`
+        """
+        if isinstance(opcode_or_name, str):
+            opcode_or_name = self._names[opcode_or_name]
+
+        return self._raw_callback[opcode_or_name]
+
+    def set_raw(self, opcode_or_name: str | int, function: RawCallbackT | None) -> None:
+        """Set the raw callback for the given message
+
+        :param opcode_or_name: The opcode or the name of the message
+        :type opcode_or_name: `int` or `str`
+        :param function:
+            The callback, called with the object, the opcode and the
+            :class:`RawArguments`, or None to unset the raw callback
+        :type function: callable or None
+
+        Messages creating objects with a new_id of a known interface cannot
+        have raw callbacks, as the object is created when the arguments are
+        converted.
+        """
+        if isinstance(opcode_or_name, str):
+            opcode_or_name = self._names[opcode_or_name]
+        message = self.messages[opcode_or_name]
+        if function is not None and message.has_typed_new_id:
+            raise ValueError(
+                f"'{message.name}' creates a new object, it cannot have a raw callback"
+            )
+        self._raw_callback[opcode_or_name] = function
+
+
+class SharedDispatcher(Dispatcher):
+    """The dispatcher of an object that is still using its class defaults
+
+    Reading the callbacks reads the defaults of the class of the object, on
+    the first change, the object gets its own copy of the defaults, with
+    :meth:`Dispatcher.copy`, and the change is made to the copy, so the
+    defaults and the other objects are unaffected.
+
+    :param obj: The Proxy or Resource the dispatcher is for
+    :type obj: :class:`~pywayland.protocol_core.Proxy` or
+        :class:`~pywayland.protocol_core.Resource`
+    """
+
+    def __init__(self, obj: Any) -> None:
+        object.__setattr__(self, "_obj", obj)
+
+    def _current(self) -> Dispatcher:
+        """Get the dispatcher the object is using"""
+        dispatcher: Dispatcher = object.__getattribute__(self, "_obj")._dispatcher
+        return dispatcher
+
+    def _own(self) -> Dispatcher:
+        """Get the dispatcher of the object, copying the defaults if needed"""
+        obj = object.__getattribute__(self, "_obj")
+        dispatcher: Dispatcher = obj._dispatcher
+        if dispatcher is type(obj).dispatcher_defaults:
+            dispatcher = obj._dispatcher = dispatcher.copy()
+        return dispatcher
+
+    def __getattr__(self, name: str) -> Any:
+        # the attributes of the dispatcher, e.g. array_views or destructor
+        return getattr(self._current(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._own(), name, value)
+
+    def copy(self) -> Dispatcher:
+        return self._current().copy()
+
+    def __getitem__(self, opcode_or_name: str | int) -> CallbackT | None:
+        return self._current()[opcode_or_name]
+
+    def __setitem__(self, opcode_or_name: str | int, function: CallbackT) -> None:
+        self._own()[opcode_or_name] = function
+
+    def get_raw(self, opcode_or_name: str | int) -> RawCallbackT | None:
+        return self._current().get_raw(opcode_or_name)
+
+    def set_raw(self, opcode_or_name: str | int, function: RawCallbackT | None) -> None:
+        self._own().set_raw(opcode_or_name, function)
+
+
+class DispatcherDefaults:
+    """The default :class:`Dispatcher` of a Proxy or Resource class
+
+    Descriptor giving the dispatcher shared by all the instances of a class,
+    which is created on first access, as the messages of an interface are
+    only known once all of its classes have been defined.  Each class gets its
+    own default dispatcher, unless one is explicitly set on the class.  The
+    default dispatcher of a subclass starts as a copy of the defaults of its
+    base class for the same interface, so the callbacks set on the base class
+    apply to the subclass.  Callbacks set on the base class after the
+    defaults of the subclass have been created, i.e. after an instance of the
+    subclass has been created, do not apply to it.
+
+    :param messages:
+        The attribute of the interface with the messages that are dispatched,
+        either ``"events"`` or ``"requests"``
+    :type messages: `str`
+    :param destructor:
+        Create destructor dispatcher (for Resources)
+    :type destructor: `bool`
+    """
+
+    def __init__(self, messages: str, destructor: bool = False) -> None:
+        self._messages = messages
+        self._destructor = destructor
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+        self._attr = f"_{name}"
+
+    def __get__(self, obj: object | None, owner: type) -> Dispatcher:
+        dispatcher: Dispatcher | None = owner.__dict__.get(self._attr)
+        if dispatcher is None:
+            messages = getattr(owner.interface, self._messages)  # type: ignore [attr-defined]
+            base = self._base_defaults(owner, messages)
+            if base is not None:
+                dispatcher = base.copy()
+            else:
+                dispatcher = Dispatcher(messages, destructor=self._destructor)
+            setattr(owner, self._attr, dispatcher)
+        return dispatcher
+
+    def _base_defaults(self, owner: type, messages: list[Message]) -> Dispatcher | None:
+        """The defaults of the nearest base class dispatching the same messages"""
+        for base in owner.__mro__[1:]:
+            interface = base.__dict__.get("interface")
+            if interface is None:
+                continue
+            if getattr(interface, self._messages, None) is not messages:
+                return None
+            base_defaults: Dispatcher = getattr(base, self._name)
+            return base_defaults
+        return None
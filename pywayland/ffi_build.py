@@ -117,6 +117,12 @@ int wl_proxy_add_dispatcher(struct wl_proxy *proxy,
                             const void * dispatcher_data, void *data);
 void wl_proxy_set_user_data(struct wl_proxy *proxy, void *user_data);
 void *wl_proxy_get_user_data(struct wl_proxy *proxy);
+const void *wl_proxy_get_listener(struct wl_proxy *proxy);
+void wl_proxy_set_tag(struct wl_proxy *proxy, const char * const *tag);
+const char * const *wl_proxy_get_tag(struct wl_proxy *proxy);
+void wl_proxy_set_queue(struct wl_proxy *proxy, struct wl_event_queue *queue);
+struct wl_proxy *wl_proxy_create_wrapper(void *proxy);
+void wl_proxy_wrapper_destroy(void *proxy_wrapper);
 """
 
 # wl_display methods
@@ -139,6 +145,7 @@ int wl_display_read_events(struct wl_display *display);
 int wl_display_prepare_read(struct wl_display *display);
 int wl_display_prepare_read_queue(struct wl_display *display,
                                   struct wl_event_queue *queue);
+void wl_display_cancel_read(struct wl_display *display);
 int wl_display_flush(struct wl_display *display);
 struct wl_event_queue *wl_display_create_queue(struct wl_display *display);
 """
@@ -298,12 +305,32 @@ int
 wl_resource_get_version(struct wl_resource *resource);
 
 struct wl_client * wl_resource_get_client(struct wl_resource *resource);
+int
+wl_resource_instance_of(struct wl_resource *resource,
+                        const struct wl_interface *interface,
+                        const void *implementation);
 
 void
 wl_resource_add_destroy_listener(struct wl_resource *resource,
                                  struct wl_listener * listener);
 """
 
+# handles to the python objects of proxies and resources
+CDEF += """
+void pywayland_proxy_set_tag(struct wl_proxy *proxy);
+void *pywayland_proxy_get_handle(struct wl_object *object);
+void *pywayland_resource_get_handle(struct wl_object *object,
+                                    const struct wl_interface *interface);
+"""
+
+# dispatch with a timeout, when the linked libwayland provides it
+CDEF += """
+#define PYWAYLAND_HAS_DISPATCH_TIMEOUT ...
+int pywayland_display_dispatch_queue_timeout(struct wl_display *display,
+                                             struct wl_event_queue *queue,
+                                             double timeout);
+"""
+
 # anonymous file methods (from Weston)
 CDEF += """
 int
@@ -335,6 +362,7 @@ SOURCE = """
 #include <fcntl.h>
 #include <errno.h>
 #include <sys/types.h>
+#include <time.h>
 """
 
 SOURCE += """
@@ -344,6 +372,80 @@ struct wl_listener_container {
 };
 """
 
+SOURCE += """
+/* Proxies created by pywayland are tagged, so the dispatcher data of a proxy
+ * is only used as the handle to the python object when we have set it */
+static const char *const pywayland_proxy_tag = "pywayland";
+
+void
+pywayland_proxy_set_tag(struct wl_proxy *proxy)
+{
+    wl_proxy_set_tag(proxy, &pywayland_proxy_tag);
+}
+
+void *
+pywayland_proxy_get_handle(struct wl_object *object)
+{
+    struct wl_proxy *proxy = (struct wl_proxy *) object;
+
+    if (wl_proxy_get_tag(proxy) != &pywayland_proxy_tag)
+        return NULL;
+
+    return (void *) wl_proxy_get_listener(proxy);
+}
+
+/* Resources created by pywayland use the handle to the python object as both
+ * the implementation and the user data */
+void *
+pywayland_resource_get_handle(struct wl_object *object,
+                              const struct wl_interface *interface)
+{
+    struct wl_resource *resource = (struct wl_resource *) object;
+    void *data = wl_resource_get_user_data(resource);
+
+    if (!wl_resource_instance_of(resource, interface, data))
+        return NULL;
+
+    return data;
+}
+"""
+
+SOURCE += """
+/* wl_display_dispatch_timeout and wl_display_dispatch_queue_timeout were added
+ * in libwayland 1.23, the timeout is given in seconds, and the default queue is
+ * used when the queue is NULL */
+#if WAYLAND_VERSION_MAJOR > 1 || \\
+    (WAYLAND_VERSION_MAJOR == 1 && WAYLAND_VERSION_MINOR >= 23)
+#define PYWAYLAND_HAS_DISPATCH_TIMEOUT 1
+
+int
+pywayland_display_dispatch_queue_timeout(struct wl_display *display,
+                                         struct wl_event_queue *queue,
+                                         double timeout)
+{
+    struct timespec ts;
+
+    ts.tv_sec = (time_t) timeout;
+    ts.tv_nsec = (long) ((timeout - (double) ts.tv_sec) * 1e9);
+
+    if (queue == NULL)
+        return wl_display_dispatch_timeout(display, &ts);
+    return wl_display_dispatch_queue_timeout(display, queue, &ts);
+}
+#else
+#define PYWAYLAND_HAS_DISPATCH_TIMEOUT 0
+
+int
+pywayland_display_dispatch_queue_timeout(struct wl_display *display,
+                                         struct wl_event_queue *queue,
+                                         double timeout)
+{
+    errno = ENOSYS;
+    return -1;
+}
+#endif
+"""
+
 SOURCE += """
 /* This code is taken from Weston (MIT licensed) to provide access to anonymous
  * files with CLOEXEC set
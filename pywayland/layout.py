@@ -0,0 +1,67 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The layout of the package of the protocol modules output by the scanner
+
+This is imported by the runtime to load from the package without importing
+the scanner.
+"""
+
+# The name of the module of the compiled C interface tables, and of the cffi
+# build module used to compile it, in the package of the protocol modules
+C_TABLES_MODULE = "_interfaces"
+C_TABLES_BUILD_MODULE = "_interfaces_build"
+# The suffix of the file the docs of a protocol module are output to, when they
+# are stripped from the module
+DOCS_FILE_SUFFIX = "_docs.json"
+# The file the descriptor database of the interfaces is output to, and the
+# version of its format
+DESCRIPTORS_FILE = "_descriptors.marshal"
+DESCRIPTORS_FORMAT = 1
+
+# The lookup of the interfaces in the package of the protocol modules, which is
+# output after the index of the interfaces
+PACKAGE_LOOKUP = '''
+_CLASSES = {class_name: module for module, class_name in INTERFACES.values()}
+_MODULES = frozenset(module for module, _ in INTERFACES.values())
+
+
+def get_interface(name: str) -> type[Interface]:
+    """Get the interface class with the given interface name
+
+    Only the module of the protocol that defines the interface is imported.
+
+    :param name: The name of the interface, e.g. ``"wl_seat"``
+    :type name: `str`
+    """
+    module, class_name = INTERFACES[name]
+    interface: type[Interface] = getattr(
+        importlib.import_module(f"{__name__}.{module}"), class_name
+    )
+    return interface
+
+
+def __getattr__(name: str) -> Any:
+    # the protocol modules are only imported when they are first used
+    if name in _MODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _CLASSES:
+        module = importlib.import_module(f"{__name__}.{_CLASSES[name]}")
+        value = globals()[name] = getattr(module, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_MODULES, *_CLASSES})'''
@@ -20,9 +20,41 @@ associated with it.  These functions are invoked from the corresponding proxy
 and resource instances.
 """
 
+from __future__ import annotations
+
+import builtins
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .argument import Argument, ArgumentType  # noqa: F401
 from .globals import Global  # noqa: F401
 from .interface import Interface  # noqa: F401
 from .message import Message  # noqa: F401
 from .proxy import Proxy  # noqa: F401
 from .resource import Resource  # noqa: F401
+
+if TYPE_CHECKING:
+    from .descriptors import DescriptorDatabase  # noqa: F401
+    from .docs import load_docs  # noqa: F401
+    from .wire import WireCodec  # noqa: F401
+
+# The helpers that are not used by the protocol modules are only imported when
+# they are first used
+_LAZY = {
+    "DescriptorDatabase": "descriptors",
+    "load_docs": "docs",
+    "WireCodec": "wire",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        module = importlib.import_module(f"{__name__}.{_LAZY[name]}")
+        # the globals submodule shadows the builtin in the package namespace
+        value = builtins.globals()[name] = getattr(module, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*builtins.globals(), *_LAZY})
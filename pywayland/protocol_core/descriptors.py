@@ -0,0 +1,255 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import enum
+import marshal
+import os
+import threading
+from typing import TYPE_CHECKING, cast
+
+from pywayland.layout import DESCRIPTORS_FILE, DESCRIPTORS_FORMAT
+
+from .argument import Argument, ArgumentType
+from .globals import Global
+from .interface import Interface, InterfaceMeta
+from .proxy import Proxy
+from .resource import Resource
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from typing import Any
+
+    ArgumentDescriptor = tuple[str, str | None, bool]
+
+
+def _default_path() -> str:
+    """The descriptor database in the pywayland.protocol package"""
+    pywayland_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(pywayland_dir, "protocol", DESCRIPTORS_FILE)
+
+
+def _request_func(
+    name: str, opcode: int, arguments: list[Argument], destructor: bool
+) -> Callable[..., Any]:
+    """Build the method of the proxy class that sends the request
+
+    The arguments of the method are those of the generated method, i.e. a
+    `new_id` of known interface is not passed in, and a `new_id` with no
+    interface is passed in as the interface class and version.
+    """
+    new_id = next(
+        (
+            (index, argument)
+            for index, argument in enumerate(arguments)
+            if argument.argument_type == ArgumentType.NewId
+        ),
+        None,
+    )
+
+    if new_id is None:
+
+        def request(self: Proxy[Any], *args: Any) -> Any:
+            self._marshal(opcode, *args)
+            if destructor:
+                self._destroy()
+            return None
+
+    elif new_id[1].interface is None:
+        index = new_id[0]
+
+        def request(self: Proxy[Any], *args: Any) -> Any:
+            interface = args[index]
+            args = (*args[:index], interface.name, *args[index + 1 :])
+            return self._marshal_constructor(opcode, interface, *args)
+
+    else:
+        new_id_interface = new_id[1].interface
+
+        def request(self: Proxy[Any], *args: Any) -> Any:
+            return self._marshal_constructor(opcode, new_id_interface, *args)
+
+    request.__name__ = request.__qualname__ = name
+    return request
+
+
+def _event_func(name: str, opcode: int) -> Callable[..., Any]:
+    """Build the method of the resource class that posts the event"""
+
+    def event(self: Resource[Any], *args: Any) -> None:
+        self._post_event(opcode, *args)
+
+    event.__name__ = event.__qualname__ = name
+    return event
+
+
+class DescriptorDatabase:
+    """Interfaces built on demand from a descriptor database
+
+    The scanner outputs the descriptor database of the generated protocols
+    with ``--with-descriptors``, a single file with the messages, argument
+    types, enums and versions of all of the interfaces.  The interface
+    classes are built from the database when they are first looked up, along
+    with their proxy, resource and global classes, and the interfaces that
+    they reference, so none of the protocol modules are imported.
+
+    The classes behave as the classes of the generated modules, e.g. they can
+    be bound from the registry, but they are distinct classes, and have no
+    docstrings.
+
+    :param path:
+        Path of the descriptor database, defaults to the database in the
+        ``pywayland.protocol`` package
+    :type path: `str` or `None`
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        if path is None:
+            path = _default_path()
+
+        with open(path, "rb") as f:
+            try:
+                descriptors = marshal.load(f)
+            except (EOFError, TypeError, ValueError) as e:
+                raise ValueError(f"Invalid descriptor database: {path}") from e
+
+        if (
+            not isinstance(descriptors, dict)
+            or descriptors.get("format") != DESCRIPTORS_FORMAT
+        ):
+            raise ValueError(f"Unsupported descriptor database format: {path}")
+
+        self.path = path
+        self._descriptors: dict[str, dict[str, Any]] = descriptors["interfaces"]
+        self._interfaces: dict[str, type[Interface]] = {}
+        # building an interface builds the interfaces it references, which
+        # may reference the interface back, so the interfaces are only
+        # published once all of the interfaces being built are complete
+        self._lock = threading.RLock()
+        self._partial: dict[str, type[Interface]] = {}
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._descriptors
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._descriptors)
+
+    def __len__(self) -> int:
+        return len(self._descriptors)
+
+    def protocol(self, name: str) -> str:
+        """Get the name of the protocol module that defines the interface
+
+        :param name: The name of the interface, e.g. ``"wl_seat"``
+        :type name: `str`
+        """
+        protocol: str = self._descriptors[name]["protocol"]
+        return protocol
+
+    def get_interface(self, name: str) -> type[Interface]:
+        """Get the interface class with the given interface name
+
+        The class is built on the first lookup, later lookups return the same
+        class.
+
+        :param name: The name of the interface, e.g. ``"wl_seat"``
+        :type name: `str`
+        """
+        interface = self._interfaces.get(name)
+        if interface is not None:
+            return interface
+
+        with self._lock:
+            interface = self._interfaces.get(name) or self._partial.get(name)
+            if interface is not None:
+                return interface
+
+            outermost = not self._partial
+            try:
+                interface = self._build(name)
+                if outermost:
+                    self._interfaces.update(self._partial)
+            finally:
+                if outermost:
+                    self._partial.clear()
+            return interface
+
+    def _build(self, name: str) -> type[Interface]:
+        """Build the interface class, and the classes of the interface"""
+        descriptor = self._descriptors[name]
+        class_name = "".join(x.capitalize() for x in name.split("_"))
+
+        interface = cast(
+            "type[Interface]",
+            InterfaceMeta(
+                class_name,
+                (Interface,),
+                {
+                    "__module__": __name__,
+                    "__qualname__": class_name,
+                    "name": name,
+                    "version": descriptor["version"],
+                },
+            ),
+        )
+        # the interface is looked up while building the messages of the
+        # interfaces that reference it
+        self._partial[name] = interface
+
+        for enum_name, bitfield, entries in descriptor["enums"]:
+            enum_class = enum.IntFlag if bitfield else enum.IntEnum
+            setattr(
+                interface,
+                enum_name,
+                enum_class(  # type: ignore[call-arg]
+                    enum_name,
+                    entries,
+                    module=__name__,
+                    qualname=f"{class_name}.{enum_name}",
+                ),
+            )
+
+        requests: dict[str, Any] = {"__slots__": (), "interface": interface}
+        for opcode, (method_name, since, destructor, args) in enumerate(
+            descriptor["requests"]
+        ):
+            arguments = self._arguments(args)
+            func = _request_func(method_name, opcode, arguments, destructor)
+            interface.request(*arguments, version=since)(func)
+            requests[method_name] = func
+
+        events: dict[str, Any] = {"__slots__": (), "interface": interface}
+        for opcode, (method_name, since, _, args) in enumerate(descriptor["events"]):
+            func = _event_func(method_name, opcode)
+            interface.event(*self._arguments(args), version=since)(func)
+            events[method_name] = func
+
+        interface.proxy_class = type(f"{class_name}Proxy", (Proxy,), requests)
+        interface.resource_class = type(f"{class_name}Resource", (Resource,), events)
+        interface.global_class = type(
+            f"{class_name}Global", (Global,), {"interface": interface}
+        )
+        return interface
+
+    def _arguments(self, args: list[ArgumentDescriptor]) -> list[Argument]:
+        """Build the arguments of a message, and the interfaces they reference"""
+        return [
+            Argument(
+                ArgumentType[type_name],
+                interface=self.get_interface(iface) if iface is not None else None,
+                nullable=nullable,
+            )
+            for type_name, iface, nullable in args
+        ]
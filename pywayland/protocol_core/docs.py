@@ -0,0 +1,57 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+from pywayland.layout import DOCS_FILE_SUFFIX
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+
+def load_docs(module: ModuleType) -> bool:
+    """Load the docstrings of a protocol module generated without docs
+
+    Protocol modules generated by the scanner with ``--strip-docs`` have their
+    docstrings output to a json file next to the module.  This sets the
+    docstrings of the interfaces and methods of the module from the file, e.g.
+    so they are available to :func:`help`.
+
+    :param module: The protocol module
+    :type module: module
+    :returns:
+        True if the docs were loaded, False if the module does not have a docs
+        file
+    """
+    if module.__file__ is None:
+        return False
+
+    docs_path = os.path.splitext(module.__file__)[0] + DOCS_FILE_SUFFIX
+    if not os.path.exists(docs_path):
+        return False
+
+    with open(docs_path) as f:
+        docs: dict[str, str] = json.load(f)
+
+    for name, doc in docs.items():
+        obj = module
+        for attr in name.split("."):
+            obj = getattr(obj, attr)
+        obj.__doc__ = doc
+
+    return True
@@ -14,10 +14,14 @@
 
 from __future__ import annotations
 
+import importlib
+import threading
+from types import ModuleType
 from typing import TYPE_CHECKING
-from weakref import WeakKeyDictionary, WeakValueDictionary
+from weakref import WeakKeyDictionary
 
 from pywayland import ffi
+from pywayland.layout import C_TABLES_MODULE
 
 from .message import Message
 
@@ -34,19 +38,123 @@ weakkeydict: WeakKeyDictionary[ffi.WlInterfaceCData, tuple[object, ...]] = (
     WeakKeyDictionary()
 )
 
+# Guards the generation of the wl_interface structs, which is re-entered when
+# generating the structs of the referenced interfaces
+_gen_c_lock = threading.RLock()
+_partial_ptrs: dict[InterfaceMeta, ffi.WlInterfaceCData] = {}
+
+# The compiled C interface tables of each package of protocol modules, see
+# `pywayland-scanner --with-c-tables`, or None if they have not been built
+_c_tables: dict[str, ModuleType | None] = {}
+
 
 class InterfaceMeta(type):
     """Metaclass for Interfaces
 
-    Initializes empty lists for events and requests for the given class.
+    Initializes empty lists for events and requests for the given class.  The
+    cdata struct for the class is created on first use of the :attr:`_ptr` of
+    the class, using the static struct from the compiled C interface tables of
+    the protocol package when they have been built.
     """
 
+    name: str
+    version: int
+
     def __init__(self, name: str, bases: tuple[Any], dct: dict[Any, Any]):
         self.events: list[Message] = []
         self.requests: list[Message] = []
 
-        # Initialize the interface cdata
-        self._ptr: ffi.WlInterfaceCData = ffi.new("struct wl_interface *")
+        self._interface_ptr: ffi.WlInterfaceCData | None = None
+
+    @property
+    def _ptr(self) -> ffi.WlInterfaceCData:
+        """The wl_interface cdata struct for the interface
+
+        The struct is generated on first access, at which point all of the
+        messages of the interface must have been defined.
+        """
+        ptr = self._interface_ptr
+        if ptr is None:
+            ptr = self._gen_c()
+        return ptr
+
+    def _gen_c(self) -> ffi.WlInterfaceCData:
+        """Creates the wl_interface C struct
+
+        Generates the CFFI cdata for the wl_interface struct given by the
+        interface, along with the structs for the interfaces it references.
+        The struct is only generated once, later calls return the same
+        struct.  If the struct has been compiled into the C interface tables,
+        no struct is generated, and the static struct is used.
+        """
+        with _gen_c_lock:
+            ptr = self._interface_ptr
+            if ptr is not None:
+                return ptr
+
+            ptr = self._c_tables_ptr()
+            if ptr is not None:
+                self._interface_ptr = ptr
+                return ptr
+
+            # When interfaces reference each other, the struct that is still
+            # being filled is used by the other interfaces
+            ptr = _partial_ptrs.get(self)
+            if ptr is not None:
+                return ptr
+
+            ptr = ffi.new("struct wl_interface *")
+            _partial_ptrs[self] = ptr
+            try:
+                _fill_interface(
+                    ptr, self.name, self.version, self.requests, self.events
+                )
+            finally:
+                del _partial_ptrs[self]
+
+            # only publish the struct once it is complete, other threads can
+            # use it without taking the lock
+            self._interface_ptr = ptr
+            return ptr
+
+    def _c_tables_ptr(self) -> ffi.WlInterfaceCData | None:
+        """Get the wl_interface struct from the compiled C interface tables
+
+        Returns None if the tables of the package of the interface have not
+        been built, or do not match the interface, e.g. when the protocol
+        modules were generated again without building the tables.  The
+        signatures of all of the messages are compared, not just their
+        number.
+        """
+        package, _, module = self.__module__.rpartition(".")
+        if not package:
+            return None
+
+        if package not in _c_tables:
+            try:
+                _c_tables[package] = importlib.import_module(
+                    f"{package}.{C_TABLES_MODULE}"
+                )
+            except ImportError:
+                _c_tables[package] = None
+
+        tables = _c_tables[package]
+        if tables is None:
+            return None
+
+        static_ptr = getattr(tables.lib, f"{module}__{self.name}", None)
+        if static_ptr is None:
+            return None
+
+        # the tables are built with their own ffi
+        ptr: ffi.WlInterfaceCData = ffi.cast(
+            "struct wl_interface *", tables.ffi.cast("uintptr_t", static_ptr)
+        )
+        if not _matches_interface(
+            ptr, self.name, self.version, self.requests, self.events
+        ):
+            return None
+        return ptr
 
 
 class Interface(metaclass=InterfaceMeta):
@@ -66,7 +174,6 @@ class Interface(metaclass=InterfaceMeta):
     proxy_class: type[Proxy[Any]]
     resource_class: type[Resource[Any]]
     global_class: type[Global[Any]]
-    registry: WeakValueDictionary[ffi.WlObjectCData | ffi.WlProxyCData, Proxy[Any]]
 
     @classmethod
     def event(
@@ -105,47 +212,87 @@ class Interface(metaclass=InterfaceMeta):
         """
 
         def wrapper(func: Callable[..., Any]) -> Callable[..., Any]:
-            cls.requests.append(Message(func, arguments, version))
+            cls.requests.append(Message(func, arguments, version, server=True))
             return func
 
         return wrapper
 
-    @classmethod
-    def _gen_c(cls) -> None:
-        """Creates the wl_interface C struct
 
-        Generates the CFFI cdata for the wl_interface struct given by the
-        interface.
-        """
-        cls.registry = WeakValueDictionary()
-
-        name: ffi.CharCData = ffi.new("char[]", cls.name.encode())
-        cls._ptr.name = name
-        cls._ptr.version = cls.version
-
-        keep_alive: list[
-            tuple[
-                ffi.CharCData,
-                ffi.CharCData,
-                ffi.WlInterfaceCData,
-            ]
-        ] = []
-        # Determine the number of methods to assign and assign them
-        cls._ptr.method_count = len(cls.requests)
-        methods_ptr: ffi.WlMessageCData = ffi.new(
-            "struct wl_message[]", len(cls.requests)
-        )
-        cls._ptr.methods = methods_ptr
-
-        # Iterate over the methods
-        for i, message in enumerate(cls.requests):
-            keep_alive.append(message.build_message_struct(methods_ptr[i]))
+def _matches_interface(
+    ptr: ffi.WlInterfaceCData,
+    name: str,
+    version: int,
+    requests: list[Message],
+    events: list[Message],
+) -> bool:
+    """If the wl_interface struct is the struct of the interface
 
-        cls._ptr.event_count = len(cls.events)
-        events_ptr: ffi.WlMessageCData = ffi.new("struct wl_message[]", len(cls.events))
-        cls._ptr.events = events_ptr
-        # Iterate over the methods
-        for i, message in enumerate(cls.events):
-            keep_alive.append(message.build_message_struct(events_ptr[i]))
-
-        weakkeydict[cls._ptr] = (name, methods_ptr, events_ptr, *tuple(keep_alive))
+    The name, signature and argument interfaces of each message must match,
+    the referenced interfaces are compared by name.
+    """
+    if ptr.version != version or ffi.string(ptr.name).decode() != name:
+        return False
+
+    for c_messages, count, messages in (
+        (ptr.methods, ptr.method_count, requests),
+        (ptr.events, ptr.event_count, events),
+    ):
+        if count != len(messages):
+            return False
+        for i, message in enumerate(messages):
+            c_message = c_messages[i]
+            if (
+                ffi.string(c_message.name).decode() != message.name
+                or ffi.string(c_message.signature).decode() != message.signature
+            ):
+                return False
+            for j, argument in enumerate(message._marshaled_arguments):
+                c_type = c_message.types[j]
+                if argument.interface is None:
+                    if c_type != ffi.NULL:
+                        return False
+                elif (
+                    c_type == ffi.NULL
+                    or ffi.string(c_type.name).decode() != argument.interface.name
+                ):
+                    return False
+
+    return True
+
+
+def _fill_interface(
+    ptr: ffi.WlInterfaceCData,
+    name: str,
+    version: int,
+    requests: list[Message],
+    events: list[Message],
+) -> None:
+    """Fill in the wl_interface struct with the messages of the interface"""
+    name_ptr: ffi.CharCData = ffi.new("char[]", name.encode())
+    ptr.name = name_ptr
+    ptr.version = version
+
+    keep_alive: list[
+        tuple[
+            ffi.CharCData,
+            ffi.CharCData,
+            ffi.WlInterfaceCData,
+        ]
+    ] = []
+    # Determine the number of methods to assign and assign them
+    ptr.method_count = len(requests)
+    methods_ptr: ffi.WlMessageCData = ffi.new("struct wl_message[]", len(requests))
+    ptr.methods = methods_ptr
+
+    # Iterate over the methods
+    for i, message in enumerate(requests):
+        keep_alive.append(message.build_message_struct(methods_ptr[i]))
+
+    ptr.event_count = len(events)
+    events_ptr: ffi.WlMessageCData = ffi.new("struct wl_message[]", len(events))
+    ptr.events = events_ptr
+    # Iterate over the methods
+    for i, message in enumerate(events):
+        keep_alive.append(message.build_message_struct(events_ptr[i]))
+
+    weakkeydict[ptr] = (name_ptr, methods_ptr, events_ptr, *tuple(keep_alive))
@@ -14,8 +14,10 @@
 
 from __future__ import annotations
 
+import threading
+from functools import cached_property
 from operator import attrgetter
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 from weakref import WeakKeyDictionary
 
 from pywayland import ffi, lib
@@ -24,14 +26,72 @@ from .argument import Argument, ArgumentType
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable
-    from typing import Any
+    from typing import Any, TypeAlias
 
-    from pywayland.protocol_core import Proxy
+    from typing_extensions import Buffer
+
+    from pywayland.client import Display as ClientDisplay
+    from pywayland.protocol_core import Proxy, Resource
+
+    from .interface import Interface
+
+    ArgumentValue: TypeAlias = (
+        int
+        | float
+        | str
+        | bytes
+        | memoryview
+        | Proxy[Any]
+        | Resource[Any]
+        | ffi.CData
+        | None
+    )
+    Encoder = Callable[[ffi.WlArgumentCData, Any, list[ffi.CData]], None]
+    Decoder = Callable[[ffi.WlArgumentCData], ArgumentValue]
 
 weakkeydict: WeakKeyDictionary[ffi.WlArgumentCData, tuple[ffi.CData, ...]] = (
     WeakKeyDictionary()
 )
 
+# The maximum number of arguments libwayland accepts for a message
+# (WL_CLOSURE_MAX_ARGS), used to size the scratch argument arrays
+MAX_ARGS = 20
+
+
+class MarshaledArguments:
+    """A filled `wl_argument` array, along with the cdata it points to
+
+    The array, and anything it references, is only valid until
+    :meth:`release` is called, so it must be passed to the C function that
+    copies the message (e.g. `wl_proxy_marshal_array`) before then.
+
+    :param size: The number of arguments in the array
+    :type size: `int`
+    """
+
+    __slots__ = ("args_ptr", "in_use", "refs")
+
+    def __init__(self, size: int) -> None:
+        self.args_ptr: ffi.WlArgumentCData = ffi.new("union wl_argument []", size)
+        self.refs: list[ffi.CData] = []
+        self.in_use = False
+
+    def release(self) -> None:
+        """Release the argument cdata, allowing the array to be reused"""
+        if self.refs:
+            self.refs.clear()
+        self.in_use = False
+
+
+class _ScratchArguments(threading.local):
+    """Per-thread argument array that is reused to marshal messages"""
+
+    def __init__(self) -> None:
+        self.arguments = MarshaledArguments(MAX_ARGS)
+
+
+_scratch = _ScratchArguments()
+
 
 class Message:
     """Wrapper class for `wl_message` structs
@@ -46,6 +106,10 @@ class Message:
     :type arguments: tuple of :class:`~pywayland.protocol_core.Argument`
     :param version: The version of the message, or None
     :type version: int or None
+    :param server:
+        If the message is received by server side resources (i.e. it is a
+        request), otherwise it is received by client side proxies
+    :type server: bool
     """
 
     def __init__(
@@ -53,12 +117,141 @@ class Message:
         func: Callable[..., Any],
         arguments: tuple[Argument, ...],
         version: int | None,
+        server: bool = False,
     ) -> None:
         self.py_func = func
 
         self.name = func.__name__.strip("_")
         self.arguments = arguments
         self.version = version
+        # The plans used to marshal and convert the arguments are built by the
+        # cached properties below on the first message that is sent or
+        # received rather than when the protocol module is imported, after
+        # which each call only has to fill or read the argument array
+        self._server = server
+
+    @cached_property
+    def _nargs(self) -> int:
+        return sum(1 for _ in self._marshaled_arguments)
+
+    @cached_property
+    def _encoders(self) -> tuple[tuple[int, Encoder], ...]:
+        # New id slots are left zeroed (null) and are assigned on marshal, they
+        # do not consume an arg
+        return tuple(
+            (index, _build_encoder(argument))
+            for index, argument in enumerate(self._marshaled_arguments)
+            if argument.argument_type != ArgumentType.NewId
+        )
+
+    @cached_property
+    def _new_id_slots(self) -> tuple[int, ...]:
+        return tuple(
+            index
+            for index, argument in enumerate(self._marshaled_arguments)
+            if argument.argument_type == ArgumentType.NewId
+        )
+
+    @cached_property
+    def _decode_plan(
+        self,
+    ) -> tuple[
+        tuple[tuple[int, Decoder], ...], tuple[tuple[int, type[Interface]], ...]
+    ]:
+        decoders: list[tuple[int, Decoder]] = []
+        new_ids: list[tuple[int, type[Interface]]] = []
+        for index, argument in enumerate(self._marshaled_arguments):
+            decoder = _build_decoder(self.name, argument, self._server)
+            if decoder is None:
+                continue
+            # New ids are decoded to the proxy pointer, and the proxy is
+            # created on the display of the object receiving the message
+            if (
+                argument.argument_type == ArgumentType.NewId
+                and argument.interface is not None
+            ):
+                new_ids.append((len(decoders), argument.interface))
+            decoders.append((index, decoder))
+        return tuple(decoders), tuple(new_ids)
+
+    @cached_property
+    def _decoders(self) -> tuple[tuple[int, Decoder], ...]:
+        return self._decode_plan[0]
+
+    @cached_property
+    def _new_ids(self) -> tuple[tuple[int, type[Interface]], ...]:
+        return self._decode_plan[1]
+
+    @cached_property
+    def _view_decoders(self) -> tuple[tuple[int, Decoder], ...]:
+        # Arrays can instead be decoded to views of the received data
+        return tuple(
+            (index, _decode_array_view if decode is _decode_array else decode)
+            for index, decode in self._decoders
+        )
+
+    @cached_property
+    def slots(self) -> tuple[int, ...]:
+        """The slot of each argument in the `wl_argument` array
+
+        Untyped new ids are preceded by the interface name and version.
+        """
+        slots: list[int] = []
+        slot = 0
+        for argument in self.arguments:
+            if (
+                argument.argument_type == ArgumentType.NewId
+                and argument.interface is None
+            ):
+                slot += 2
+            slots.append(slot)
+            slot += 1
+        return tuple(slots)
+
+    @cached_property
+    def _raw_decoders(self) -> tuple[Decoder | None, ...]:
+        # The decoder used to read each argument on its own for raw callbacks,
+        # typed new objects are only created when the message is converted as
+        # a whole
+        return tuple(
+            None
+            if argument.argument_type == ArgumentType.NewId
+            and argument.interface is not None
+            else _build_decoder(self.name, argument, self._server)
+            for argument in self.arguments
+        )
+
+    @cached_property
+    def has_typed_new_id(self) -> bool:
+        """If the message creates a new object of a known interface"""
+        return any(
+            argument.argument_type == ArgumentType.NewId
+            and argument.interface is not None
+            for argument in self.arguments
+        )
+
+    def decode_argument(self, args_ptr: ffi.WlArgumentCData, index: int) -> Any:
+        """Convert a single received argument
+
+        :param args_ptr: Input arguments
+        :type args_ptr: cdata `union wl_argument []`
+        :param index: The index of the argument in :attr:`arguments`
+        :type index: `int`
+        """
+        decode = self._raw_decoders[index]
+        if decode is None:
+            raise TypeError(
+                f"Argument {index} of '{self.name}' cannot be converted on its own"
+            )
+        return decode(args_ptr[self.slots[index]])
+
+    @property
+    def signature(self) -> str:
+        """The signature of the message, as in the wl_message struct"""
+        signature = "".join(argument.signature for argument in self.arguments)
+        if self.version is not None:
+            signature = f"{self.version}{signature}"
+        return signature
 
     @property
     def _marshaled_arguments(self) -> Iterable[Argument]:
@@ -83,17 +276,11 @@ class Message:
             A tuple of elements which must be kept alive for the message struct
             to remain valid.
         """
-        signature = "".join(argument.signature for argument in self.arguments)
-        if self.version is not None:
-            signature = f"{self.version}{signature}"
-
         name: ffi.CharCData = ffi.new("char[]", self.name.encode())
         wl_message_struct.name = name
-        cdata_signature: ffi.CharCData = ffi.new("char[]", signature.encode())
+        cdata_signature: ffi.CharCData = ffi.new("char[]", self.signature.encode())
         wl_message_struct.signature = cdata_signature
-        types: ffi.WlInterfaceCData = ffi.new(
-            "struct wl_interface* []", len(list(self._marshaled_arguments))
-        )
+        types: ffi.WlInterfaceCData = ffi.new("struct wl_interface* []", self._nargs)
         wl_message_struct.types = types
 
         for index, argument in enumerate(self._marshaled_arguments):
@@ -106,8 +293,11 @@ class Message:
         return name, cdata_signature, types
 
     def c_to_arguments(
-        self, args_ptr: ffi.WlArgumentCData
-    ) -> list[int | float | str | bytearray | Proxy[Any] | ffi.CData | None]:
+        self,
+        args_ptr: ffi.WlArgumentCData,
+        display: ClientDisplay | None = None,
+        array_views: bool = False,
+    ) -> list[ArgumentValue]:
         """Create a list of arguments
 
         Generate the arguments of the method from a CFFI cdata array of
@@ -116,66 +306,25 @@ class Message:
 
         :param args_ptr: Input arguments
         :type args_ptr: cdata `union wl_argument []`
+        :param display:
+            The display that the receiving proxy belongs to, new objects are
+            created on this display.
+        :type display: :class:`~pywayland.client.Display` or None
+        :param array_views:
+            If set, array arguments are given as read-only `memoryview`'s of
+            the received data rather than copied, which are only valid as long
+            as `args_ptr` is.
+        :type array_views: `bool`
         :returns: list of args
         """
-        args: list[int | float | str | bytearray | Proxy[Any] | ffi.CData | None] = []
-        proxy_ptr: ffi.WlProxyCData
-        for i, argument in enumerate(self.arguments):
-            arg_ptr = args_ptr[i]
-
-            # Match numbers (int, unsigned, float, file descriptor)
-            if argument.argument_type == ArgumentType.Int:
-                args.append(arg_ptr.i)
-            elif argument.argument_type == ArgumentType.Uint:
-                args.append(arg_ptr.u)
-            elif argument.argument_type == ArgumentType.Fixed:
-                f = lib.wl_fixed_to_double(arg_ptr.f)
-                args.append(f)
-            elif argument.argument_type == ArgumentType.FileDescriptor:
-                args.append(arg_ptr.h)
-            elif argument.argument_type == ArgumentType.String:
-                if arg_ptr == ffi.NULL:
-                    if not argument.nullable:
-                        raise Exception
-                    args.append(None)
-                else:
-                    args.append(ffi.string(arg_ptr.s).decode())
-            elif argument.argument_type == ArgumentType.Object:
-                if arg_ptr.o == ffi.NULL:
-                    if not argument.nullable:
-                        message = f"Got null object parsing arguments for '{self.name}' message, may already be destroyed"
-                        raise RuntimeError(message)
-                    args.append(None)
-                else:
-                    iface = argument.interface
-                    if iface is None:
-                        continue
-                    proxy_ptr = ffi.cast("struct wl_proxy *", arg_ptr.o)
-                    obj = iface.registry.get(proxy_ptr)
-                    if obj is None:
-                        raise RuntimeError(
-                            f"Unable to get object for {proxy_ptr}, was it garbage collected?"
-                        )
-                    args.append(obj)
-            elif argument.argument_type == ArgumentType.NewId:
-                from pywayland.protocol.wayland import WlRegistry
-
-                if (
-                    display := next(
-                        map(attrgetter("_display"), WlRegistry.registry.values()), None
-                    )
-                ) is None:
-                    raise RuntimeError("Cannot find display")
-                iface = argument.interface
-                assert iface
-                proxy_ptr = ffi.cast("struct wl_proxy *", arg_ptr.o)
-                obj = iface.proxy_class(proxy_ptr, display)
-                args.append(obj)
-            elif argument.argument_type == ArgumentType.Array:
-                array_ptr = arg_ptr.a
-                args.append(ffi.buffer(array_ptr.data, array_ptr.size)[:])
-            else:
-                raise Exception(f"Bad argument: {argument}")
+        decoders = self._view_decoders if array_views else self._decoders
+        args = [decode(args_ptr[index]) for index, decode in decoders]
+
+        for position, iface in self._new_ids:
+            if display is None:
+                raise RuntimeError("Cannot find display")
+            proxy_ptr = cast("ffi.WlProxyCData", args[position])
+            args[position] = iface.proxy_class(proxy_ptr, display)
 
         return args
 
@@ -189,62 +338,251 @@ class Message:
         :type args: `list`
         :returns: cdata `union wl_argument []` of args
         """
-        nargs = len(list(self._marshaled_arguments))
-        args_ptr: ffi.WlArgumentCData = ffi.new("union wl_argument []", nargs)
+        if len(args) != len(self._encoders):
+            raise TypeError(
+                f"'{self.name}' takes {len(self._encoders)} arguments, got {len(args)}"
+            )
 
-        arg_iter = iter(args)
-        refs: list[ffi.CData] = []
-        for i, argument in enumerate(self._marshaled_arguments):
-            # New id (set to null for now, will be assigned on marshal)
-            # Then, continue so we don't consume an arg
-            if argument.argument_type == ArgumentType.NewId:
-                args_ptr[i].o = ffi.NULL
-                continue
+        args_ptr: ffi.WlArgumentCData = ffi.new("union wl_argument []", self._nargs)
 
-            arg = next(arg_iter)
-            # Match numbers (int, unsigned, float, file descriptor)
-            if argument.argument_type == ArgumentType.Int:
-                args_ptr[i].i = arg
-            elif argument.argument_type == ArgumentType.Uint:
-                args_ptr[i].u = arg
-            elif argument.argument_type == ArgumentType.Fixed:
-                if isinstance(arg, int):
-                    f = lib.wl_fixed_from_int(arg)
-                else:
-                    f = lib.wl_fixed_from_double(arg)
-                args_ptr[i].f = f
-            elif argument.argument_type == ArgumentType.FileDescriptor:
-                args_ptr[i].h = arg
-            elif argument.argument_type == ArgumentType.String:
-                new_string: ffi.CharCData
-                if arg is None:
-                    if not argument.nullable:
-                        raise Exception
-                    new_string = ffi.NULL
-                else:
-                    new_string = ffi.new("char []", arg.encode())
-                    refs.append(new_string)
-                args_ptr[i].s = new_string
-            elif argument.argument_type == ArgumentType.Object:
-                new_obj: ffi.WlObjectCData
-                if arg is None:
-                    if not argument.nullable:
-                        raise Exception
-                    new_obj = ffi.NULL
-                else:
-                    new_obj = ffi.cast("struct wl_object *", arg._ptr)
-                    refs.append(new_obj)
-                args_ptr[i].o = new_obj
-            elif argument.argument_type == ArgumentType.Array:
-                # TODO: this is a bit messy, we probably don't want to put everything in one buffer like this
-                new_array: ffi.WlArrayCData = ffi.new("struct wl_array *")
-                new_data: ffi.CData = ffi.new("void []", len(arg))
-                new_array.alloc = new_array.size = len(arg)
-                ffi.buffer(new_data)[:] = arg
-                refs.append(new_array)
-                refs.append(new_data)
+        refs: list[ffi.CData] = []
+        for (index, encode), arg in zip(self._encoders, args):
+            encode(args_ptr[index], arg, refs)
 
         if len(refs) > 0:
             weakkeydict[args_ptr] = tuple(refs)
 
         return args_ptr
+
+    def marshal_arguments(self, *args: Any) -> MarshaledArguments:
+        """Fill an array of `wl_argument` C structs to marshal the message
+
+        Like :meth:`arguments_to_c`, but rather than allocating a new array
+        for each message, a scratch array of the calling thread is reused.
+        The array is valid until :meth:`MarshaledArguments.release` is called,
+        which drops the temporary cdata for the arguments::
+
+            arguments = message.marshal_arguments(*args)
+            try:
+                lib.wl_proxy_marshal_array(proxy, opcode, arguments.args_ptr)
+            finally:
+                arguments.release()
+
+        :param args: Input arguments
+        :type args: `list`
+        :returns: The :class:`MarshaledArguments` holding the args array
+        """
+        if len(args) != len(self._encoders):
+            raise TypeError(
+                f"'{self.name}' takes {len(self._encoders)} arguments, got {len(args)}"
+            )
+
+        arguments = _scratch.arguments
+        if arguments.in_use or self._nargs > MAX_ARGS:
+            # the scratch array is already being marshaled on this thread
+            # (e.g. from a finalizer), fall back to a new array
+            arguments = MarshaledArguments(self._nargs)
+        arguments.in_use = True
+
+        args_ptr = arguments.args_ptr
+        refs = arguments.refs
+        try:
+            for (index, encode), arg in zip(self._encoders, args):
+                encode(args_ptr[index], arg, refs)
+        except BaseException:
+            arguments.release()
+            raise
+        # the array holds the values of the last message, new ids are expected
+        # to be null when they are marshaled
+        for index in self._new_id_slots:
+            args_ptr[index].o = ffi.NULL
+
+        return arguments
+
+
+def _encode_int(arg_ptr: ffi.WlArgumentCData, arg: int, refs: list[ffi.CData]) -> None:
+    arg_ptr.i = arg
+
+
+def _encode_uint(arg_ptr: ffi.WlArgumentCData, arg: int, refs: list[ffi.CData]) -> None:
+    arg_ptr.u = arg
+
+
+def _encode_fixed(
+    arg_ptr: ffi.WlArgumentCData, arg: float, refs: list[ffi.CData]
+) -> None:
+    if isinstance(arg, int):
+        arg_ptr.f = lib.wl_fixed_from_int(arg)
+    else:
+        arg_ptr.f = lib.wl_fixed_from_double(arg)
+
+
+def _encode_fd(arg_ptr: ffi.WlArgumentCData, arg: int, refs: list[ffi.CData]) -> None:
+    arg_ptr.h = arg
+
+
+def _encode_string(
+    arg_ptr: ffi.WlArgumentCData, arg: str, refs: list[ffi.CData]
+) -> None:
+    new_string: ffi.CharCData = ffi.new("char []", arg.encode())
+    refs.append(new_string)
+    arg_ptr.s = new_string
+
+
+def _encode_object(
+    arg_ptr: ffi.WlArgumentCData, arg: Any, refs: list[ffi.CData]
+) -> None:
+    arg_ptr.o = ffi.cast("struct wl_object *", arg._ptr)
+
+
+def _encode_array(
+    arg_ptr: ffi.WlArgumentCData, arg: Buffer, refs: list[ffi.CData]
+) -> None:
+    # point the array at the memory of the buffer, rather than copying it
+    new_data: ffi.CharCData = ffi.from_buffer("char []", arg)
+    new_array: ffi.WlArrayCData = ffi.new("struct wl_array *")
+    new_array.alloc = new_array.size = len(new_data)
+    new_array.data = new_data
+    refs.append(new_array)
+    refs.append(new_data)
+    arg_ptr.a = new_array
+
+
+def _nullable(encode: Encoder, member: str) -> Encoder:
+    """Wrap an encoder so that `None` is marshaled as a null pointer"""
+
+    def encode_nullable(
+        arg_ptr: ffi.WlArgumentCData, arg: Any, refs: list[ffi.CData]
+    ) -> None:
+        if arg is None:
+            # the array may be reused, so the pointer must be explicitly set
+            setattr(arg_ptr, member, ffi.NULL)
+        else:
+            encode(arg_ptr, arg, refs)
+
+    return encode_nullable
+
+
+def _non_nullable(encode: Encoder) -> Encoder:
+    """Wrap an encoder so that `None` is rejected"""
+
+    def encode_non_nullable(
+        arg_ptr: ffi.WlArgumentCData, arg: Any, refs: list[ffi.CData]
+    ) -> None:
+        if arg is None:
+            raise Exception
+        encode(arg_ptr, arg, refs)
+
+    return encode_non_nullable
+
+
+def _build_encoder(argument: Argument) -> Encoder:
+    """Select the function that fills a `wl_argument` for the given argument"""
+    encode: Encoder
+    member: str
+    # Match numbers (int, unsigned, float, file descriptor)
+    if argument.argument_type == ArgumentType.Int:
+        return _encode_int
+    elif argument.argument_type == ArgumentType.Uint:
+        return _encode_uint
+    elif argument.argument_type == ArgumentType.Fixed:
+        return _encode_fixed
+    elif argument.argument_type == ArgumentType.FileDescriptor:
+        return _encode_fd
+    elif argument.argument_type == ArgumentType.String:
+        encode, member = _encode_string, "s"
+    elif argument.argument_type == ArgumentType.Object:
+        encode, member = _encode_object, "o"
+    elif argument.argument_type == ArgumentType.Array:
+        encode, member = _encode_array, "a"
+    else:
+        raise Exception(f"Bad argument: {argument}")
+
+    if argument.nullable:
+        return _nullable(encode, member)
+    return _non_nullable(encode)
+
+
+def _decode_fixed(arg_ptr: ffi.WlArgumentCData) -> float:
+    return lib.wl_fixed_to_double(arg_ptr.f)
+
+
+def _decode_new_id(arg_ptr: ffi.WlArgumentCData) -> ffi.WlProxyCData:
+    return ffi.cast("struct wl_proxy *", arg_ptr.o)
+
+
+def _decode_array(arg_ptr: ffi.WlArgumentCData) -> bytes:
+    array_ptr = arg_ptr.a
+    return bytes(ffi.buffer(array_ptr.data, array_ptr.size))
+
+
+def _decode_array_view(arg_ptr: ffi.WlArgumentCData) -> memoryview:
+    array_ptr = arg_ptr.a
+    return memoryview(ffi.buffer(array_ptr.data, array_ptr.size)).toreadonly()
+
+
+def _build_decoder(
+    message_name: str, argument: Argument, server: bool
+) -> Decoder | None:
+    """Select the function that reads a `wl_argument` for the given argument
+
+    Returns None for arguments that cannot be converted, which are skipped.
+    """
+    # Match numbers (int, unsigned, float, file descriptor)
+    if argument.argument_type == ArgumentType.Int:
+        return attrgetter("i")
+    elif argument.argument_type == ArgumentType.Uint:
+        return attrgetter("u")
+    elif argument.argument_type == ArgumentType.Fixed:
+        return _decode_fixed
+    elif argument.argument_type == ArgumentType.FileDescriptor:
+        return attrgetter("h")
+    elif argument.argument_type == ArgumentType.String:
+        nullable = argument.nullable
+
+        def decode_string(arg_ptr: ffi.WlArgumentCData) -> str | None:
+            if arg_ptr.s == ffi.NULL:
+                if not nullable:
+                    raise Exception
+                return None
+            return ffi.string(arg_ptr.s).decode()
+
+        return decode_string
+    elif argument.argument_type == ArgumentType.Object:
+        iface = argument.interface
+        # Resources can only be checked against their interface, untyped
+        # objects received by the server cannot be converted
+        if server and iface is None:
+            return None
+        nullable = argument.nullable
+
+        def decode_object(
+            arg_ptr: ffi.WlArgumentCData,
+        ) -> Proxy[Any] | Resource[Any] | None:
+            if arg_ptr.o == ffi.NULL:
+                if not nullable:
+                    message = f"Got null object parsing arguments for '{message_name}' message, may already be destroyed"
+                    raise RuntimeError(message)
+                return None
+            if server:
+                assert iface is not None
+                handle = lib.pywayland_resource_get_handle(arg_ptr.o, iface._ptr)
+            else:
+                handle = lib.pywayland_proxy_get_handle(arg_ptr.o)
+            if handle == ffi.NULL:
+                raise RuntimeError(
+                    f"Unable to get object for {arg_ptr.o}, was it created by pywayland?"
+                )
+            obj: Proxy[Any] | Resource[Any] = ffi.from_handle(handle)
+            return obj
+
+        return decode_object
+    elif argument.argument_type == ArgumentType.NewId:
+        # Without an interface, only the id of the new object is known
+        if argument.interface is None:
+            return attrgetter("n")
+        return _decode_new_id
+    elif argument.argument_type == ArgumentType.Array:
+        return _decode_array
+    else:
+        raise Exception(f"Bad argument: {argument}")
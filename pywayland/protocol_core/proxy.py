@@ -17,13 +17,14 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Generic, TypeVar
 
 from pywayland import ffi, lib
-from pywayland.dispatcher import Dispatcher
+from pywayland.dispatcher import Dispatcher, DispatcherDefaults, SharedDispatcher
 from pywayland.utils import ensure_valid
 
 if TYPE_CHECKING:
     from typing import Any, Self
 
     from pywayland.client import Display as ClientDisplay
+    from pywayland.client import EventQueue
 
     from .interface import Interface
 
@@ -47,7 +48,17 @@ class Proxy(Generic[T]):
     :type display: :class:`~pywayland.client.Display` or Self or None
     """
 
+    __slots__ = (
+        "__weakref__",
+        "_dispatcher",
+        "_display",
+        "_handle",
+        "_ptr",
+        "user_data",
+    )
+
     interface: type[T]
+    dispatcher_defaults = DispatcherDefaults("events")
 
     def __init__(
         self, ptr: ffi.WlProxyCData | None, display: ClientDisplay | Self | None = None
@@ -55,7 +66,7 @@ class Proxy(Generic[T]):
         self._ptr: ffi.WlProxyCData | None
         self._display: ClientDisplay | Self | None
         self.user_data: Any = None
-        self.dispatcher = Dispatcher(self.interface.events)
+        self._dispatcher = type(self).dispatcher_defaults
 
         # This should only be true for wl_display proxies, as they will
         # initialize its pointer on a `.connect()` call
@@ -87,8 +98,27 @@ class Proxy(Generic[T]):
         lib.wl_proxy_add_dispatcher(
             self._ptr, lib.dispatcher_func, self._handle, ffi.NULL
         )
+        # mark the proxy as ours, so the handle can be retrieved when the proxy
+        # is passed as an argument
+        lib.pywayland_proxy_set_tag(self._ptr)
+
+    @property
+    def dispatcher(self) -> Dispatcher:
+        """The dispatcher for the events of the proxy
+
+        Until a callback is set on it, the proxy uses the
+        :attr:`dispatcher_defaults` shared by its class.  On the first change,
+        the proxy gets its own copy of the defaults, so the callbacks set on
+        it only apply to this proxy.
+        """
+        dispatcher = self._dispatcher
+        if dispatcher is type(self).dispatcher_defaults:
+            return SharedDispatcher(self)
+        return dispatcher
 
-        self.interface.registry[self._ptr] = self
+    @dispatcher.setter
+    def dispatcher(self, dispatcher: Dispatcher) -> None:
+        self._dispatcher = dispatcher
 
     @property
     def destroyed(self) -> bool:
@@ -109,29 +139,56 @@ class Proxy(Generic[T]):
 
     destroy = _destroy
 
+    @ensure_valid
+    def set_queue(self, queue: EventQueue | None) -> None:
+        """Assign the proxy to an event queue
+
+        The events of the proxy are queued onto the given queue, and are
+        dispatched by dispatching the queue.  The proxies created by requests
+        on the proxy are also assigned to the queue.
+
+        :param queue:
+            The queue to assign the proxy to, or `None` to use the default
+            display queue
+        :type queue: :class:`~pywayland.client.EventQueue` or `None`
+        """
+        assert self._ptr is not None
+        proxy: ffi.WlProxyCData = ffi.cast("struct wl_proxy *", self._ptr)
+        if queue is None:
+            lib.wl_proxy_set_queue(proxy, ffi.NULL)
+        else:
+            assert queue._ptr is not None
+            lib.wl_proxy_set_queue(proxy, queue._ptr)
+
     @ensure_valid
     def _marshal(self, opcode: int, *args: Any) -> None:
         """Marshal the given arguments into the Wayland wire format"""
         assert self._ptr is not None
-        # Create wl_argument array
-        args_ptr = self.interface.requests[opcode].arguments_to_c(*args)
-
-        # Write the event into the connection queue
         proxy: ffi.WlProxyCData = ffi.cast("struct wl_proxy *", self._ptr)
-        lib.wl_proxy_marshal_array(proxy, opcode, args_ptr)
+
+        # Fill the wl_argument array and write the event into the connection
+        # queue, which copies the arguments
+        arguments = self.interface.requests[opcode].marshal_arguments(*args)
+        try:
+            lib.wl_proxy_marshal_array(proxy, opcode, arguments.args_ptr)
+        finally:
+            arguments.release()
 
     def _marshal_constructor(
         self, opcode: int, interface: type[InterfaceT], *args: Any
     ) -> Proxy[InterfaceT]:
         """Marshal the given arguments into the Wayland wire format for a constructor"""
         assert self._ptr is not None
-        # Create wl_argument array
-        args_ptr = self.interface.requests[opcode].arguments_to_c(*args)
-
-        # Write the event into the connection queue and build a new proxy from the given args
         proxy: ffi.WlProxyCData = ffi.cast("struct wl_proxy *", self._ptr)
-        proxy_ptr = lib.wl_proxy_marshal_array_constructor(
-            proxy, opcode, args_ptr, interface._ptr
-        )
+
+        # Fill the wl_argument array, write the event into the connection
+        # queue and build a new proxy from the given args
+        arguments = self.interface.requests[opcode].marshal_arguments(*args)
+        try:
+            proxy_ptr = lib.wl_proxy_marshal_array_constructor(
+                proxy, opcode, arguments.args_ptr, interface._ptr
+            )
+        finally:
+            arguments.release()
 
         return interface.proxy_class(proxy_ptr, self._display)
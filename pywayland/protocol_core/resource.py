@@ -17,7 +17,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Generic, TypeVar
 
 from pywayland import ffi, lib
-from pywayland.dispatcher import Dispatcher
+from pywayland.dispatcher import Dispatcher, DispatcherDefaults, SharedDispatcher
 from pywayland.server.client import Client
 from pywayland.utils import ensure_valid
 
@@ -49,7 +49,18 @@ class Resource(Generic[T]):
     :type id: `int`
     """
 
+    __slots__ = (
+        "__weakref__",
+        "_dispatcher",
+        "_handle",
+        "_ptr",
+        "id",
+        "user_data",
+        "version",
+    )
+
     interface: type[T]
+    dispatcher_defaults = DispatcherDefaults("requests", destructor=True)
 
     def __init__(
         self,
@@ -61,7 +72,8 @@ class Resource(Generic[T]):
             version = self.interface.version
 
         self.version = version
-        self.dispatcher = Dispatcher(self.interface.requests, destructor=True)
+        self.user_data: Any = None
+        self._dispatcher = type(self).dispatcher_defaults
 
         if isinstance(client, Client):
             client_ptr = client._ptr
@@ -75,14 +87,35 @@ class Resource(Generic[T]):
         self.id = lib.wl_resource_get_id(self._ptr)
 
         self._handle: ffi.CData = ffi.new_handle(self)
+        # the handle is used as both the implementation and the user data, the
+        # dispatcher is passed the implementation and the handle can be
+        # retrieved when the resource is passed as an argument
         lib.wl_resource_set_dispatcher(
             self._ptr,
             lib.dispatcher_func,
-            ffi.NULL,
+            self._handle,
             self._handle,
             lib.resource_destroy_func,
         )
 
+    @property
+    def dispatcher(self) -> Dispatcher:
+        """The dispatcher for the requests of the resource
+
+        Until a callback is set on it, the resource uses the
+        :attr:`dispatcher_defaults` shared by its class.  On the first change,
+        the resource gets its own copy of the defaults, so the callbacks set on
+        it only apply to this resource.
+        """
+        dispatcher = self._dispatcher
+        if dispatcher is type(self).dispatcher_defaults:
+            return SharedDispatcher(self)
+        return dispatcher
+
+    @dispatcher.setter
+    def dispatcher(self, dispatcher: Dispatcher) -> None:
+        self._dispatcher = dispatcher
+
     def destroy(self) -> None:
         """Destroy the Resource"""
         if self._ptr:
@@ -102,12 +135,15 @@ class Resource(Generic[T]):
     @ensure_valid
     def _post_event(self, opcode: int, *args: Any) -> None:
         assert self._ptr is not None
-        # Create wl_argument array
-        args_ptr = self.interface.events[opcode].arguments_to_c(*args)
-
-        # Write the event array to this object
         resource: ffi.WlResourceCData = ffi.cast("struct wl_resource *", self._ptr)
-        lib.wl_resource_post_event_array(resource, opcode, args_ptr)
+
+        # Fill the wl_argument array and write the event array to this object,
+        # which copies the arguments
+        arguments = self.interface.events[opcode].marshal_arguments(*args)
+        try:
+            lib.wl_resource_post_event_array(resource, opcode, arguments.args_ptr)
+        finally:
+            arguments.release()
 
     @ensure_valid
     def _post_error(self, code: int, msg: str = "") -> None:
@@ -0,0 +1,396 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Encode and decode the Wayland wire format without libwayland
+
+Each message on the wire is a header of two 32-bit words, the id of the
+object the message is sent to, and the size of the message in bytes in the
+upper 16 bits with the opcode in the lower 16 bits, followed by the arguments
+in the host byte order, each padded to 32 bits.  File descriptors are not
+part of the stream, they are passed alongside it, so they are decoded as
+:class:`WireFd` placeholders.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, NamedTuple
+from weakref import WeakKeyDictionary
+
+from .argument import Argument, ArgumentType
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any, TypeAlias
+
+    from typing_extensions import Buffer
+
+    from .interface import Interface
+    from .message import Message
+
+    WireValue: TypeAlias = "int | float | str | bytes | WireFd | None"
+
+HEADER_SIZE = 8
+
+_uint = struct.Struct("=I")
+_int = struct.Struct("=i")
+_header = struct.Struct("=II")
+
+# The arguments of each message as they are sent, see Message._marshaled_arguments
+_plans: WeakKeyDictionary[Message, tuple[Argument, ...]] = WeakKeyDictionary()
+
+
+class WireHeader(NamedTuple):
+    """The header of a message in a Wayland byte stream
+
+    :param object_id: The id of the object the message is sent to
+    :param opcode: The index of the request or event on the interface
+    :param size: The size of the message in bytes, including the header
+    :param offset: The offset of the message in the scanned data
+    """
+
+    object_id: int
+    opcode: int
+    size: int
+    offset: int
+
+
+@dataclass(frozen=True)
+class WireFd:
+    """Placeholder for a file descriptor argument
+
+    :param index:
+        The index of the file descriptor among those passed alongside the
+        stream, in the order they were sent
+    """
+
+    index: int
+
+
+@dataclass(frozen=True)
+class WireMessage:
+    """A decoded request or event
+
+    :param object_id: The id of the object the message is sent to
+    :param interface: The interface of the object
+    :param opcode: The index of the message on the interface
+    :param message: The request or event
+    :param args:
+        The arguments of the message as they are sent, objects are given by
+        their id, and a `new_id` with no interface is given as the interface
+        name, version and id
+    """
+
+    object_id: int
+    interface: type[Interface]
+    opcode: int
+    message: Message
+    args: list[WireValue]
+
+    @property
+    def name(self) -> str:
+        """The name of the message, e.g. ``"wl_surface.attach"``"""
+        return f"{self.interface.name}.{self.message.name}"
+
+
+def _plan(message: Message) -> tuple[Argument, ...]:
+    plan = _plans.get(message)
+    if plan is None:
+        plan = _plans[message] = tuple(message._marshaled_arguments)
+    return plan
+
+
+def _padded(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def scan_headers(data: Buffer, offset: int = 0) -> tuple[list[WireHeader], int]:
+    """Find the headers of the complete messages in the data
+
+    Only the headers are read, the data is viewed as an array of 32-bit words
+    and the scan steps from one header to the next by the size of each
+    message, so large captures can be framed without decoding the arguments.
+    The offset of each message depends on the size of the one before it, so
+    the scan is a loop over the messages rather than over the whole array.
+
+    :param data: The bytes of the stream
+    :type data: bytes-like
+    :param offset: The offset of the first message, a multiple of 4
+    :type offset: `int`
+    :returns:
+        The headers of the complete messages, and the offset of the end of the
+        last complete message, where scanning should continue once more data
+        is received
+    """
+    if offset % 4:
+        raise ValueError(f"Messages are 32-bit aligned, got offset {offset}")
+
+    view = memoryview(data).cast("B")
+    end = len(view)
+    words = view[: end - end % 4].cast("I")
+    nwords = len(words)
+
+    headers: list[WireHeader] = []
+    append = headers.append
+    index = offset // 4
+    while index + 2 <= nwords:
+        size_opcode = words[index + 1]
+        size = size_opcode >> 16
+        if size < HEADER_SIZE or size & 3:
+            raise ValueError(f"Invalid message size {size} at offset {index * 4}")
+        next_index = index + (size >> 2)
+        if next_index > nwords:
+            break
+        append(WireHeader(words[index], size_opcode & 0xFFFF, size, index * 4))
+        index = next_index
+
+    return headers, index * 4
+
+
+def decode_arguments(
+    message: Message, data: Buffer, fd_index: int = 0
+) -> tuple[list[WireValue], int]:
+    """Decode the arguments of a message from the data after the header
+
+    :param message: The request or event the arguments are for
+    :type message: :class:`~pywayland.protocol_core.Message`
+    :param data: The arguments of the message, without the header
+    :type data: bytes-like
+    :param fd_index: The index of the first file descriptor of the message
+    :type fd_index: `int`
+    :returns: The arguments, and the number of file descriptors of the message
+    """
+    view = memoryview(data).cast("B")
+    end = len(view)
+    pos = 0
+    nfds = 0
+
+    args: list[WireValue] = []
+    try:
+        for argument in _plan(message):
+            argument_type = argument.argument_type
+            if argument_type == ArgumentType.FileDescriptor:
+                args.append(WireFd(fd_index + nfds))
+                nfds += 1
+                continue
+
+            (word,) = _uint.unpack_from(view, pos)
+            pos += 4
+            if argument_type == ArgumentType.Int:
+                args.append(_int.unpack_from(view, pos - 4)[0])
+            elif argument_type in (ArgumentType.Uint, ArgumentType.NewId):
+                args.append(word)
+            elif argument_type == ArgumentType.Fixed:
+                args.append(_int.unpack_from(view, pos - 4)[0] / 256)
+            elif argument_type == ArgumentType.Object:
+                args.append(word if word else None)
+            elif argument_type == ArgumentType.String:
+                if word == 0:
+                    args.append(None)
+                    continue
+                if pos + word > end:
+                    raise ValueError("String runs past the end of the message")
+                # the length includes the terminating null byte
+                args.append(bytes(view[pos : pos + word - 1]).decode())
+                pos += _padded(word)
+            elif argument_type == ArgumentType.Array:
+                if pos + word > end:
+                    raise ValueError("Array runs past the end of the message")
+                args.append(bytes(view[pos : pos + word]))
+                pos += _padded(word)
+    except struct.error as e:
+        raise ValueError(f"Message '{message.name}' is truncated") from e
+
+    if pos != end:
+        raise ValueError(
+            f"Message '{message.name}' has {end - pos} bytes after the arguments"
+        )
+    return args, nfds
+
+
+def encode_message(
+    object_id: int, opcode: int, message: Message, args: list[Any]
+) -> tuple[bytes, list[Any]]:
+    """Encode a message to the wire format
+
+    :param object_id: The id of the object the message is sent to
+    :type object_id: `int`
+    :param opcode: The index of the message on the interface
+    :type opcode: `int`
+    :param message: The request or event
+    :type message: :class:`~pywayland.protocol_core.Message`
+    :param args:
+        The arguments of the message as they are sent, as they are decoded by
+        :func:`decode_arguments`
+    :type args: `list`
+    :returns:
+        The bytes of the message, and the file descriptor arguments, which are
+        passed alongside the bytes
+    """
+    plan = _plan(message)
+    if len(args) != len(plan):
+        raise TypeError(
+            f"'{message.name}' takes {len(plan)} arguments, got {len(args)}"
+        )
+
+    body = bytearray()
+    fds = []
+    for argument, arg in zip(plan, args):
+        argument_type = argument.argument_type
+        if argument_type == ArgumentType.FileDescriptor:
+            fds.append(arg)
+        elif argument_type == ArgumentType.Int:
+            body += _int.pack(arg)
+        elif argument_type == ArgumentType.Fixed:
+            body += _int.pack(round(arg * 256))
+        elif argument_type in (ArgumentType.Uint, ArgumentType.NewId):
+            body += _uint.pack(arg)
+        elif argument_type == ArgumentType.Object:
+            body += _uint.pack(arg or 0)
+        elif arg is None:
+            # null strings and arrays are sent with a length of 0
+            body += _uint.pack(0)
+        else:
+            value = arg.encode() + b"\0" if isinstance(arg, str) else bytes(arg)
+            body += _uint.pack(len(value))
+            body += value
+            body += bytes(_padded(len(value)) - len(value))
+
+    size = HEADER_SIZE + len(body)
+    if size > 0xFFFF:
+        raise ValueError(f"Message '{message.name}' is too large: {size} bytes")
+    return _header.pack(object_id, size << 16 | opcode) + body, fds
+
+
+class WireCodec:
+    """Decode and encode the messages of a Wayland connection
+
+    The interface of each object is tracked from the `new_id` arguments of the
+    messages, starting from the display, which is object 1, and objects are
+    removed by `wl_display.delete_id`.  The requests and events of a
+    connection share the objects, so the messages of both directions should
+    be passed in the order they were sent.
+
+    :param display: The interface of the display, i.e. ``WlDisplay``
+    :type display: :class:`~pywayland.protocol_core.Interface` class
+    :param get_interface:
+        Looks up an interface by name, used to create the objects of a
+        `new_id` with no interface, e.g. ``wl_registry.bind``, e.g.
+        :meth:`DescriptorDatabase.get_interface`, raising :class:`KeyError`
+        if the interface is not known
+    :type get_interface: callable or `None`
+    """
+
+    def __init__(
+        self,
+        display: type[Interface],
+        get_interface: Callable[[str], type[Interface]] | None = None,
+    ) -> None:
+        self.objects: dict[int, type[Interface]] = {1: display}
+        self._get_interface = get_interface
+        # the file descriptors of the requests and events are passed on the
+        # same socket, but in order within each direction
+        self._fd_counts = {True: 0, False: 0}
+
+    def _message(
+        self, object_id: int, opcode: int, request: bool
+    ) -> tuple[type[Interface], Message]:
+        interface = self.objects.get(object_id)
+        if interface is None:
+            raise ValueError(f"Message sent to unknown object {object_id}")
+        messages = interface.requests if request else interface.events
+        if opcode >= len(messages):
+            kind = "request" if request else "event"
+            raise ValueError(f"Invalid {kind} opcode {opcode} for {interface.name}")
+        return interface, messages[opcode]
+
+    def _track(
+        self, object_id: int, message: Message, args: list[Any], request: bool
+    ) -> None:
+        """Update the objects from the arguments of the message"""
+        if not request and object_id == 1 and message.name == "delete_id":
+            self.objects.pop(args[0], None)
+            return
+
+        for index, argument in enumerate(_plan(message)):
+            if argument.argument_type != ArgumentType.NewId:
+                continue
+            new_interface = argument.interface
+            if new_interface is None:
+                if self._get_interface is None:
+                    continue
+                # the interface name and version are sent before the id
+                name = args[index - 2]
+                try:
+                    new_interface = self._get_interface(name)
+                except KeyError as e:
+                    raise ValueError(
+                        f"Object {args[index]} created with unknown interface {name}"
+                    ) from e
+            self.objects[args[index]] = new_interface
+
+    def decode(self, data: Buffer, request: bool) -> tuple[list[WireMessage], int]:
+        """Decode the complete messages in the data
+
+        :param data: The bytes of the stream
+        :type data: bytes-like
+        :param request:
+            If the data is sent by the client, i.e. the messages are requests,
+            otherwise the messages are events
+        :type request: `bool`
+        :returns:
+            The messages, and the number of bytes of the data that were
+            decoded, the remaining bytes are the start of a message that is
+            not complete
+        """
+        view = memoryview(data).cast("B")
+        headers, consumed = scan_headers(view)
+
+        messages = []
+        for header in headers:
+            interface, message = self._message(header.object_id, header.opcode, request)
+            start = header.offset + HEADER_SIZE
+            args, nfds = decode_arguments(
+                message,
+                view[start : header.offset + header.size],
+                self._fd_counts[request],
+            )
+            self._fd_counts[request] += nfds
+            self._track(header.object_id, message, args, request)
+            messages.append(
+                WireMessage(header.object_id, interface, header.opcode, message, args)
+            )
+
+        return messages, consumed
+
+    def encode(
+        self, object_id: int, opcode: int, args: list[Any], request: bool
+    ) -> tuple[bytes, list[Any]]:
+        """Encode a message sent to one of the objects
+
+        :param object_id: The id of the object the message is sent to
+        :type object_id: `int`
+        :param opcode: The index of the message on the interface
+        :type opcode: `int`
+        :param args: The arguments of the message, see :func:`encode_message`
+        :type args: `list`
+        :param request: If the message is a request, otherwise an event
+        :type request: `bool`
+        :returns: The bytes of the message, and the file descriptor arguments
+        """
+        _, message = self._message(object_id, opcode, request)
+        encoded = encode_message(object_id, opcode, message, args)
+        self._track(object_id, message, args, request)
+        return encoded
@@ -0,0 +1,40 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Record and replay the connections of Wayland clients
+
+The recorder sits between clients and a server, forwarding and recording the
+traffic of each connection, and the recorded requests of a client can be
+replayed to a server, e.g. to reproduce the load of real clients on a
+compositor.
+
+The requests are replayed as the raw bytes that were recorded, they are not
+rewritten in response to the events of the server.  The ids of the objects
+created by the client are the same in a replay, but any value the client took
+from the events of the server is replayed as recorded: the names of the
+globals it bound, the serials it passed back, e.g. to ``ack_configure`` or
+``set_cursor``, and the ids of the objects created by the server.  Against a
+server in a different state, or a different compositor, these requests refer
+to the wrong globals, serials or objects, and the server may raise a protocol
+error and disconnect the replay.
+"""
+
+from .player import replay  # noqa: F401
+from .recorder import Recorder, socket_path  # noqa: F401
+from .recording import (  # noqa: F401
+    Chunk,
+    RecordedFd,
+    RecordingWriter,
+    read_recording,
+)
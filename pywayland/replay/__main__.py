@@ -0,0 +1,129 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import time
+
+from .player import replay
+from .recorder import Recorder, socket_path
+from .recording import read_recording
+
+logger = logging.getLogger(__name__)
+
+
+def record(args: argparse.Namespace) -> None:
+    if not os.path.exists(args.output_dir):
+        os.makedirs(args.output_dir, 0o775)
+
+    with Recorder(
+        socket_path(args.listen), socket_path(args.server), args.output_dir
+    ) as recorder:
+        logger.info(f"Recording clients connecting to {recorder.listen_path}")
+        try:
+            recorder.run()
+        except KeyboardInterrupt:
+            pass
+
+
+def play(args: argparse.Namespace) -> None:
+    speed = None if args.max_speed else args.speed
+
+    with socket.socket(
+        socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC
+    ) as sock:
+        sock.connect(socket_path(args.server))
+        start = time.perf_counter()
+        replay(read_recording(args.recording), sock, speed)
+        end = time.perf_counter()
+
+    logger.info(f"Replayed {args.recording} in {end - start:.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Record and replay the connections of Wayland clients"
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    record_parser = subparsers.add_parser(
+        "record", help="Record the clients connecting through a socket"
+    )
+    record_parser.add_argument(
+        "--listen",
+        metavar="SOCKET",
+        default="wayland-record",
+        type=str,
+        help="Name or path of the socket clients connect to",
+    )
+    record_parser.add_argument(
+        "--server",
+        metavar="SOCKET",
+        default=os.environ.get("WAYLAND_DISPLAY", "wayland-0"),
+        type=str,
+        help="Name or path of the socket of the server",
+    )
+    record_parser.add_argument(
+        "-o",
+        "--output-dir",
+        metavar="DIR",
+        default=".",
+        type=str,
+        help="Directory to write the recording of each client to",
+    )
+    record_parser.set_defaults(func=record)
+
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="Replay the requests of a recorded client",
+        description="Replay the requests of a recorded client. The requests are "
+        "sent as recorded, the global names, serials and ids of server created "
+        "objects in them are not rewritten, so the server must be in the same "
+        "state as the recorded one, e.g. the same compositor advertising the "
+        "same globals.",
+    )
+    replay_parser.add_argument(
+        "recording", type=str, help="Path of the recording to replay"
+    )
+    replay_parser.add_argument(
+        "--server",
+        metavar="SOCKET",
+        default=os.environ.get("WAYLAND_DISPLAY", "wayland-0"),
+        type=str,
+        help="Name or path of the socket of the server",
+    )
+    replay_parser.add_argument(
+        "--speed",
+        default=1.0,
+        type=float,
+        help="Speed of the replay relative to the recording",
+    )
+    replay_parser.add_argument(
+        "--max-speed",
+        action="store_true",
+        help="Send the requests as fast as the server accepts them",
+    )
+    replay_parser.set_defaults(func=play)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
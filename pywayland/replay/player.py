@@ -0,0 +1,108 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import selectors
+import socket
+import time
+from typing import TYPE_CHECKING
+
+from pywayland.utils import AnonymousFile
+
+from .recorder import BUFFER_SIZE, MAX_FDS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .recording import Chunk, RecordedFd
+
+
+def _open_fd(recorded: RecordedFd) -> int:
+    """Open a file descriptor in place of a recorded one
+
+    Regular files, e.g. shm pools, are replaced by anonymous files of the same
+    size, anything else is replaced by ``/dev/null``, which can be read from
+    and written to.
+    """
+    if recorded.size is None:
+        return os.open(os.devnull, os.O_RDWR | os.O_CLOEXEC)
+
+    anonymous_file = AnonymousFile(recorded.size)
+    anonymous_file.open()
+    assert anonymous_file.fd is not None
+    return anonymous_file.fd
+
+
+def _drain(
+    sock: socket.socket, selector: selectors.BaseSelector, timeout: float
+) -> None:
+    """Discard the events sent by the server, waiting up to the timeout"""
+    while selector.select(timeout):
+        data, fds, _, _ = socket.recv_fds(sock, BUFFER_SIZE, MAX_FDS)
+        for fd in fds:
+            os.close(fd)
+        if not data:
+            raise ConnectionError("Server closed the connection")
+        # only wait for the first events, then read what is available
+        timeout = 0
+
+
+def replay(
+    chunks: Iterable[Chunk], sock: socket.socket, speed: float | None = 1.0
+) -> None:
+    """Replay the requests of a recorded client to a server
+
+    The requests are sent on the socket with the timing they were recorded
+    with, scaled by the speed, or as fast as the server accepts them if the
+    speed is `None`.  The events sent by the server are read and discarded,
+    the requests are not changed in response to them, so the server should be
+    in the same state as when the client was recorded, e.g. advertise the
+    same globals.  The global names, serials and ids of server created objects
+    in the requests are the recorded values, see :mod:`pywayland.replay`.
+
+    :param chunks:
+        The chunks of the recording, see
+        :func:`~pywayland.replay.read_recording`
+    :type chunks: iterable of :class:`~pywayland.replay.Chunk`
+    :param sock: A socket connected to the server
+    :type sock: `socket.socket`
+    :param speed:
+        The speed relative to the recording, or `None` to replay at the
+        maximum speed
+    :type speed: `float` or `None`
+    """
+    with selectors.DefaultSelector() as selector:
+        selector.register(sock, selectors.EVENT_READ)
+
+        start = time.monotonic()
+        for chunk in chunks:
+            if not chunk.request:
+                continue
+
+            if speed:
+                deadline = start + chunk.time / speed
+                while (remaining := deadline - time.monotonic()) > 0:
+                    _drain(sock, selector, remaining)
+            else:
+                _drain(sock, selector, 0)
+
+            fds = [_open_fd(recorded) for recorded in chunk.fds]
+            try:
+                sent = socket.send_fds(sock, [chunk.data], fds) if fds else 0
+                sock.sendall(chunk.data[sent:])
+            finally:
+                for fd in fds:
+                    os.close(fd)
@@ -0,0 +1,285 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import logging
+import os
+import selectors
+import socket
+import time
+from typing import TYPE_CHECKING
+
+from .recording import Chunk, RecordedFd, RecordingWriter
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+# The size of the buffers of the libwayland connections, and the most file
+# descriptors that are sent with them
+BUFFER_SIZE = 4096
+MAX_FDS = 28
+
+# The most data buffered for a peer before the recorder stops reading what is
+# sent to it, so a peer that does not read cannot exhaust the memory
+MAX_PENDING = 16 * BUFFER_SIZE
+
+
+def socket_path(name: str) -> str:
+    """Get the path of a Wayland socket
+
+    :param name:
+        The name of the socket, e.g. ``"wayland-0"``, which is relative to
+        ``XDG_RUNTIME_DIR``, or an absolute path
+    :type name: `str`
+    """
+    if os.path.isabs(name):
+        return name
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        raise ValueError("XDG_RUNTIME_DIR is not set")
+    return os.path.join(runtime_dir, name)
+
+
+class _Session:
+    """A client connected through the recorder, and its connection to the server
+
+    The sockets are non-blocking, the data and file descriptors that are not
+    yet accepted by a peer are kept until the peer is writable.  The data in
+    each direction is keyed by whether it is the requests of the client, or
+    the events of the server.
+    """
+
+    def __init__(
+        self, client: socket.socket, server: socket.socket, writer: RecordingWriter
+    ) -> None:
+        self.client = client
+        self.server = server
+        self.writer = writer
+        self.start = time.monotonic()
+
+        client.setblocking(False)
+        server.setblocking(False)
+        self.pending = {True: bytearray(), False: bytearray()}
+        self.pending_fds: dict[bool, list[int]] = {True: [], False: []}
+        # the events each socket is registered for with the selector
+        self.events = {client: 0, server: 0}
+        # set when a peer has hung up, the data it sent is still forwarded
+        self.closing = False
+
+    def sockets(self, request: bool) -> tuple[socket.socket, socket.socket]:
+        """The source and destination of the requests, or of the events"""
+        if request:
+            return self.client, self.server
+        return self.server, self.client
+
+    def discard(self, request: bool) -> None:
+        """Drop the data waiting to be sent in the direction"""
+        self.pending[request].clear()
+        for fd in self.pending_fds[request]:
+            os.close(fd)
+        self.pending_fds[request].clear()
+
+
+class Recorder:
+    """Record the connections of clients to a server
+
+    Listens on a socket that clients connect to in place of the server, and
+    forwards the data and file descriptors of each connection to and from
+    the server, recording them with the time they were received.  The
+    connection of each client is recorded to its own file in the output
+    directory, which can be replayed with :func:`replay`.
+
+    :param listen_path: The path of the socket clients connect to
+    :type listen_path: `str`
+    :param server_path: The path of the socket of the server
+    :type server_path: `str`
+    :param output_dir: The directory the recordings are written to
+    :type output_dir: `str`
+    """
+
+    def __init__(self, listen_path: str, server_path: str, output_dir: str) -> None:
+        self.listen_path = listen_path
+        self.server_path = server_path
+        self.output_dir = output_dir
+        self.recordings: list[str] = []
+
+        self._listener = socket.socket(
+            socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC
+        )
+        self._listener.bind(listen_path)
+        self._listener.listen()
+
+        # stops the recorder from another thread
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._running = False
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._sessions: set[_Session] = set()
+
+    def __enter__(self) -> Recorder:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def run(self) -> None:
+        """Forward and record the connections until :meth:`stop` is called"""
+        self._running = True
+        while self._running:
+            for key, events in self._selector.select():
+                if key.fileobj is self._listener:
+                    self._accept()
+                elif key.fileobj is self._wakeup_recv:
+                    self._wakeup_recv.recv(1)
+                    self._running = False
+                else:
+                    # reading the socket gives the requests if it is the
+                    # client, writing to it sends the events
+                    session, request = key.data
+                    # the session may have been closed by an earlier event
+                    if events & selectors.EVENT_WRITE and session in self._sessions:
+                        self._send(session, not request)
+                    if events & selectors.EVENT_READ and session in self._sessions:
+                        self._receive(session, request)
+                    if session in self._sessions:
+                        self._update_events(session)
+
+    def stop(self) -> None:
+        """Stop running the recorder, can be called from another thread"""
+        self._wakeup_send.send(b"\0")
+
+    def close(self) -> None:
+        """Close the connections and the recordings, and remove the socket"""
+        for session in list(self._sessions):
+            self._close_session(session)
+        self._selector.close()
+        self._listener.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+        if os.path.exists(self.listen_path):
+            os.unlink(self.listen_path)
+
+    def _accept(self) -> None:
+        client, _ = self._listener.accept()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        try:
+            server.connect(self.server_path)
+        except OSError:
+            logger.exception(f"Unable to connect to the server: {self.server_path}")
+            client.close()
+            server.close()
+            return
+
+        path = os.path.join(self.output_dir, f"client-{len(self.recordings)}.wlrec")
+        session = _Session(client, server, RecordingWriter(path))
+        self.recordings.append(path)
+        self._sessions.add(session)
+        self._update_events(session)
+        logger.info(f"Recording client to {path}")
+
+    def _receive(self, session: _Session, request: bool) -> None:
+        source, _ = session.sockets(request)
+        try:
+            data, fds, _, _ = socket.recv_fds(source, BUFFER_SIZE, MAX_FDS)
+        except BlockingIOError:
+            return
+        except ConnectionError:
+            data, fds = b"", []
+
+        if not data:
+            for fd in fds:
+                os.close(fd)
+            # forward what the peer sent before it hung up, then close, the
+            # data sent to the peer can no longer be delivered
+            session.closing = True
+            session.discard(not request)
+            return
+
+        recorded_fds = [RecordedFd.from_fd(fd) for fd in fds]
+        session.writer.write(
+            Chunk(time.monotonic() - session.start, request, data, recorded_fds)
+        )
+
+        session.pending[request] += data
+        session.pending_fds[request] += fds
+        self._send(session, request)
+
+    def _send(self, session: _Session, request: bool) -> None:
+        _, dest = session.sockets(request)
+        data = session.pending[request]
+        fds = session.pending_fds[request]
+        try:
+            while data:
+                if fds:
+                    # the fds are sent with the first byte of the data they
+                    # were received with, or before it
+                    sent = socket.send_fds(dest, [data], fds)
+                    # the fds have been sent on, these are the copies of the
+                    # recorder
+                    for fd in fds:
+                        os.close(fd)
+                    fds.clear()
+                else:
+                    sent = dest.send(data)
+                del data[:sent]
+        except BlockingIOError:
+            pass
+        except ConnectionError:
+            self._close_session(session)
+
+    def _update_events(self, session: _Session) -> None:
+        """Watch each peer for what can be sent to it, and what it sends"""
+        if session.closing and not any(session.pending.values()):
+            self._close_session(session)
+            return
+
+        for sock, request in ((session.client, True), (session.server, False)):
+            events = 0
+            # stop reading from the peer while the other peer is not reading
+            if not session.closing and len(session.pending[request]) < MAX_PENDING:
+                events |= selectors.EVENT_READ
+            if session.pending[not request]:
+                events |= selectors.EVENT_WRITE
+
+            registered = session.events[sock]
+            if events == registered:
+                continue
+            if not registered:
+                self._selector.register(sock, events, (session, request))
+            elif not events:
+                self._selector.unregister(sock)
+            else:
+                self._selector.modify(sock, events, (session, request))
+            session.events[sock] = events
+
+    def _close_session(self, session: _Session) -> None:
+        self._sessions.remove(session)
+        for sock in (session.client, session.server):
+            if session.events[sock]:
+                self._selector.unregister(sock)
+            sock.close()
+        session.discard(True)
+        session.discard(False)
+        session.writer.close()
+        logger.info(f"Recorded client to {session.writer.path}")
@@ -0,0 +1,147 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import stat
+import struct
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import TracebackType
+    from typing import BinaryIO
+
+MAGIC = b"PYWLREC\x01"
+
+# time, request, size of the data and number of fds of each chunk
+_chunk_header = struct.Struct("=dBII")
+# the size of each fd, or -1
+_fd_size = struct.Struct("=q")
+
+
+@dataclass(frozen=True)
+class RecordedFd:
+    """A file descriptor passed on the connection
+
+    The contents of the files are not recorded, only the size of the files,
+    e.g. of the shm pools, so buffers are replayed with the same size.
+
+    :param size:
+        The size of the file, or `None` if the file descriptor is not a
+        regular file, e.g. a pipe
+    """
+
+    size: int | None
+
+    @classmethod
+    def from_fd(cls, fd: int) -> RecordedFd:
+        """Record the file passed as the given file descriptor"""
+        st = os.fstat(fd)
+        if stat.S_ISREG(st.st_mode):
+            return cls(st.st_size)
+        return cls(None)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """The data received from one end of the connection at once
+
+    :param time: The time since the connection was made, in seconds
+    :param request:
+        If the data was sent by the client, otherwise it was sent by the
+        server
+    :param data: The bytes received, which may contain partial messages
+    :param fds: The file descriptors received along with the data
+    """
+
+    time: float
+    request: bool
+    data: bytes
+    fds: list[RecordedFd] = field(default_factory=list)
+
+
+class RecordingWriter:
+    """Write the chunks of a connection to a recording file
+
+    :param path: The path of the recording
+    :type path: `str`
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file: BinaryIO | None = open(path, "wb")
+        self._file.write(MAGIC)
+
+    def __enter__(self) -> RecordingWriter:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def write(self, chunk: Chunk) -> None:
+        """Append the chunk to the recording"""
+        if self._file is None:
+            raise ValueError("Recording has been closed")
+
+        self._file.write(
+            _chunk_header.pack(
+                chunk.time, chunk.request, len(chunk.data), len(chunk.fds)
+            )
+        )
+        self._file.write(chunk.data)
+        for fd in chunk.fds:
+            self._file.write(_fd_size.pack(-1 if fd.size is None else fd.size))
+
+    def close(self) -> None:
+        """Close the recording file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Recording is truncated")
+    return data
+
+
+def read_recording(path: str) -> Iterator[Chunk]:
+    """Read the chunks of a recording, in the order they were received
+
+    :param path: The path of the recording
+    :type path: `str`
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a pywayland recording: {path}")
+
+        while header := f.read(_chunk_header.size):
+            if len(header) != _chunk_header.size:
+                raise ValueError("Recording is truncated")
+            time, request, size, nfds = _chunk_header.unpack(header)
+            data = _read_exact(f, size)
+            fds = []
+            for _ in range(nfds):
+                (fd_size,) = _fd_size.unpack(_read_exact(f, _fd_size.size))
+                fds.append(RecordedFd(None if fd_size < 0 else fd_size))
+            yield Chunk(time, bool(request), data, fds)
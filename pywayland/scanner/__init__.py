@@ -12,4 +12,24 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .protocol import Protocol  # noqa: F401
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .protocol import Protocol  # noqa: F401
+
+
+def __getattr__(name: str) -> Any:
+    # the protocol modules import the argument types of the scanner, so the
+    # rest of the scanner is only imported when it is first used
+    if name == "Protocol":
+        module = importlib.import_module(f"{__name__}.protocol")
+        value = globals()[name] = module.Protocol
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), "Protocol"})
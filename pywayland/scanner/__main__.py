@@ -15,12 +15,25 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import logging
 import os
 import shlex
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
-from .protocol import Protocol
+from .cache import OutputCache, input_digest
+from .protocol import (
+    DOCS_FILE_SUFFIX,
+    Protocol,
+    output_c_build,
+    output_descriptors,
+    output_package,
+    prune_protocols,
+    remove_c_tables,
+    remove_descriptors,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +69,19 @@ def get_wayland_protocols(input_dir: str | None = None) -> list[str]:
     return protocols
 
 
+def output_protocol(
+    protocol: Protocol,
+    all_imports: dict[str, str],
+    output_dir: str,
+    strip_docs: bool,
+    with_c_tables: bool,
+) -> None:
+    """Output the generated files of the protocol"""
+    protocol.output(output_dir, all_imports, strip_docs)
+    if with_c_tables:
+        protocol.output_c(output_dir, all_imports)
+
+
 def main() -> None:
     this_dir = os.path.split(__file__)[0]
     protocol_dir = os.path.join(this_dir, "..", "protocol")
@@ -99,6 +125,53 @@ def main() -> None:
         type=str,
         help="Custom directory to wayland-protocol xml files instead of pkg-config",
     )
+    parser.add_argument(
+        "--interfaces",
+        metavar="NAME",
+        nargs="+",
+        type=str,
+        help="Only generate these interfaces, and the interfaces they reference",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        default=1,
+        type=int,
+        help="Number of processes used to parse and generate the protocols",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Generate all protocols, even those whose inputs have not changed",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Remove the protocols generated by earlier runs that are not among the inputs",
+    )
+    parser.add_argument(
+        "--strip-docs",
+        action="store_true",
+        help="Output the docstrings to a json file next to each protocol module",
+    )
+    parser.add_argument(
+        "--with-c-tables",
+        action="store_true",
+        help="Also output the wl_interface structs as C, with a cffi module to build them",
+    )
+    parser.add_argument(
+        "--with-descriptors",
+        action="store_true",
+        help="Also output a descriptor database of the interfaces, loadable without importing the protocol modules",
+    )
+    parser.add_argument(
+        "--c-tables-package",
+        metavar="PACKAGE",
+        default="pywayland.protocol",
+        type=str,
+        help="Package the output directory is imported as, used to name the C tables module",
+    )
 
     args = parser.parse_args()
 
@@ -114,32 +187,135 @@ def main() -> None:
     # add wayland.xml at last
     input_files += args.input
 
-    protocols = [Protocol.parse_file(input_file) for input_file in input_files]
-    logger.info(f"Parsed {len(protocols)} input xml files")
-
-    # items are created in order of importance (1.stable, 2.staging, 3.unstable)
-    # in case duplicates appear in the protocols
-    all_imports = {
-        interface.name: protocol.name
-        for protocol in protocols
-        for interface in protocol.interface
-    }
-
-    for protocol in protocols:
-        # create a new copy so that we can overwrite created interface keys with
-        # the interfaces in the current protocol, this is in case an interface name
-        # is repeated multiple times fixing the issue of importing and redifining
-        # the interface in the same protocol file
-        # if a protocol other than the ones with repeated interfaces where to referece
-        # the interface name, it would resolve to the interface with highest priority
-        # (1.stable, 2.staging, 3.unstable) since the xml files does not have a hard
-        # referece to the wanted interface protocol
-        current_protocol_imports = all_imports.copy()
-        current_protocol_imports.update(
-            {interface.name: protocol.name for interface in protocol.interface}
+    options = []
+    if args.strip_docs:
+        options.append("strip_docs")
+    if args.with_c_tables:
+        options.append("with_c_tables")
+
+    executor: contextlib.AbstractContextManager[ProcessPoolExecutor | None]
+    if args.jobs > 1:
+        executor = ProcessPoolExecutor(args.jobs)
+    else:
+        executor = contextlib.nullcontext()
+
+    with executor as pool:
+        map_ = pool.map if pool is not None else map
+
+        protocols = list(map_(Protocol.parse_file, input_files))
+        logger.info(f"Parsed {len(protocols)} input xml files")
+
+        if args.interfaces:
+            roots = list(args.interfaces)
+            # the client always needs the display, and the interfaces it creates
+            if any(
+                iface.name == "wl_display"
+                for protocol in protocols
+                for iface in protocol.interface
+            ):
+                roots.append("wl_display")
+            protocols = prune_protocols(protocols, roots)
+            kept = sum(len(protocol.interface) for protocol in protocols)
+            logger.info(f"Pruned protocols to {kept} referenced interfaces")
+
+        # the protocols with none of the interfaces given to --interfaces
+        removed = [protocol.name for protocol in protocols if not protocol.interface]
+        inputs = [
+            (input_file, protocol)
+            for input_file, protocol in zip(input_files, protocols)
+            if protocol.interface
+        ]
+        protocols = [protocol for _, protocol in inputs]
+
+        # items are created in order of importance (1.stable, 2.staging, 3.unstable)
+        # in case duplicates appear in the protocols
+        all_imports = {
+            interface.name: protocol.name
+            for protocol in protocols
+            for interface in protocol.interface
+        }
+
+        cache = OutputCache(args.output_dir)
+        pending = []
+        for input_file, protocol in inputs:
+            # create a new copy so that we can overwrite created interface keys with
+            # the interfaces in the current protocol, this is in case an interface name
+            # is repeated multiple times fixing the issue of importing and redifining
+            # the interface in the same protocol file
+            # if a protocol other than the ones with repeated interfaces where to referece
+            # the interface name, it would resolve to the interface with highest priority
+            # (1.stable, 2.staging, 3.unstable) since the xml files does not have a hard
+            # referece to the wanted interface protocol
+            current_protocol_imports = all_imports.copy()
+            current_protocol_imports.update(
+                {interface.name: protocol.name for interface in protocol.interface}
+            )
+
+            # skip the protocols that were generated from the same inputs
+            protocol_name = protocol.name.replace("-", "_")
+            outputs = [f"{protocol_name}.py"]
+            if args.strip_docs:
+                outputs.append(f"{protocol_name}{DOCS_FILE_SUFFIX}")
+            if args.with_c_tables:
+                outputs.append(f"{protocol_name}.c")
+            # the interfaces that are generated depend on the other protocols
+            interfaces = ",".join(iface.name for iface in protocol.interface)
+            digest = input_digest(
+                input_file,
+                current_protocol_imports,
+                [*options, f"interfaces={interfaces}"],
+            )
+            if not args.force and cache.is_current(protocol.name, digest, outputs):
+                logger.info(f"Protocol up to date: {protocol.name}")
+                continue
+
+            pending.append((protocol, current_protocol_imports, digest, outputs))
+
+        output = functools.partial(
+            output_protocol,
+            output_dir=args.output_dir,
+            strip_docs=args.strip_docs,
+            with_c_tables=args.with_c_tables,
         )
-        protocol.output(args.output_dir, current_protocol_imports)
-        logger.info(f"Generated protocol: {protocol.name}")
+        generated = map_(
+            output,
+            [protocol for protocol, _, _, _ in pending],
+            [imports for _, imports, _, _ in pending],
+        )
+        for _, (protocol, _, digest, outputs) in zip(generated, pending):
+            # removes the files of the protocol that are no longer generated
+            cache.update(
+                protocol.name,
+                digest,
+                outputs,
+                [iface.name for iface in protocol.interface],
+            )
+            logger.info(f"Generated protocol: {protocol.name}")
+
+    if args.prune:
+        cache.remove_unused(protocol.name for protocol in protocols)
+    else:
+        cache.remove(removed)
+    cache.save()
+
+    # the protocols of earlier runs that are kept are still in the index, the
+    # interfaces of the current inputs take precedence
+    output_package(args.output_dir, {**cache.interfaces(), **all_imports})
+    logger.info("Generated protocol package index")
+
+    if args.with_descriptors:
+        output_descriptors(args.output_dir, protocols)
+        logger.info("Generated interface descriptor database")
+    else:
+        # the descriptors of a previous run would be loaded by the package
+        remove_descriptors(args.output_dir)
+
+    if args.with_c_tables:
+        output_c_build(args.output_dir, protocols, args.c_tables_package)
+        logger.info("Generated C interface tables build module")
+    else:
+        # the tables of a previous run would be used by the protocol modules
+        remove_c_tables(args.output_dir, protocols)
 
 
 if __name__ == "__main__":
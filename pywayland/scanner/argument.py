@@ -134,6 +134,49 @@ class Argument(Element):
             return f"{base_annotation} | None"
         return base_annotation
 
+    @property
+    def wire_signature(self) -> str:
+        """Output as the argument appears in the signature of the wl_message"""
+        if self.type == ArgumentType.Int:
+            base_signature = "i"
+        elif self.type == ArgumentType.Uint:
+            base_signature = "u"
+        elif self.type == ArgumentType.Fixed:
+            base_signature = "f"
+        elif self.type == ArgumentType.String:
+            base_signature = "s"
+        elif self.type == ArgumentType.Object:
+            base_signature = "o"
+        elif self.type == ArgumentType.NewId:
+            if self.interface is None:
+                base_signature = "sun"
+            else:
+                base_signature = "n"
+        elif self.type == ArgumentType.Array:
+            base_signature = "a"
+        elif self.type == ArgumentType.FileDescriptor:
+            base_signature = "h"
+
+        if self.allow_null:
+            return "?" + base_signature
+        return base_signature
+
+    @property
+    def wire_types(self) -> list[str | None]:
+        """The interfaces of the arguments as they appear in the wl_message
+
+        A `new_id` with no interface is sent as the interface name, version
+        and id, none of which have an interface.
+        """
+        if self.type == ArgumentType.NewId and self.interface is None:
+            return [None, None, None]
+        return [self.interface]
+
+    @property
+    def descriptor(self) -> tuple[str, str | None, bool]:
+        """The argument as it is stored in the descriptor database"""
+        return self.type.name, self.interface, self.allow_null
+
     @property
     def argument(self) -> str:
         """Output as an Argument"""
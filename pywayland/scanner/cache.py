@@ -0,0 +1,203 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+
+CACHE_FILE = ".pywayland-scanner-cache.json"
+
+
+@functools.cache
+def _scanner_digest() -> str:
+    """Hash of the source of the scanner, which determines the output"""
+    scanner_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(scanner_dir)):
+        if filename.endswith(".py"):
+            with open(os.path.join(scanner_dir, filename), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def input_digest(
+    input_file: str, all_imports: dict[str, str], options: Iterable[str]
+) -> str:
+    """Hash of the inputs to the generated files of a protocol
+
+    The hash covers the xml file, the scanner, the options the files are
+    generated with, and the protocols of the interfaces that the xml file
+    refers to, either as arguments or in the docs.
+
+    :param input_file: Path of the xml file of the protocol
+    :type input_file: string
+    :param all_imports: The map to the protocol of each interface
+    :type all_imports: dict
+    :param options: The options the files are generated with
+    :type options: list of strings
+    """
+    with open(input_file, "rb") as f:
+        xml = f.read()
+
+    # any interface named in the xml is resolved through the imports
+    xml_text = xml.decode()
+    imports = sorted(
+        (name, protocol) for name, protocol in all_imports.items() if name in xml_text
+    )
+
+    digest = hashlib.sha256()
+    digest.update(_scanner_digest().encode())
+    digest.update(xml)
+    digest.update(json.dumps([imports, sorted(options)]).encode())
+    return digest.hexdigest()
+
+
+class OutputCache:
+    """Cache of the inputs the protocols in an output directory were generated from
+
+    Stores the :func:`input_digest` of each generated protocol in the output
+    directory, so protocols whose inputs have not changed since they were last
+    generated can be skipped, along with the files that were generated for
+    the protocol, so the files that are no longer generated, e.g. after
+    changing the options, can be removed, and the interfaces of the protocol,
+    so the package index can include the protocols of earlier runs.
+
+    :param output_dir: Path of directory the protocol files are output to
+    :type output_dir: string
+    """
+
+    def __init__(self, output_dir: str) -> None:
+        self.output_dir = output_dir
+        self._path = os.path.join(output_dir, CACHE_FILE)
+
+        self._digests: dict[str, str] = {}
+        self._outputs: dict[str, list[str]] = {}
+        self._interfaces: dict[str, list[str]] = {}
+        if os.path.exists(self._path):
+            try:
+                with open(self._path) as f:
+                    cache = json.load(f)
+                self._digests = dict(cache["digests"])
+                self._outputs = dict(cache["outputs"])
+                self._interfaces = dict(cache["interfaces"])
+            except (ValueError, KeyError, TypeError):
+                # a corrupt cache is the same as no cache
+                self._digests = {}
+                self._outputs = {}
+                self._interfaces = {}
+
+    def is_current(self, name: str, digest: str, outputs: Iterable[str]) -> bool:
+        """Check if the protocol was generated from the same inputs
+
+        :param name: The name of the protocol
+        :type name: string
+        :param digest: The digest of the current inputs of the protocol
+        :type digest: string
+        :param outputs: The names of the files generated for the protocol
+        :type outputs: list of strings
+        """
+        output_list = sorted(outputs)
+        if self._digests.get(name) != digest or self._outputs.get(name) != output_list:
+            return False
+        return all(
+            os.path.exists(os.path.join(self.output_dir, output))
+            for output in output_list
+        )
+
+    def update(
+        self,
+        name: str,
+        digest: str,
+        outputs: Iterable[str],
+        interfaces: Iterable[str],
+    ) -> None:
+        """Set the inputs, files and interfaces the protocol was generated with
+
+        The files previously generated for the protocol that are not among
+        the outputs are removed.
+
+        :param name: The name of the protocol
+        :type name: string
+        :param digest: The digest of the inputs the protocol was generated from
+        :type digest: string
+        :param outputs: The names of the files generated for the protocol
+        :type outputs: list of strings
+        :param interfaces: The names of the interfaces generated for the protocol
+        :type interfaces: list of strings
+        """
+        output_list = sorted(outputs)
+        self._remove_files(set(self._outputs.get(name, [])) - set(output_list))
+        self._digests[name] = digest
+        self._outputs[name] = output_list
+        self._interfaces[name] = list(interfaces)
+
+    def interfaces(self) -> dict[str, str]:
+        """The map to the protocol of each interface in the output directory
+
+        Includes the protocols generated by earlier runs that are not among
+        the current inputs.
+        """
+        return {
+            interface: name
+            for name, interfaces in sorted(self._interfaces.items())
+            for interface in interfaces
+        }
+
+    def remove(self, names: Iterable[str]) -> None:
+        """Remove the files of the protocols
+
+        :param names: The names of the protocols to remove
+        :type names: list of strings
+        """
+        for name in names:
+            self._digests.pop(name, None)
+            self._interfaces.pop(name, None)
+            self._remove_files(self._outputs.pop(name, []))
+
+    def remove_unused(self, names: Iterable[str]) -> None:
+        """Remove the files of the protocols that are not generated
+
+        :param names: The names of the protocols that are generated
+        :type names: list of strings
+        """
+        generated = set(names)
+        self.remove(
+            name
+            for name in set(self._digests) | set(self._outputs)
+            if name not in generated
+        )
+
+    def save(self) -> None:
+        """Write the cache to the output directory"""
+        with open(self._path, "w") as f:
+            json.dump(
+                {
+                    "digests": self._digests,
+                    "outputs": self._outputs,
+                    "interfaces": self._interfaces,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+    def _remove_files(self, outputs: Iterable[str]) -> None:
+        for output in outputs:
+            path = os.path.join(self.output_dir, output)
+            if os.path.exists(path):
+                os.remove(path)
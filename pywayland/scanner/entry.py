@@ -49,6 +49,16 @@ class Entry(Element):
             description=cls.parse_optional_child(element, Description, "description"),
         )
 
+    def attribute_name(self, enum_name: str) -> str:
+        """The name of the attribute of the entry on the enum class"""
+        try:
+            int(self.name)
+            return f"{enum_name}_{self.name}"
+        except ValueError:
+            if self.name in ("name", "async"):
+                return self.name + "_"
+            return self.name
+
     def output(self, enum_name: str, printer: Printer) -> None:
         """Generate the output for the entry in the enum"""
         # keep base 10 ints unchanged, but ensure that hexidecimal ints are
@@ -58,12 +68,4 @@ class Entry(Element):
         else:
             value = self.value
 
-        try:
-            int(self.name)
-            printer(f"{enum_name}_{self.name} = {value}")
-        except ValueError:
-            if self.name in ("name", "async"):
-                name = self.name + "_"
-            else:
-                name = self.name
-            printer(f"{name} = {value}")
+        printer(f"{self.attribute_name(enum_name)} = {value}")
@@ -49,9 +49,23 @@ class Enum(Element):
             entry=cls.parse_repeated_child(element, Entry, "entry"),
         )
 
+    @property
+    def class_name(self) -> str:
+        """The name of the enum class on the interface"""
+        return self.name if self.name != "version" else "version_"
+
+    @property
+    def descriptor(self) -> tuple[str, bool, list[tuple[str, int]]]:
+        """The enum as it is stored in the descriptor database"""
+        entries = [
+            (entry.attribute_name(self.name), int(entry.value, 0))
+            for entry in self.entry
+        ]
+        return self.class_name, self.is_bitfield, entries
+
     def output(self, printer: Printer) -> None:
         """Generate the output for the enum to the printer"""
-        name = self.name if self.name != "version" else "version_"
+        name = self.class_name
         if self.is_bitfield:
             printer(f"class {name}(enum.IntFlag):")
         else:
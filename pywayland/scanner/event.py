@@ -36,6 +36,7 @@ class Event(Method):
     """
 
     method_type = "event"
+    class_suffix = "Resource"
 
     @classmethod
     def parse(cls, element: ET.Element) -> Event:
@@ -17,15 +17,22 @@ from __future__ import annotations
 import itertools
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
+from typing import Any
 
 from .description import Description
 from .element import Element
 from .enum import Enum
 from .event import Event
+from .method import Method
 from .printer import Printer
 from .request import Request
 
 
+def c_interface_symbol(protocol_name: str, interface_name: str) -> str:
+    """The name of the wl_interface struct of an interface in the C tables"""
+    return f"pywayland_{protocol_name}__{interface_name}_interface"
+
+
 @dataclass(frozen=True)
 class Interface(Element):
     name: str
@@ -95,6 +102,16 @@ class Interface(Element):
             for _import in method.imports(self.name, all_imports)
         )
 
+    def descriptor(self, protocol_name: str) -> dict[str, Any]:
+        """The interface as it is stored in the descriptor database"""
+        return {
+            "protocol": protocol_name,
+            "version": int(self.version),
+            "requests": [request.descriptor for request in self.request],
+            "events": [event.descriptor for event in self.event],
+            "enums": [enum.descriptor for enum in self.enum],
+        }
+
     def output_interface(self, printer: Printer) -> None:
         """Generate the output only of the interface class"""
         printer()
@@ -104,9 +121,10 @@ class Interface(Element):
         with printer.indented():
             # Docstring
             if self.description:
-                self.description.output(printer)
-                printer('"""')
-                printer()
+                with printer.docstring_block(self.class_name):
+                    self.description.output(printer)
+                    printer('"""')
+                    printer()
             # Class attributes
             printer(f'name = "{self.name}"')
             printer(f"version = {self.version}")
@@ -121,6 +139,7 @@ class Interface(Element):
         printer()
         printer(f"class {self.proxy_class_name}(Proxy[{self.class_name}]):")
         with printer.indented():
+            printer("__slots__ = ()")
             printer(f"interface = {self.class_name}")
             for opcode, request in enumerate(self.request):
                 printer()
@@ -132,6 +151,7 @@ class Interface(Element):
         printer()
         printer(f"class {self.resource_class_name}(Resource[{self.class_name}]):")
         with printer.indented():
+            printer("__slots__ = ()")
             printer(f"interface = {self.class_name}")
             for opcode, event in enumerate(self.event):
                 printer()
@@ -149,7 +169,65 @@ class Interface(Element):
         """Generate the output only of the attributes of the interface"""
         printer()
         printer()
-        printer(f"{self.class_name}._gen_c()")
         printer(f"{self.class_name}.proxy_class = {self.proxy_class_name}")
         printer(f"{self.class_name}.resource_class = {self.resource_class_name}")
         printer(f"{self.class_name}.global_class = {self.global_class_name}")
+
+    def output_c(
+        self,
+        printer: Printer,
+        protocol_name: str,
+        all_imports: dict[str, str],
+        types: list[str | None],
+    ) -> None:
+        """Generate the C definitions of the wl_interface struct
+
+        The interfaces of the arguments of the messages are added to the
+        `types` array of the protocol, which must be output ahead of the
+        definitions.
+        """
+        symbol = c_interface_symbol(protocol_name, self.name)
+        prefix = f"pywayland_{protocol_name}__{self.name}"
+        messages: list[tuple[str, list[Method]]] = [
+            ("requests", list(self.request)),
+            ("events", list(self.event)),
+        ]
+
+        for kind, methods in messages:
+            if not methods:
+                continue
+
+            printer()
+            printer(f"static const struct wl_message {prefix}_{kind}[] = {{")
+            with printer.indented():
+                for method in methods:
+                    wire_types = method.wire_types
+                    if any(wire_types):
+                        offset = len(types)
+                        types.extend(
+                            c_interface_symbol(
+                                all_imports[name].replace("-", "_"), name
+                            )
+                            if name is not None
+                            else None
+                            for name in wire_types
+                        )
+                    else:
+                        # all null, use the nulls at the start of the array
+                        offset = 0
+                    printer(
+                        f'{{ "{method.name.strip("_")}", "{method.wire_signature}", '
+                        f"pywayland_{protocol_name}__types + {offset} }},"
+                    )
+            printer("};")
+
+        printer()
+        printer(f"const struct wl_interface {symbol} = {{")
+        with printer.indented():
+            printer(f'"{self.name}", {self.version},')
+            for kind, methods in messages:
+                if methods:
+                    printer(f"{len(methods)}, {prefix}_{kind},")
+                else:
+                    printer("0, NULL,")
+        printer("};")
@@ -74,11 +74,44 @@ class Method(Element, abc.ABC):
 
         return imports
 
+    @property
+    def wire_signature(self) -> str:
+        """The signature of the wl_message for the method"""
+        signature = "".join(arg.wire_signature for arg in self.arg)
+        if self.since:
+            return f"{self.since}{signature}"
+        return signature
+
+    @property
+    def wire_types(self) -> list[str | None]:
+        """The interfaces of each of the arguments in the wl_message"""
+        return [type_ for arg in self.arg for type_ in arg.wire_types]
+
+    @property
+    def is_destructor(self) -> bool:
+        """If the object is destroyed after the method is sent"""
+        return False
+
+    @property
+    def descriptor(
+        self,
+    ) -> tuple[str, int | None, bool, list[tuple[str, str | None, bool]]]:
+        """The method as it is stored in the descriptor database"""
+        since = int(self.since) if self.since else None
+        args = [arg.descriptor for arg in self.arg]
+        return self.name, since, self.is_destructor, args
+
     @property
     @abc.abstractmethod
     def method_type(self) -> str:
         pass
 
+    @property
+    @abc.abstractmethod
+    def class_suffix(self) -> str:
+        """The suffix of the class the method is defined on"""
+        pass
+
     @property
     @abc.abstractmethod
     def method_args(self) -> Iterable[str]:
@@ -119,7 +152,8 @@ class Method(Element, abc.ABC):
 
         with printer.indented():
             # Write the documentation
-            self.output_doc(printer)
+            with printer.docstring_block(f"{in_class}{self.class_suffix}.{self.name}"):
+                self.output_doc(printer)
             # Write out the body of the method
             self.output_body(printer, opcode)
 
@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 import contextlib
+import inspect
 import re
 import textwrap
 from collections.abc import Iterator, Mapping
@@ -22,6 +23,7 @@ from re import Match
 from typing import BinaryIO
 
 HEAD_MSG = "# This file has been autogenerated by the pywayland scanner"
+C_HEAD_MSG = "/* This file has been autogenerated by the pywayland scanner */"
 
 # Match the start of unordered lists
 RE_DOC_LIST = re.compile(r"^(?P<list_head>\* |- )")
@@ -41,6 +43,8 @@ class Printer:
         protocol: str,
         all_imports: Mapping[str, str],
         interface_name: str | None = None,
+        head_msg: str = HEAD_MSG,
+        strip_docs: bool = False,
     ) -> None:
         """Base level printer object
 
@@ -55,12 +59,19 @@ class Printer:
         :param interface_name:
             The name of the interface that is being generated, used for
             determining import resolution.
+        :param head_msg:
+            The first line of the generated file.
+        :param strip_docs:
+            If the docstrings are stored in :attr:`docs` instead of being
+            added to the output.
         """
         self._level = 0
-        self._lines = [HEAD_MSG, ""]
+        self._lines = [head_msg, ""]
         self._protocol_name = protocol
         self._all_imports = all_imports
         self.interface_name = interface_name
+        self.strip_docs = strip_docs
+        self.docs: dict[str, str] = {}
 
         self._re_doc = None
         if all_imports is not None:
@@ -205,6 +216,30 @@ class Printer:
 
         return f"`{interface_class}{function_name}()`"
 
+    @contextlib.contextmanager
+    def docstring_block(self, name: str) -> Iterator[None]:
+        """Add the lines in the context manager block as a docstring
+
+        When docs are stripped, the lines are not output, and the docstring is
+        stored in :attr:`docs` instead.
+
+        :param name:
+            The name of the documented object in the module, e.g.
+            ``WlSurfaceProxy.attach``.
+        """
+        if not self.strip_docs:
+            yield
+            return
+
+        lines = self._lines
+        self._lines = []
+        try:
+            yield
+        finally:
+            doc_lines, self._lines = self._lines, lines
+        # strip the quotes and the indentation
+        self.docs[name] = inspect.cleandoc("\n".join(doc_lines).strip()[3:-3])
+
     @contextlib.contextmanager
     def indented(self) -> Iterator[None]:
         """Indent in a level in the context manager block"""
@@ -14,15 +14,27 @@
 
 from __future__ import annotations
 
+import glob
+import json
+import marshal
 import os
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+from pywayland.layout import (
+    C_TABLES_BUILD_MODULE,
+    C_TABLES_MODULE,
+    DESCRIPTORS_FILE,
+    DESCRIPTORS_FORMAT,
+    DOCS_FILE_SUFFIX,
+    PACKAGE_LOOKUP,
+)
 
 from .copyright import Copyright, copyright_default
 from .description import Description
 from .element import Element
-from .interface import Interface
-from .printer import Printer
+from .interface import Interface, c_interface_symbol
+from .printer import C_HEAD_MSG, Printer
 
 
 @dataclass(frozen=True)
@@ -68,11 +80,18 @@ class Protocol(Element):
     def __repr__(self) -> str:
         return f"Protocol({self.name})"
 
-    def output(self, output_dir: str, all_imports: dict[str, str]) -> None:
+    def output(
+        self, output_dir: str, all_imports: dict[str, str], strip_docs: bool = False
+    ) -> None:
         """Output the scanned files to the given directory
 
         :param output_dir: Path of directory to output protocol files to
         :type output_dir: string
+        :param strip_docs:
+            Output the docstrings of the interfaces and methods to a json file
+            next to the protocol module, instead of into the module, see
+            :func:`~pywayland.protocol_core.load_docs`
+        :type strip_docs: bool
         """
         if not os.path.exists(output_dir):
             os.mkdir(output_dir)
@@ -80,7 +99,7 @@ class Protocol(Element):
         protocol_name = self.name.replace("-", "_")
         protocol_path = os.path.join(output_dir, f"{protocol_name}.py")
 
-        printer = Printer(protocol_name, all_imports)
+        printer = Printer(protocol_name, all_imports, strip_docs=strip_docs)
         if self.copyright:
             self.copyright.output(printer)
         else:
@@ -125,10 +144,6 @@ class Protocol(Element):
             printer()
             printer('T = TypeVar("T", bound=Interface)')
 
-        with open(protocol_path, "wb") as f:
-            printer.write(f)
-        printer.clear()
-
         output_methods = [
             "output_interface",
             "output_events",
@@ -143,6 +158,298 @@ class Protocol(Element):
                 iface_method = getattr(iface, output_method)
                 iface_method(printer)
 
-            with open(protocol_path, "ab") as f:
-                printer.write(f)
-            printer.clear()
+        with open(protocol_path, "wb") as f:
+            printer.write(f)
+
+        docs_path = os.path.join(output_dir, f"{protocol_name}{DOCS_FILE_SUFFIX}")
+        if strip_docs:
+            with open(docs_path, "w") as f:
+                json.dump(printer.docs, f, indent=0, sort_keys=True)
+        elif os.path.exists(docs_path):
+            # the docs are in the module, remove the docs of a previous output
+            os.remove(docs_path)
+
+    def output_c(self, output_dir: str, all_imports: dict[str, str]) -> None:
+        """Output the wl_interface structs of the protocol as C source
+
+        The definitions follow the private code generated by wayland-scanner,
+        with the symbols prefixed so they do not conflict with the interfaces
+        exported by libwayland.  The sources are compiled by the module output
+        by :func:`output_c_build`.
+
+        :param output_dir: Path of directory to output protocol files to
+        :type output_dir: string
+        """
+        if not os.path.exists(output_dir):
+            os.mkdir(output_dir)
+
+        protocol_name = self.name.replace("-", "_")
+        c_path = os.path.join(output_dir, f"{protocol_name}.c")
+
+        # messages without any interfaces share the nulls at the start
+        max_args = max(
+            (
+                len(method.wire_types)
+                for iface in self.interface
+                for method in iface.request + iface.event
+            ),
+            default=0,
+        )
+        types: list[str | None] = [None] * max_args
+
+        definitions = Printer(protocol_name, all_imports)
+        definitions.clear()
+        for iface in sorted(self.interface):
+            iface.output_c(definitions, protocol_name, all_imports, types)
+
+        printer = Printer(protocol_name, all_imports, head_msg=C_HEAD_MSG)
+        printer("#include <stddef.h>")
+        printer("#include <wayland-util.h>")
+
+        referenced = sorted({symbol for symbol in types if symbol is not None})
+        if referenced:
+            printer()
+        for symbol in referenced:
+            printer(f"extern const struct wl_interface {symbol};")
+
+        printer()
+        printer(
+            f"static const struct wl_interface *pywayland_{protocol_name}__types[] = {{"
+        )
+        with printer.indented():
+            for type_ in types:
+                printer(f"&{type_}," if type_ is not None else "NULL,")
+        printer("};")
+
+        with open(c_path, "wb") as f:
+            printer.write(f)
+            definitions.write(f)
+
+
+def prune_protocols(protocols: list[Protocol], roots: list[str]) -> list[Protocol]:
+    """Keep only the given interfaces and the interfaces they reference
+
+    The interfaces referenced by the arguments of the requests and events of
+    the root interfaces are kept, along with the interfaces that they
+    reference, and so on.  References are resolved as the imports of the
+    generated modules are, to an interface of the same protocol if there is
+    one, otherwise to the protocol given priority by the order of the
+    protocols.
+
+    :param protocols: The parsed protocols
+    :type protocols: list of :class:`Protocol`
+    :param roots: The names of the interfaces to keep
+    :type roots: list of strings
+    :returns:
+        The protocols, in the same order, with only the interfaces that are
+        kept, protocols without any of the interfaces have no interfaces
+    """
+    all_imports = {
+        iface.name: protocol.name
+        for protocol in protocols
+        for iface in protocol.interface
+    }
+    protocol_interfaces = {
+        protocol.name: {iface.name: iface for iface in protocol.interface}
+        for protocol in protocols
+    }
+
+    for root in roots:
+        if root not in all_imports:
+            raise ValueError(f"Interface not found in the protocols: {root}")
+
+    keep: set[tuple[str, str]] = set()
+    pending = [(all_imports[root], root) for root in roots]
+    while pending:
+        protocol_name, iface_name = key = pending.pop()
+        if key in keep:
+            continue
+        keep.add(key)
+
+        interfaces = protocol_interfaces[protocol_name]
+        iface = interfaces[iface_name]
+        for method in iface.request + iface.event:
+            for arg in method.arg:
+                if arg.interface is None:
+                    continue
+                if arg.interface in interfaces:
+                    pending.append((protocol_name, arg.interface))
+                else:
+                    pending.append((all_imports[arg.interface], arg.interface))
+
+    return [
+        replace(
+            protocol,
+            interface=[
+                iface
+                for iface in protocol.interface
+                if (protocol.name, iface.name) in keep
+            ],
+        )
+        for protocol in protocols
+    ]
+
+
+def output_c_build(output_dir: str, protocols: list[Protocol], package: str) -> None:
+    """Output the cffi build module for the C interface tables
+
+    The build module compiles the sources output by :func:`Protocol.output_c`
+    into the :data:`C_TABLES_MODULE` extension of the package, which exposes
+    a pointer to each wl_interface struct as ``<protocol>__<interface>``.  It
+    can be run as a script, or given to the ``cffi_modules`` of setuptools.
+
+    :param output_dir: Path of directory the protocol files are output to
+    :type output_dir: string
+    :param protocols: The protocols to compile the interface tables of
+    :type protocols: list of :class:`Protocol`
+    :param package: The name of the package of the protocol modules
+    :type package: string
+    """
+    interfaces = sorted(
+        (protocol.name.replace("-", "_"), iface.name)
+        for protocol in protocols
+        for iface in protocol.interface
+    )
+
+    printer = Printer(package, {})
+    printer("import os")
+    printer()
+    printer("from cffi import FFI")
+    printer()
+    printer("this_dir = os.path.dirname(os.path.abspath(__file__))")
+    printer()
+    printer('SOURCE = """')
+    for protocol_name in sorted({protocol_name for protocol_name, _ in interfaces}):
+        printer(f'#include "{protocol_name}.c"')
+    printer()
+    for protocol_name, iface_name in interfaces:
+        symbol = c_interface_symbol(protocol_name, iface_name)
+        printer(f"#define {protocol_name}__{iface_name} (&{symbol})")
+    printer('"""')
+    printer()
+    printer('CDEF = """')
+    printer("struct wl_interface;")
+    for protocol_name, iface_name in interfaces:
+        printer(
+            f"static const struct wl_interface *const {protocol_name}__{iface_name};"
+        )
+    printer('"""')
+    printer()
+    printer("ffi_builder = FFI()")
+    printer(
+        f'ffi_builder.set_source("{package}.{C_TABLES_MODULE}", SOURCE, include_dirs=[this_dir])'
+    )
+    printer("ffi_builder.cdef(CDEF)")
+    printer()
+    printer()
+    printer('if __name__ == "__main__":')
+    with printer.indented():
+        # the extension is output relative to the root of the package
+        root = ", ".join(['".."'] * (package.count(".") + 1))
+        printer(f"ffi_builder.compile(tmpdir=os.path.join(this_dir, {root}))")
+
+    build_path = os.path.join(output_dir, f"{C_TABLES_BUILD_MODULE}.py")
+    with open(build_path, "wb") as f:
+        printer.write(f)
+
+
+def remove_c_tables(output_dir: str, protocols: list[Protocol]) -> None:
+    """Remove the C interface tables from the output directory
+
+    Removes the C sources of the protocols, the build module, and the
+    extension that was built from them, so the protocol modules no longer use
+    tables output by an earlier run of the scanner.
+
+    :param output_dir: Path of directory the protocol files are output to
+    :type output_dir: string
+    :param protocols: The protocols to remove the C sources of
+    :type protocols: list of :class:`Protocol`
+    """
+    paths = [
+        os.path.join(output_dir, f"{protocol.name.replace('-', '_')}.c")
+        for protocol in protocols
+    ]
+    paths.append(os.path.join(output_dir, f"{C_TABLES_BUILD_MODULE}.py"))
+    # the source, objects and extension output by the build module
+    paths.extend(glob.glob(os.path.join(output_dir, f"{C_TABLES_MODULE}.*")))
+
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def output_package(output_dir: str, all_imports: dict[str, str]) -> None:
+    """Output the ``__init__.py`` of the package of the protocol modules
+
+    The package has an index of the protocol module and the class of each
+    interface, and imports the protocol modules when they, or the interface
+    classes they define, are first accessed on the package (see :pep:`562`).
+    Interfaces can also be looked up by name with ``get_interface``, e.g.
+    when binding the globals advertised by the registry.
+
+    :param output_dir: Path of directory the protocol files are output to
+    :type output_dir: string
+    :param all_imports:
+        The map from the name of each interface to the protocol that defines
+        it
+    :type all_imports: dict
+    """
+    printer = Printer("__init__", all_imports)
+    printer("from __future__ import annotations")
+    printer()
+    printer("import importlib")
+    printer("from typing import TYPE_CHECKING, Any")
+    printer()
+    printer("if TYPE_CHECKING:")
+    with printer.indented():
+        printer("from pywayland.protocol_core import Interface")
+    printer()
+    printer("# The protocol module and class of each interface, by interface name")
+    printer("INTERFACES: dict[str, tuple[str, str]] = {")
+    with printer.indented():
+        for iface_name, protocol_name in sorted(all_imports.items()):
+            class_name = "".join(x.capitalize() for x in iface_name.split("_"))
+            module = protocol_name.replace("-", "_")
+            printer(f'"{iface_name}": ("{module}", "{class_name}"),')
+    printer("}")
+    printer(PACKAGE_LOOKUP)
+
+    with open(os.path.join(output_dir, "__init__.py"), "wb") as f:
+        printer.write(f)
+
+
+def output_descriptors(output_dir: str, protocols: list[Protocol]) -> None:
+    """Output the descriptor database of the interfaces of the protocols
+
+    The database is a single :mod:`marshal` file with the name, version,
+    messages, argument types and enums of each interface, from which
+    :class:`~pywayland.protocol_core.DescriptorDatabase` builds the interface
+    classes on demand, without importing the protocol modules.  When an
+    interface name is repeated, the interface of the later protocol is kept,
+    as in the package index.
+
+    :param output_dir: Path of directory the protocol files are output to
+    :type output_dir: string
+    :param protocols: The protocols to output the interfaces of
+    :type protocols: list of :class:`Protocol`
+    """
+    interfaces = {
+        iface.name: iface.descriptor(protocol.name.replace("-", "_"))
+        for protocol in protocols
+        for iface in protocol.interface
+    }
+    descriptors = {"format": DESCRIPTORS_FORMAT, "interfaces": interfaces}
+
+    with open(os.path.join(output_dir, DESCRIPTORS_FILE), "wb") as f:
+        marshal.dump(descriptors, f)
+
+
+def remove_descriptors(output_dir: str) -> None:
+    """Remove the descriptor database from the output directory
+
+    :param output_dir: Path of directory the protocol files are output to
+    :type output_dir: string
+    """
+    path = os.path.join(output_dir, DESCRIPTORS_FILE)
+    if os.path.exists(path):
+        os.remove(path)
@@ -40,6 +40,7 @@ class Request(Method):
     """
 
     method_type = "request"
+    class_suffix = "Proxy"
 
     type: str | None
 
@@ -64,6 +65,10 @@ class Request(Method):
                 return arg
         return None
 
+    @property
+    def is_destructor(self) -> bool:
+        return self.type == "destructor"
+
     @property
     def method_args(self) -> Iterable[str]:
         """Generator of the arguments to the method
@@ -140,7 +145,7 @@ class Request(Method):
         else:
             args = ", ".join([str(opcode), *list(self.marshal_args)])
             printer(f"self._marshal({args})")
-            if self.type == "destructor":
+            if self.is_destructor:
                 printer("self._destroy()")
 
     @property
@@ -0,0 +1,115 @@
+/* This file has been autogenerated by the pywayland scanner */
+
+#include <stddef.h>
+#include <wayland-util.h>
+
+extern const struct wl_interface pywayland_scanner_test_v1__wl_core_interface;
+extern const struct wl_interface pywayland_scanner_test_v1__wl_destructor_interface;
+extern const struct wl_interface pywayland_scanner_test_v1__wl_events_interface;
+extern const struct wl_interface pywayland_scanner_test_v1__wl_requests_interface;
+
+static const struct wl_interface *pywayland_scanner_test_v1__types[] = {
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_requests_interface,
+    &pywayland_scanner_test_v1__wl_destructor_interface,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    NULL,
+    &pywayland_scanner_test_v1__wl_requests_interface,
+    NULL,
+    NULL,
+    NULL,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_requests_interface,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    NULL,
+    NULL,
+    NULL,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_core_interface,
+    &pywayland_scanner_test_v1__wl_events_interface,
+    &pywayland_scanner_test_v1__wl_core_interface,
+};
+
+static const struct wl_message pywayland_scanner_test_v1__wl_core_requests[] = {
+    { "make_request", "niuf", pywayland_scanner_test_v1__types + 6 },
+    { "make_request2", "iufn", pywayland_scanner_test_v1__types + 10 },
+};
+
+static const struct wl_message pywayland_scanner_test_v1__wl_core_events[] = {
+    { "send_event", "no", pywayland_scanner_test_v1__types + 14 },
+};
+
+const struct wl_interface pywayland_scanner_test_v1__wl_core_interface = {
+    "wl_core", 1,
+    2, pywayland_scanner_test_v1__wl_core_requests,
+    1, pywayland_scanner_test_v1__wl_core_events,
+};
+
+static const struct wl_message pywayland_scanner_test_v1__wl_destructor_requests[] = {
+    { "create_interface", "niiiiu", pywayland_scanner_test_v1__types + 16 },
+    { "destroy", "", pywayland_scanner_test_v1__types + 0 },
+};
+
+const struct wl_interface pywayland_scanner_test_v1__wl_destructor_interface = {
+    "wl_destructor", 1,
+    2, pywayland_scanner_test_v1__wl_destructor_requests,
+    0, NULL,
+};
+
+static const struct wl_message pywayland_scanner_test_v1__wl_events_events[] = {
+    { "send_event", "niuh", pywayland_scanner_test_v1__types + 22 },
+    { "no_args", "", pywayland_scanner_test_v1__types + 0 },
+    { "create_id", "n", pywayland_scanner_test_v1__types + 26 },
+    { "create_id2", "n", pywayland_scanner_test_v1__types + 27 },
+    { "allow_null_event", "?s", pywayland_scanner_test_v1__types + 0 },
+    { "make_import", "n?o", pywayland_scanner_test_v1__types + 28 },
+    { "versioned", "2", pywayland_scanner_test_v1__types + 0 },
+};
+
+const struct wl_interface pywayland_scanner_test_v1__wl_events_interface = {
+    "wl_events", 2,
+    0, NULL,
+    7, pywayland_scanner_test_v1__wl_events_events,
+};
+
+static const struct wl_message pywayland_scanner_test_v1__wl_requests_requests[] = {
+    { "make_request", "niuh", pywayland_scanner_test_v1__types + 30 },
+    { "no_args", "", pywayland_scanner_test_v1__types + 0 },
+    { "create_id", "n", pywayland_scanner_test_v1__types + 34 },
+    { "create_id2", "n", pywayland_scanner_test_v1__types + 35 },
+    { "allow_null", "u?s", pywayland_scanner_test_v1__types + 0 },
+    { "make_import", "n?o", pywayland_scanner_test_v1__types + 36 },
+    { "versioned", "2", pywayland_scanner_test_v1__types + 0 },
+    { "new_id_no_interface", "usun", pywayland_scanner_test_v1__types + 0 },
+};
+
+const struct wl_interface pywayland_scanner_test_v1__wl_requests_interface = {
+    "wl_requests", 2,
+    8, pywayland_scanner_test_v1__wl_requests_requests,
+    0, NULL,
+};
+
+const struct wl_interface pywayland_scanner_test_v1__wl_xfail_interface = {
+    "wl_xfail", 1,
+    0, NULL,
+    0, NULL,
+};
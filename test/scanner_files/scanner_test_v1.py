@@ -84,6 +84,7 @@ class WlXfail(Interface):
 
 
 class WlCoreResource(Resource[WlCore]):
+    __slots__ = ()
     interface = WlCore
 
     @WlCore.event(
@@ -110,10 +111,12 @@ class WlCoreResource(Resource[WlCore]):
 
 
 class WlDestructorResource(Resource[WlDestructor]):
+    __slots__ = ()
     interface = WlDestructor
 
 
 class WlEventsResource(Resource[WlEvents]):
+    __slots__ = ()
     interface = WlEvents
 
     @WlEvents.event(
@@ -220,14 +223,17 @@ class WlEventsResource(Resource[WlEvents]):
 
 
 class WlRequestsResource(Resource[WlRequests]):
+    __slots__ = ()
     interface = WlRequests
 
 
 class WlXfailResource(Resource[WlXfail]):
+    __slots__ = ()
     interface = WlXfail
 
 
 class WlCoreProxy(Proxy[WlCore]):
+    __slots__ = ()
     interface = WlCore
 
     @WlCore.request(
@@ -286,6 +292,7 @@ class WlCoreProxy(Proxy[WlCore]):
 
 
 class WlDestructorProxy(Proxy[WlDestructor]):
+    __slots__ = ()
     interface = WlDestructor
 
     @WlDestructor.request(
@@ -333,10 +340,12 @@ class WlDestructorProxy(Proxy[WlDestructor]):
 
 
 class WlEventsProxy(Proxy[WlEvents]):
+    __slots__ = ()
     interface = WlEvents
 
 
 class WlRequestsProxy(Proxy[WlRequests]):
+    __slots__ = ()
     interface = WlRequests
 
     @WlRequests.request(
@@ -474,6 +483,7 @@ class WlRequestsProxy(Proxy[WlRequests]):
 
 
 class WlXfailProxy(Proxy[WlXfail]):
+    __slots__ = ()
     interface = WlXfail
 
 
@@ -497,31 +507,26 @@ class WlXfailGlobal(Global[WlXfail]):
     interface = WlXfail
 
 
-WlCore._gen_c()
 WlCore.proxy_class = WlCoreProxy
 WlCore.resource_class = WlCoreResource
 WlCore.global_class = WlCoreGlobal
 
 
-WlDestructor._gen_c()
 WlDestructor.proxy_class = WlDestructorProxy
 WlDestructor.resource_class = WlDestructorResource
 WlDestructor.global_class = WlDestructorGlobal
 
 
-WlEvents._gen_c()
 WlEvents.proxy_class = WlEventsProxy
 WlEvents.resource_class = WlEventsResource
 WlEvents.global_class = WlEventsGlobal
 
 
-WlRequests._gen_c()
 WlRequests.proxy_class = WlRequestsProxy
 WlRequests.resource_class = WlRequestsResource
 WlRequests.global_class = WlRequestsGlobal
 
 
-WlXfail._gen_c()
 WlXfail.proxy_class = WlXfailProxy
 WlXfail.resource_class = WlXfailResource
 WlXfail.global_class = WlXfailGlobal
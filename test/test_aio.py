@@ -0,0 +1,81 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from pywayland.client import Display, EventQueue
+from pywayland.client.aio import AsyncDisplay
+from pywayland.protocol.wayland import WlSeat
+from pywayland.server import Client
+from pywayland.server import Display as ServerDisplay
+
+
+def _run_server(server, stop):
+    event_loop = server.get_event_loop()
+    while not stop.is_set():
+        event_loop.dispatch(10)
+        server.flush_clients()
+
+
+@pytest.fixture
+def client_fd():
+    server = ServerDisplay()
+    seat = WlSeat.global_class(server)
+    seat.bind_func = lambda resource: resource.capabilities(WlSeat.capability.keyboard)
+
+    server_socket, client_socket = socket.socketpair()
+    client = Client(server, server_socket.detach())  # noqa: F841
+
+    stop = threading.Event()
+    thread = threading.Thread(target=_run_server, args=(server, stop))
+    thread.start()
+    try:
+        yield client_socket.detach()
+    finally:
+        stop.set()
+        thread.join()
+        server.destroy()
+
+
+async def _run_client(display):
+    seats = []
+    capabilities = []
+
+    def handle_global(registry, name, interface, version):
+        if interface == "wl_seat":
+            seats.append((name, version))
+
+    def handle_capabilities(seat, value):
+        capabilities.append(value)
+
+    async with AsyncDisplay(display) as async_display:
+        registry = display.get_registry()
+        registry.dispatcher["global"] = handle_global
+        await async_display.roundtrip()
+        assert len(seats) == 1
+
+        name, version = seats[0]
+        seat = registry.bind(name, WlSeat, version)
+        seat.dispatcher["capabilities"] = handle_capabilities
+        assert await async_display.dispatch() == 1
+        assert capabilities == [WlSeat.capability.keyboard]
+
+        queue = EventQueue(display)
+        await async_display.roundtrip(queue=queue)
+        queue.destroy()
+
+
+def test_async_display(client_fd):
+    display = Display(client_fd)
+    display.connect()
+    try:
+        asyncio.run(_run_client(display))
+    finally:
+        display.disconnect()
+
+
+def test_async_display_not_started():
+    async_display = AsyncDisplay(Display())
+    with pytest.raises(RuntimeError):
+        asyncio.run(async_display.roundtrip())
@@ -0,0 +1,239 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import weakref
+
+import pytest
+
+from pywayland import ffi
+from pywayland.client import Display
+from pywayland.dispatcher import Dispatcher, RawArguments, dispatcher_func
+from pywayland.protocol.wayland import WlCompositor, WlOutput, WlRegistry, WlSeat
+
+
+@pytest.fixture
+def display():
+    s1, s2 = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM, 0)
+    display = Display(s1.detach())
+    display.connect()
+    yield display
+    display.disconnect()
+    s2.close()
+
+
+def _dispatch(proxy, name, *args):
+    """Dispatch the event to the proxy, as it would be from libwayland"""
+    opcode = proxy.dispatcher._names[name]
+    args_ptr = proxy.interface.events[opcode].arguments_to_c(*args)
+    dispatcher_func(proxy._handle, proxy._ptr, opcode, ffi.NULL, args_ptr)
+
+
+def test_dispatch_array(display):
+    registry = display.get_registry()
+    surface = registry.bind(1, WlCompositor, 1).create_surface()
+    keyboard = registry.bind(2, WlSeat, 1).get_keyboard()
+
+    received = []
+
+    def _enter(keyboard, serial, surface, keys):
+        received.append((surface, keys))
+
+    keyboard.dispatcher["enter"] = _enter
+    _dispatch(keyboard, "enter", 1, surface, b"\x01\x02")
+
+    ((enter_surface, keys),) = received
+    assert enter_surface is surface
+    assert isinstance(keys, bytes)
+    assert keys == b"\x01\x02"
+
+
+def test_dispatch_array_views(display):
+    registry = display.get_registry()
+    surface = registry.bind(1, WlCompositor, 1).create_surface()
+    keyboard = registry.bind(2, WlSeat, 1).get_keyboard()
+
+    received = []
+
+    def _enter(keyboard, serial, surface, keys):
+        assert keys.readonly
+        received.append((keys, keys.tobytes()))
+
+    keyboard.dispatcher.array_views = True
+    keyboard.dispatcher["enter"] = _enter
+    _dispatch(keyboard, "enter", 1, surface, b"\x01\x02")
+
+    ((view, keys),) = received
+    assert keys == b"\x01\x02"
+    # the view is released once the callback returns
+    with pytest.raises(ValueError):
+        view.tobytes()
+
+
+def test_dispatch_array_views_derived(display):
+    registry = display.get_registry()
+    surface = registry.bind(1, WlCompositor, 1).create_surface()
+    keyboard = registry.bind(2, WlSeat, 1).get_keyboard()
+
+    received = []
+    exported = []
+
+    def _enter(keyboard, serial, surface, keys):
+        # derived views can be used during the callback
+        received.append(bytes(keys[1:]))
+        exported.append(ffi.from_buffer(keys))
+
+    keyboard.dispatcher.array_views = True
+    keyboard.dispatcher["enter"] = _enter
+    # the view cannot be released while its buffer is used
+    with pytest.warns(RuntimeWarning):
+        _dispatch(keyboard, "enter", 1, surface, b"\x01\x02\x03")
+    ffi.release(exported.pop())
+
+    assert received == [b"\x02\x03"]
+
+
+def test_dispatch_raw(display):
+    registry = display.get_registry()
+    pointer = registry.bind(1, WlSeat, 1).get_pointer()
+
+    received = []
+
+    def _motion(pointer, time, x, y):
+        received.append(("motion", time, x, y))
+
+    def _motion_raw(pointer, opcode, args):
+        received.append(("raw", args.uint32(0), args.fixed(1), args.fixed(2)))
+
+    pointer.dispatcher["motion"] = _motion
+    pointer.dispatcher.set_raw("motion", _motion_raw)
+    assert pointer.dispatcher.get_raw("motion") is _motion_raw
+
+    # the raw callback is used in place of the callback
+    _dispatch(pointer, "motion", 10, 1.5, -2.25)
+    assert received == [("raw", 10, 1.5, -2.25)]
+
+    pointer.dispatcher.set_raw("motion", None)
+    _dispatch(pointer, "motion", 11, 0.5, 2)
+    assert received[1] == ("motion", 11, 0.5, 2.0)
+
+
+def test_dispatch_raw_objects(display):
+    registry = display.get_registry()
+    surface = registry.bind(1, WlCompositor, 1).create_surface()
+    keyboard = registry.bind(2, WlSeat, 1).get_keyboard()
+
+    received = []
+
+    def _enter_raw(keyboard, opcode, args):
+        received.append((args.uint32(0), args.object(1), args.array(2)))
+
+    keyboard.dispatcher.set_raw("enter", _enter_raw)
+    _dispatch(keyboard, "enter", 7, surface, b"\x01\x02")
+    assert received == [(7, surface, b"\x01\x02")]
+    assert type(received[0][2]) is bytes
+
+
+def test_raw_arguments_slots():
+    # the untyped new_id of bind takes three slots, name, version and id
+    message = WlRegistry.requests[0]
+    args_ptr = message.arguments_to_c(3, "wl_seat", 5)
+    args_ptr[3].n = 42
+
+    args = RawArguments(args_ptr, message)
+    assert args.uint32(0) == 3
+    assert args.uint32(1) == 42
+
+
+def test_raw_new_id_rejected():
+    dispatcher = Dispatcher(WlCompositor.requests)
+    with pytest.raises(ValueError):
+        dispatcher.set_raw("create_surface", lambda resource, opcode, args: None)
+
+
+def test_dispatcher_defaults(display):
+    registry = display.get_registry()
+    compositor = registry.bind(1, WlCompositor, 1)
+    output = registry.bind(2, WlOutput, 1)
+
+    received = []
+
+    def _enter(surface, output):
+        received.append(("default", surface))
+
+    def _leave(surface, output):
+        received.append(("instance", surface))
+
+    surface_proxy_class = type(compositor.create_surface())
+    defaults = surface_proxy_class.dispatcher_defaults
+    assert defaults is surface_proxy_class.dispatcher_defaults
+    assert defaults.messages is surface_proxy_class.interface.events
+
+    defaults["enter"] = _enter
+    try:
+        surface_a = compositor.create_surface()
+        surface_b = compositor.create_surface()
+
+        # the proxies use the defaults until the dispatcher is customized,
+        # reading the dispatcher does not copy the defaults
+        assert surface_a._dispatcher is defaults
+        assert surface_a.dispatcher["enter"] is _enter
+        assert not surface_a.dispatcher.array_views
+        assert surface_a._dispatcher is defaults
+        surface_a.dispatcher["leave"] = _leave
+        assert surface_a._dispatcher is not defaults
+        assert defaults["leave"] is None
+        assert surface_b._dispatcher is defaults
+
+        _dispatch(surface_a, "leave", output)
+        _dispatch(surface_b, "enter", output)
+        _dispatch(surface_b, "leave", output)
+        assert received == [("instance", surface_a), ("default", surface_b)]
+    finally:
+        defaults["enter"] = None
+
+
+def test_dispatcher_defaults_subclass(display):
+    registry = display.get_registry()
+    compositor = registry.bind(1, WlCompositor, 1)
+    surface_proxy_class = type(compositor.create_surface())
+
+    def _enter(surface, output):
+        pass
+
+    # the subclass starts from the defaults of its base class
+    surface_proxy_class.dispatcher_defaults["enter"] = _enter
+    try:
+
+        class SurfaceProxy(surface_proxy_class):
+            __slots__ = ()
+
+        defaults = SurfaceProxy.dispatcher_defaults
+        assert defaults is not surface_proxy_class.dispatcher_defaults
+        assert defaults["enter"] is _enter
+
+        defaults["leave"] = _enter
+        assert surface_proxy_class.dispatcher_defaults["leave"] is None
+    finally:
+        surface_proxy_class.dispatcher_defaults["enter"] = None
+
+
+def test_proxy_slots(display):
+    registry = display.get_registry()
+    callback = display.sync()
+
+    # proxies are compact, but can still be weakly referenced
+    for proxy in (registry, callback):
+        assert not hasattr(proxy, "__dict__")
+        assert weakref.ref(proxy)() is proxy
@@ -0,0 +1,53 @@
+import select
+import socket
+import threading
+
+from pywayland.client import Display
+
+
+def _drain(sock):
+    while sock.recv(4096):
+        pass
+
+
+def test_flush_backpressure():
+    server_socket, client_socket = socket.socketpair()
+    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+    display = Display(client_socket.detach())
+    display.connect()
+    try:
+        assert display.flush_stats.flushes == 0
+        assert display.poll_events() == select.POLLIN
+
+        # nothing reads from the server socket, so it eventually fills up
+        callbacks = []
+        for _ in range(100000):
+            callbacks.append(display.sync())
+            if display.flush() == -1:
+                break
+
+        assert display.flush_pending
+        assert display.poll_events() == select.POLLIN | select.POLLOUT
+        assert not display.wait_flush(timeout=0.01)
+
+        stats = display.flush_stats
+        assert stats.pending
+        assert stats.eagain >= 2
+        assert stats.bytes_sent > 0
+        assert stats.blocked_time > 0
+
+        thread = threading.Thread(target=_drain, args=(server_socket,))
+        thread.start()
+        assert display.wait_flush()
+        assert not display.flush_pending
+
+        stats = display.flush_stats
+        assert not stats.pending
+        assert stats.bytes_sent == 12 * len(callbacks)
+        assert stats.blocked_time > 0
+    finally:
+        display.disconnect()
+
+    thread.join()
+    server_socket.close()
@@ -0,0 +1,229 @@
+# Copyright 2015 Sean Vig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+from pywayland import ffi
+from pywayland.client import Display as ClientDisplay
+from pywayland.protocol.wayland import (
+    WlBuffer,
+    WlCompositor,
+    WlDataDevice,
+    WlDataOffer,
+    WlKeyboard,
+    WlPointer,
+    WlRegistry,
+    WlSurface,
+)
+from pywayland.server import Client
+from pywayland.server import Display as ServerDisplay
+
+
+def _get_message(messages, name):
+    return next(message for message in messages if message.name == name)
+
+
+def test_arguments_to_c_numbers():
+    damage_buffer = _get_message(WlSurface.requests, "damage_buffer")
+    args_ptr = damage_buffer.arguments_to_c(1, -2, 3, 4)
+
+    assert [args_ptr[i].i for i in range(4)] == [1, -2, 3, 4]
+
+    motion = _get_message(WlPointer.events, "motion")
+    args_ptr = motion.arguments_to_c(10, 1.5, 2)
+
+    assert args_ptr[0].u == 10
+    assert args_ptr[1].f == 384
+    assert args_ptr[2].f == 512
+
+
+def test_arguments_to_c_new_id():
+    bind = _get_message(WlRegistry.requests, "bind")
+    args_ptr = bind.arguments_to_c(3, "wl_seat", 5)
+
+    assert args_ptr[0].u == 3
+    assert ffi.string(args_ptr[1].s) == b"wl_seat"
+    assert args_ptr[2].u == 5
+    # the new_id is filled in on marshal
+    assert args_ptr[3].o == ffi.NULL
+
+
+def test_arguments_to_c_nullable():
+    accept = _get_message(WlDataOffer.requests, "accept")
+
+    args_ptr = accept.arguments_to_c(7, None)
+    assert args_ptr[1].s == ffi.NULL
+
+    args_ptr = accept.arguments_to_c(7, "text/plain")
+    assert ffi.string(args_ptr[1].s) == b"text/plain"
+
+
+def test_arguments_to_c_array():
+    keys = b"\x01\x00\x00\x00\x02\x00\x00\x00"
+    surface = SimpleNamespace(_ptr=ffi.cast("struct wl_proxy *", 0x1000))
+    enter = _get_message(WlKeyboard.events, "enter")
+
+    args_ptr = enter.arguments_to_c(1, surface, keys)
+    assert args_ptr[2].a.size == len(keys)
+    assert ffi.buffer(args_ptr[2].a.data, args_ptr[2].a.size)[:] == keys
+
+    # the surface is not nullable
+    with pytest.raises(Exception):
+        enter.arguments_to_c(1, None, keys)
+
+
+def test_arguments_to_c_array_buffer():
+    surface = SimpleNamespace(_ptr=ffi.cast("struct wl_proxy *", 0x1000))
+    enter = _get_message(WlKeyboard.events, "enter")
+
+    # any buffer can be passed, and is not copied
+    keys = array.array("I", [1, 2])
+    args_ptr = enter.arguments_to_c(1, surface, memoryview(keys))
+    assert args_ptr[2].a.size == 8
+
+    keys[1] = 3
+    data = ffi.cast("uint32_t *", args_ptr[2].a.data)
+    assert [data[0], data[1]] == [1, 3]
+
+
+def test_arguments_to_c_argument_count():
+    damage_buffer = _get_message(WlSurface.requests, "damage_buffer")
+
+    with pytest.raises(TypeError):
+        damage_buffer.arguments_to_c(1, 2, 3)
+
+
+def test_c_to_arguments():
+    motion = _get_message(WlPointer.events, "motion")
+    args_ptr = motion.arguments_to_c(10, 1.5, -2)
+
+    assert motion.c_to_arguments(args_ptr) == [10, 1.5, -2.0]
+
+    accept = _get_message(WlDataOffer.requests, "accept")
+    assert accept.c_to_arguments(accept.arguments_to_c(7, None)) == [7, None]
+    assert accept.c_to_arguments(accept.arguments_to_c(7, "text/plain")) == [
+        7,
+        "text/plain",
+    ]
+
+
+def test_c_to_arguments_non_nullable():
+    attach = _get_message(WlSurface.requests, "attach")
+    args_ptr = attach.arguments_to_c(None, 0, 0)
+
+    # the wl_buffer is nullable
+    assert attach.c_to_arguments(args_ptr) == [None, 0, 0]
+
+    # but the wl_surface is not
+    enter = _get_message(WlKeyboard.events, "enter")
+    args_ptr = ffi.new("union wl_argument []", 3)
+    with pytest.raises(RuntimeError):
+        enter.c_to_arguments(args_ptr)
+
+
+def test_c_to_arguments_new_id_needs_display():
+    data_offer = _get_message(WlDataDevice.events, "data_offer")
+    args_ptr = ffi.new("union wl_argument []", 1)
+
+    # new proxies are created on the display of the receiving proxy
+    with pytest.raises(RuntimeError):
+        data_offer.c_to_arguments(args_ptr)
+
+
+def test_c_to_arguments_object_proxy():
+    s1, s2 = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM, 0)
+    display = ClientDisplay(s1.detach())
+    display.connect()
+
+    registry = display.get_registry()
+    compositor = registry.bind(1, WlCompositor, 1)
+    surface = compositor.create_surface()
+
+    enter = _get_message(WlKeyboard.events, "enter")
+    args = enter.c_to_arguments(enter.arguments_to_c(1, surface, b""))
+    assert args[1] is surface
+
+    # the wl_display proxy does not have a dispatcher from pywayland
+    args_ptr = enter.arguments_to_c(1, display, b"")
+    with pytest.raises(RuntimeError):
+        enter.c_to_arguments(args_ptr)
+
+    display.disconnect()
+    s2.close()
+
+
+def test_c_to_arguments_object_resource():
+    s1, s2 = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM, 0)
+    display = ServerDisplay()
+    client = Client(display, s1.fileno())
+
+    surface = WlSurface.resource_class(client, version=1)
+    buffer = WlBuffer.resource_class(client, version=1)
+
+    attach = _get_message(WlSurface.requests, "attach")
+    args = attach.c_to_arguments(attach.arguments_to_c(buffer, 0, 0))
+    assert args == [buffer, 0, 0]
+
+    # resources are checked against the interface of the argument
+    args_ptr = attach.arguments_to_c(surface, 0, 0)
+    with pytest.raises(RuntimeError):
+        attach.c_to_arguments(args_ptr)
+
+    client.destroy()
+    display.destroy()
+    s2.close()
+
+
+def test_marshal_arguments():
+    accept = _get_message(WlDataOffer.requests, "accept")
+
+    arguments = accept.marshal_arguments(7, "text/plain")
+    args_ptr = arguments.args_ptr
+    assert args_ptr[0].u == 7
+    assert ffi.string(args_ptr[1].s) == b"text/plain"
+    assert len(arguments.refs) == 1
+
+    # while the scratch array is in use, a new array is filled
+    nested = accept.marshal_arguments(8, None)
+    assert nested.args_ptr != args_ptr
+    nested.release()
+
+    arguments.release()
+    assert arguments.refs == []
+
+    # once released, the array is reused and previous values are cleared
+    arguments = accept.marshal_arguments(9, None)
+    assert arguments.args_ptr == args_ptr
+    assert args_ptr[0].u == 9
+    assert args_ptr[1].s == ffi.NULL
+    arguments.release()
+
+    # new ids are null, even if the slot was used by the last message
+    damage_buffer = _get_message(WlSurface.requests, "damage_buffer")
+    damage_buffer.marshal_arguments(1, 2, 3, 4).release()
+    bind = _get_message(WlRegistry.requests, "bind")
+    arguments = bind.marshal_arguments(3, "wl_seat", 5)
+    assert arguments.args_ptr[3].o == ffi.NULL
+    arguments.release()
+
+
+def test_marshal_arguments_argument_count():
+    damage_buffer = _get_message(WlSurface.requests, "damage_buffer")
+
+    with pytest.raises(TypeError):
+        damage_buffer.marshal_arguments(1, 2, 3)
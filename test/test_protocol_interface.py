@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import re
+from types import SimpleNamespace
 
 import pytest
 from cffi import FFI
@@ -41,6 +42,7 @@ from pywayland.protocol.wayland import (
     WlSurface,
     WlTouch,
 )
+from pywayland.protocol_core import Argument, ArgumentType, Interface
 
 ffi = FFI()
 
@@ -163,3 +165,87 @@ def test_wl_interface(py_cls, wl_ptr):
     assert wl_ptr.event_count == py_ptr.event_count
     for i in range(wl_ptr.event_count):
         verify_wl_message(py_ptr.events[i], wl_ptr.events[i])
+
+
+def test_wl_interface_lazy():
+    """The wl_interface is generated on first use, handling cycles"""
+
+    class Parent(Interface):
+        name = "parent"
+        version = 1
+
+    class Child(Interface):
+        name = "child"
+        version = 1
+
+    Parent.request(Argument(ArgumentType.NewId, interface=Child))(lambda self: None)
+    Child.event(Argument(ArgumentType.Object, interface=Parent))(lambda self: None)
+
+    assert Parent._interface_ptr is None
+    assert Child._interface_ptr is None
+
+    parent_ptr = Parent._ptr
+    assert Parent._ptr is parent_ptr
+    assert Child._interface_ptr is not None
+
+    assert parent_ptr.methods[0].types[0] == Child._ptr
+    assert Child._ptr.events[0].types[0] == parent_ptr
+
+
+def test_wl_interface_c_tables(monkeypatch):
+    """The wl_interface is taken from the compiled C tables of the package"""
+    from pywayland import ffi as pywayland_ffi
+    from pywayland.protocol_core import interface
+
+    class Tabled(Interface):
+        name = "tabled"
+        version = 1
+
+    class Stale(Interface):
+        name = "stale"
+        version = 2
+
+    class Changed(Interface):
+        name = "changed"
+        version = 1
+
+    @Changed.request(Argument(ArgumentType.Uint))
+    def request(self, value):
+        pass
+
+    # the tables were built when the argument was an int
+    class Built(Interface):
+        name = "changed"
+        version = 1
+
+    @Built.request(Argument(ArgumentType.Int))
+    def request(self, value):  # noqa: F811
+        pass
+
+    # the structs of the tables are looked up by module and interface name
+    package, _, module = __name__.rpartition(".")
+    tabled_ptr = pywayland_ffi.new("struct wl_interface *")
+    interface._fill_interface(tabled_ptr, "tabled", 1, [], [])
+    stale_ptr = pywayland_ffi.new("struct wl_interface *")
+    interface._fill_interface(stale_ptr, "stale", 1, [], [])
+    changed_ptr = Built._ptr
+    lib = SimpleNamespace(
+        **{
+            f"{module}__tabled": tabled_ptr,
+            f"{module}__stale": stale_ptr,
+            f"{module}__changed": changed_ptr,
+        }
+    )
+    monkeypatch.setitem(
+        interface._c_tables, package, SimpleNamespace(ffi=pywayland_ffi, lib=lib)
+    )
+
+    assert Tabled._ptr == tabled_ptr
+
+    # the tables do not match the interface, so the struct is generated
+    assert Stale._ptr != stale_ptr
+    assert Stale._ptr.version == 2
+
+    # the number of messages is the same, but not their signatures
+    assert Changed._ptr != changed_ptr
+    assert pywayland_ffi.string(Changed._ptr.methods[0].signature) == b"u"
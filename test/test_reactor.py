@@ -0,0 +1,176 @@
+import logging
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from pywayland.client import Display, Reactor
+from pywayland.protocol.wayland import WlSeat
+from pywayland.server import Client
+from pywayland.server import Display as ServerDisplay
+
+
+def _run_server(server, stop):
+    event_loop = server.get_event_loop()
+    while not stop.is_set():
+        event_loop.dispatch(10)
+        server.flush_clients()
+
+
+def _connect(server):
+    server_socket, client_socket = socket.socketpair()
+    client = Client(server, server_socket.detach())
+
+    display = Display(client_socket.detach())
+    display.connect()
+    return display, client
+
+
+def test_reactor():
+    servers = [ServerDisplay() for _ in range(3)]
+    for server in servers:
+        WlSeat.global_class(server)
+    connections = [_connect(server) for server in servers]
+
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_run_server, args=(server, stop)) for server in servers
+    ]
+    for thread in threads:
+        thread.start()
+
+    globals_ = {}
+    registries = []
+    errors = []
+    with Reactor(on_error=lambda display, error: errors.append(display)) as reactor:
+        for display, _ in connections:
+            reactor.register(display)
+
+            def handle_global(registry, name, interface, version, display=display):
+                globals_.setdefault(display, []).append(interface)
+
+            registry = display.get_registry()
+            registry.dispatcher["global"] = handle_global
+            registries.append(registry)
+
+        while len(globals_) < len(connections):
+            reactor.run_once(timeout=5)
+        for display, _ in connections:
+            assert "wl_seat" in globals_[display]
+
+        # a display whose server has gone away is unregistered
+        server_socket, client_socket = socket.socketpair()
+        closed_display = Display(client_socket.detach())
+        closed_display.connect()
+        reactor.register(closed_display)
+        server_socket.close()
+        while not errors:
+            reactor.run_once(timeout=5)
+        assert errors == [closed_display]
+        assert reactor.displays == [display for display, _ in connections]
+        closed_display.disconnect()
+
+        # the reactor can be stopped from another thread
+        run_thread = threading.Thread(target=reactor.run)
+        run_thread.start()
+        reactor.stop()
+        run_thread.join()
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    for display, client in connections:
+        display.disconnect()
+        client.destroy()
+    for server in servers:
+        server.destroy()
+
+
+def _drain(sock):
+    while sock.recv(4096):
+        pass
+
+
+def test_reactor_flush():
+    server_socket, client_socket = socket.socketpair()
+    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+    display = Display(client_socket.detach())
+    display.connect()
+    with Reactor() as reactor:
+        reactor.register(display)
+        key = reactor._selector.get_key(display.get_fd())
+
+        # nothing reads from the server socket, so it eventually fills up
+        callbacks = []
+        for _ in range(100000):
+            callbacks.append(display.sync())
+            if display.flush() == -1:
+                break
+
+        # the display is watched for being writable while the socket is full
+        reactor.run_once(timeout=0)
+        assert display.flush_pending
+        assert reactor._selector.get_key(key.fileobj).events == (
+            selectors.EVENT_READ | selectors.EVENT_WRITE
+        )
+
+        thread = threading.Thread(target=_drain, args=(server_socket,))
+        thread.start()
+        for _ in range(500):
+            if not display.flush_pending:
+                break
+            reactor.run_once(timeout=0.01)
+
+        assert not display.flush_pending
+        assert reactor._selector.get_key(key.fileobj).events == selectors.EVENT_READ
+        assert display.flush_stats.bytes_sent == 12 * len(callbacks)
+
+    display.disconnect()
+    thread.join()
+    server_socket.close()
+
+
+def test_reactor_errors(caplog):
+    displays = []
+    server_sockets = []
+    for _ in range(2):
+        server_socket, client_socket = socket.socketpair()
+        display = Display(client_socket.detach())
+        display.connect()
+        displays.append(display)
+        server_sockets.append(server_socket)
+
+    with Reactor() as reactor:
+        for display in displays:
+            reactor.register(display)
+        for server_socket in server_sockets:
+            server_socket.close()
+
+        # the first error is raised, the errors of the others are logged
+        with caplog.at_level(logging.ERROR, logger="pywayland.client.reactor"):
+            with pytest.raises(RuntimeError):
+                for _ in range(100):
+                    reactor.run_once(timeout=5)
+
+        assert reactor.displays == []
+        assert len(caplog.records) == 1
+        assert caplog.records[0].exc_info is not None
+
+    for display in displays:
+        display.disconnect()
+
+
+def test_reactor_lazy_import():
+    # the reactor and reader thread are imported on first use
+    code = """
+import sys
+import pywayland.client
+assert "pywayland.client.reactor" not in sys.modules
+assert "pywayland.client.reader" not in sys.modules
+assert pywayland.client.Reactor is sys.modules["pywayland.client.reactor"].Reactor
+"""
+    subprocess.check_call([sys.executable, "-c", code])
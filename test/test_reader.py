@@ -0,0 +1,97 @@
+import socket
+import threading
+
+import pytest
+
+from pywayland.client import Display, EventQueue, ReaderThread
+from pywayland.protocol.wayland import WlSeat
+from pywayland.server import Client
+from pywayland.server import Display as ServerDisplay
+
+
+def _run_server(server, stop):
+    event_loop = server.get_event_loop()
+    while not stop.is_set():
+        event_loop.dispatch(10)
+        server.flush_clients()
+
+
+@pytest.fixture
+def display():
+    server = ServerDisplay()
+    seat = WlSeat.global_class(server)
+    seat.bind_func = lambda resource: resource.capabilities(WlSeat.capability.pointer)
+
+    server_socket, client_socket = socket.socketpair()
+    client = Client(server, server_socket.detach())  # noqa: F841
+
+    stop = threading.Event()
+    thread = threading.Thread(target=_run_server, args=(server, stop))
+    thread.start()
+
+    client_display = Display(client_socket.detach())
+    client_display.connect()
+    try:
+        yield client_display
+    finally:
+        client_display.disconnect()
+        stop.set()
+        thread.join()
+        server.destroy()
+
+
+def test_reader_thread(display):
+    seats = []
+
+    def handle_global(registry, name, interface, version):
+        if interface == "wl_seat":
+            seats.append((name, version))
+
+    registry = display.get_registry()
+    registry.dispatcher["global"] = handle_global
+    display.roundtrip()
+    assert len(seats) == 1
+    name, version = seats[0]
+
+    # each thread dispatches the events of its own seat
+    handled = {}
+
+    def handle_capabilities(seat, capabilities):
+        handled[threading.current_thread().name] = capabilities
+
+    queues = []
+    for _ in range(2):
+        queue = EventQueue(display)
+        seat = registry.bind(name, WlSeat, version)
+        seat.set_queue(queue)
+        seat.dispatcher["capabilities"] = handle_capabilities
+        queues.append((queue, seat))
+
+    results = {}
+
+    def run_dispatch(reader, queue):
+        results[threading.current_thread().name] = reader.dispatch(
+            queue=queue, timeout=5
+        )
+
+    with ReaderThread(display) as reader:
+        threads = [
+            threading.Thread(target=run_dispatch, args=(reader, queue), name=f"t{i}")
+            for i, (queue, _) in enumerate(queues)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # nothing is sent to the default queue
+        assert reader.dispatch(timeout=0.05) == 0
+
+    assert results == {"t0": 1, "t1": 1}
+    assert handled == {
+        "t0": WlSeat.capability.pointer,
+        "t1": WlSeat.capability.pointer,
+    }
+    assert not reader.running
+    with pytest.raises(RuntimeError):
+        reader.dispatch(timeout=0)
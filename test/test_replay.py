@@ -0,0 +1,178 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from pywayland.client import Display as ClientDisplay
+from pywayland.protocol.wayland import WlSeat, WlShm
+from pywayland.replay import (
+    Chunk,
+    RecordedFd,
+    Recorder,
+    RecordingWriter,
+    read_recording,
+    replay,
+)
+from pywayland.server import Client
+from pywayland.server import Display as ServerDisplay
+from pywayland.utils import AnonymousFile
+
+
+def test_recording():
+    chunks = [
+        Chunk(0.0, True, b"\x01\x00\x00\x00\x0c\x00\x01\x00\x02\x00\x00\x00"),
+        Chunk(0.5, False, b"abcd", [RecordedFd(4096), RecordedFd(None)]),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "test.wlrec")
+        with RecordingWriter(path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+
+        assert list(read_recording(path)) == chunks
+
+
+def _run_client(fd):
+    display = ClientDisplay(fd)
+    display.connect()
+
+    def handle_global(registry, name, interface, version):
+        if interface == "wl_seat":
+            registry.bind(name, WlSeat, version)
+        elif interface == "wl_shm":
+            shm = registry.bind(name, WlShm, version)
+            with AnonymousFile(4096) as pool_fd:
+                shm.create_pool(pool_fd, 4096)
+
+    registry = display.get_registry()
+    registry.dispatcher["global"] = handle_global
+    display.roundtrip()
+    display.roundtrip()
+    display.disconnect()
+
+
+def _dispatch_until(server, thread):
+    event_loop = server.get_event_loop()
+    while thread.is_alive():
+        event_loop.dispatch(10)
+        server.flush_clients()
+    thread.join()
+    event_loop.dispatch(0)
+
+
+def test_record_replay():
+    server = ServerDisplay()
+    server.init_shm()
+    seat = WlSeat.global_class(server)
+    bound = []
+    seat.bind_func = bound.append
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_path = os.path.join(tmpdir, "server")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(server_path)
+        listener.listen()
+
+        recorder = Recorder(os.path.join(tmpdir, "record"), server_path, tmpdir)
+        recorder_thread = threading.Thread(target=recorder.run)
+        recorder_thread.start()
+        try:
+            client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client_socket.connect(recorder.listen_path)
+            client_thread = threading.Thread(
+                target=_run_client, args=(client_socket.detach(),)
+            )
+            client_thread.start()
+
+            # the recorder connects to the server when the client connects
+            connection, _ = listener.accept()
+            recorded_client = Client(server, connection.detach())  # noqa: F841
+            _dispatch_until(server, client_thread)
+        finally:
+            recorder.stop()
+            recorder_thread.join()
+            recorder.close()
+            listener.close()
+
+        assert len(bound) == 1
+        assert len(recorder.recordings) == 1
+        chunks = list(read_recording(recorder.recordings[0]))
+
+    assert any(chunk.request for chunk in chunks)
+    assert any(not chunk.request for chunk in chunks)
+    assert [fd for chunk in chunks for fd in chunk.fds] == [RecordedFd(4096)]
+    times = [chunk.time for chunk in chunks]
+    assert times == sorted(times)
+
+    # the recorded requests bind the seat again, and create the shm pool
+    server_socket, replay_socket = socket.socketpair(
+        socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC
+    )
+    replayed_client = Client(server, server_socket.detach())  # noqa: F841
+    replay_thread = threading.Thread(target=replay, args=(chunks, replay_socket, None))
+    replay_thread.start()
+    _dispatch_until(server, replay_thread)
+    replay_socket.close()
+
+    assert len(bound) == 2
+
+    server.destroy()
+
+
+def test_record_peer_not_reading():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server_path = os.path.join(tmpdir, "server")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(server_path)
+        listener.listen()
+
+        recorder = Recorder(os.path.join(tmpdir, "record"), server_path, tmpdir)
+        recorder_thread = threading.Thread(target=recorder.run)
+        recorder_thread.start()
+        try:
+            stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            stalled.settimeout(5)
+            stalled.connect(recorder.listen_path)
+            stalled_server, _ = listener.accept()
+            stalled_server.setblocking(False)
+
+            # the client does not read, so the recorder stops reading from the
+            # server once its buffer is full
+            data = bytes(range(256)) * 16
+            sent = 0
+            blocked = 0
+            while blocked < 5:
+                try:
+                    sent += stalled_server.send(data[sent % len(data) :])
+                    blocked = 0
+                except BlockingIOError:
+                    blocked += 1
+                    time.sleep(0.02)
+
+            # the other clients are still forwarded
+            other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            other.settimeout(5)
+            other.connect(recorder.listen_path)
+            other_server, _ = listener.accept()
+            other_server.settimeout(5)
+            other.sendall(b"ping")
+            assert other_server.recv(4) == b"ping"
+            other_server.sendall(b"pong")
+            assert other.recv(4) == b"pong"
+
+            # the buffered data is sent once the client reads
+            received = bytearray()
+            while len(received) < sent:
+                received += stalled.recv(65536)
+            expected = (data * (sent // len(data) + 1))[:sent]
+            assert received == expected
+
+            for sock in (stalled, stalled_server, other, other_server):
+                sock.close()
+        finally:
+            recorder.stop()
+            recorder_thread.join()
+            recorder.close()
+            listener.close()
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import socket
+import weakref
 
 from pywayland.protocol.wayland import WlDisplay
 from pywayland.server import Client, Display, Listener
@@ -109,3 +110,22 @@ def notest_create_resource_with_same_id():
     display.destroy()
 
     s2.close()
+
+
+def test_resource_slots():
+    s1, s2 = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM, 0)
+    display = Display()
+    client = Client(display, s1.fileno())
+
+    res = WlDisplay.resource_class(client, version=4)
+
+    # resources are compact, but can still be weakly referenced
+    assert not hasattr(res, "__dict__")
+    assert weakref.ref(res)() is res
+    res.user_data = 0xBEE
+    assert res.user_data == 0xBEE
+
+    client.destroy()
+    display.destroy()
+
+    s2.close()
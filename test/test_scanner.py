@@ -12,12 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib
+import importlib.util
+import inspect
 import os
+import subprocess
+import sys
 import tempfile
+from types import SimpleNamespace
 
 import pytest
 
+from pywayland.protocol_core import DescriptorDatabase, load_docs
 from pywayland.scanner import Protocol
+from pywayland.scanner.cache import OutputCache, input_digest
+from pywayland.scanner.protocol import (
+    DESCRIPTORS_FILE,
+    output_descriptors,
+    output_package,
+    prune_protocols,
+    remove_c_tables,
+)
 
 this_dir = os.path.split(__file__)[0]
 scanner_dir = os.path.join(this_dir, "scanner_files")
@@ -63,3 +78,290 @@ def test_protocol(protocol_directory, protocol_name):
 
     # Should both be the same length
     assert len(gen_lines) == len(check_lines)
+
+
+def test_protocol_c_tables():
+    protocol = Protocol.parse_file(input_file)
+
+    imports = {interface.name: protocol.name for interface in protocol.interface}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        protocol.output_c(output_dir, imports)
+
+        generated_file = os.path.join(output_dir, "scanner_test_v1.c")
+        with open(generated_file) as f:
+            gen_lines = [line.strip("\n") for line in f.readlines()]
+
+    check_file = os.path.join(scanner_dir, "scanner_test_v1.c")
+    with open(check_file) as f:
+        check_lines = [line.strip("\n") for line in f.readlines()]
+
+    assert gen_lines == check_lines
+
+
+def test_remove_c_tables():
+    protocol = Protocol.parse_file(input_file)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        kept = ["scanner_test_v1.py", "_interfaces_docs.json"]
+        removed = [
+            "scanner_test_v1.c",
+            "_interfaces_build.py",
+            "_interfaces.c",
+            "_interfaces.cpython-311-x86_64-linux-gnu.so",
+        ]
+        for filename in kept + removed:
+            open(os.path.join(output_dir, filename), "w").close()
+
+        remove_c_tables(output_dir, [protocol])
+
+        assert sorted(os.listdir(output_dir)) == sorted(kept)
+
+
+def test_protocol_package():
+    protocol = Protocol.parse_file(input_file)
+
+    imports = {interface.name: protocol.name for interface in protocol.interface}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        package_dir = os.path.join(output_dir, "scanner_package")
+        protocol.output(package_dir, imports)
+        output_package(package_dir, imports)
+
+        sys.path.insert(0, output_dir)
+        try:
+            package = importlib.import_module("scanner_package")
+
+            # the protocol modules are imported on first use
+            assert "scanner_package.scanner_test_v1" not in sys.modules
+            wl_core = package.get_interface("wl_core")
+            assert wl_core.name == "wl_core"
+            assert "scanner_package.scanner_test_v1" in sys.modules
+
+            assert package.WlCore is wl_core
+            assert package.scanner_test_v1.WlEvents is package.WlEvents
+            assert "WlRequests" in dir(package)
+
+            with pytest.raises(AttributeError):
+                package.WlMissing
+        finally:
+            sys.path.remove(output_dir)
+            sys.modules.pop("scanner_package", None)
+            sys.modules.pop("scanner_package.scanner_test_v1", None)
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_protocol_strip_docs():
+    protocol = Protocol.parse_file(input_file)
+
+    imports = {interface.name: protocol.name for interface in protocol.interface}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        protocol.output(output_dir, imports, strip_docs=True)
+
+        assert set(os.listdir(output_dir)) == {
+            "scanner_test_v1.py",
+            "scanner_test_v1_docs.json",
+        }
+
+        generated_file = os.path.join(output_dir, "scanner_test_v1.py")
+        with open(generated_file) as f:
+            assert '"""' not in f.read()
+
+        stripped = _load_module("scanner_test_v1_stripped", generated_file)
+        assert stripped.WlCore.__doc__ is None
+        assert load_docs(stripped)
+
+    # the docs are the same as the docstrings of the full module
+    full = _load_module(
+        "scanner_test_v1_full", os.path.join(scanner_dir, "scanner_test_v1.py")
+    )
+    for name in ("WlCore", "WlEventsResource", "WlRequestsProxy"):
+        full_class = getattr(full, name)
+        stripped_class = getattr(stripped, name)
+        assert inspect.getdoc(stripped_class) == inspect.getdoc(full_class)
+        for attr, value in vars(full_class).items():
+            if callable(value) and not attr.startswith("_"):
+                stripped_method = getattr(stripped_class, attr)
+                assert inspect.getdoc(stripped_method) == inspect.getdoc(value)
+
+
+def _message_descriptor(message):
+    arguments = [
+        (
+            argument.argument_type,
+            argument.interface and argument.interface.name,
+            argument.nullable,
+        )
+        for argument in message.arguments
+    ]
+    return message.name, message.version, arguments
+
+
+def test_protocol_descriptors():
+    protocol = Protocol.parse_file(input_file)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_descriptors(output_dir, [protocol])
+        database = DescriptorDatabase(os.path.join(output_dir, DESCRIPTORS_FILE))
+
+    generated = _load_module(
+        "scanner_test_v1_descriptors", os.path.join(scanner_dir, "scanner_test_v1.py")
+    )
+
+    assert set(database) == {interface.name for interface in protocol.interface}
+    assert database.protocol("wl_core") == "scanner_test_v1"
+
+    # the interfaces are built the same as the generated classes
+    for name in database:
+        interface = database.get_interface(name)
+        expected = getattr(generated, interface.__name__)
+        assert interface.name == expected.name
+        assert interface.version == expected.version
+        for kind in ("requests", "events"):
+            assert [
+                _message_descriptor(message) for message in getattr(interface, kind)
+            ] == [_message_descriptor(message) for message in getattr(expected, kind)]
+        assert interface.proxy_class.interface is interface
+        assert interface.resource_class.interface is interface
+        assert interface.global_class.interface is interface
+
+    # referenced interfaces are built once
+    wl_core = database.get_interface("wl_core")
+    wl_requests = database.get_interface("wl_requests")
+    assert wl_requests.requests[2].arguments[0].interface is wl_core
+
+    assert [(e.name, e.value) for e in wl_core.the_enum] == [
+        (e.name, e.value) for e in generated.WlCore.the_enum
+    ]
+
+    # the methods marshal the arguments as the generated methods do
+    calls = []
+    proxy = SimpleNamespace(
+        _marshal=lambda *args: calls.append(("marshal", *args)),
+        _marshal_constructor=lambda *args: calls.append(("constructor", *args)),
+        _destroy=lambda: calls.append(("destroy",)),
+    )
+    wl_requests.proxy_class.no_args(proxy)
+    wl_requests.proxy_class.create_id(proxy)
+    wl_requests.proxy_class.new_id_no_interface(proxy, 3, wl_core, 1)
+    database.get_interface("wl_destructor").proxy_class.destroy(proxy)
+    assert calls == [
+        ("marshal", 1),
+        ("constructor", 2, wl_core),
+        ("constructor", 7, wl_core, 3, "wl_core", 1),
+        ("marshal", 1),
+        ("destroy",),
+    ]
+
+
+def test_output_cache():
+    protocol = Protocol.parse_file(input_file)
+
+    imports = {interface.name: protocol.name for interface in protocol.interface}
+    digest = input_digest(input_file, imports, [])
+
+    # the inputs include the options and the protocols of the interfaces
+    assert input_digest(input_file, imports, ["strip_docs"]) != digest
+    assert input_digest(input_file, {**imports, "wl_core": "other"}, []) != digest
+    assert input_digest(input_file, {**imports, "wl_unused": "other"}, []) == digest
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        outputs = ["scanner_test_v1.py", "scanner_test_v1_docs.json"]
+        for output in outputs:
+            open(os.path.join(output_dir, output), "w").close()
+
+        cache = OutputCache(output_dir)
+        assert not cache.is_current(protocol.name, digest, outputs)
+
+        cache.update(protocol.name, digest, outputs, ["wl_core"])
+        cache.save()
+
+        cache = OutputCache(output_dir)
+        assert cache.is_current(protocol.name, digest, outputs)
+        assert cache.interfaces() == {"wl_core": protocol.name}
+        assert not cache.is_current(protocol.name, "changed", outputs)
+        # the protocol is generated again if the outputs are different
+        assert not cache.is_current(protocol.name, digest, outputs[:1])
+        assert not cache.is_current(protocol.name, digest, [*outputs, "other.c"])
+
+        # the outputs that are no longer generated are removed
+        cache.update(protocol.name, digest, outputs[:1], ["wl_core"])
+        assert sorted(os.listdir(output_dir)) == [
+            ".pywayland-scanner-cache.json",
+            *outputs[:1],
+        ]
+
+        cache.remove_unused([protocol.name])
+        assert cache.is_current(protocol.name, digest, outputs[:1])
+
+        cache.remove_unused([])
+        assert os.listdir(output_dir) == [".pywayland-scanner-cache.json"]
+        assert not cache.is_current(protocol.name, digest, [])
+        assert cache.interfaces() == {}
+
+
+EXTRA_PROTOCOL = """<?xml version="1.0" encoding="UTF-8"?>
+<protocol name="scanner_extra">
+  <interface name="wl_extra" version="1">
+    <request name="destroy" type="destructor"/>
+  </interface>
+</protocol>
+"""
+
+
+def test_scanner_keeps_earlier_protocols():
+    def scan(*args):
+        subprocess.check_call(
+            [sys.executable, "-m", "pywayland.scanner", "-o", package_dir, *args]
+        )
+
+    def index():
+        namespace = {}
+        with open(os.path.join(package_dir, "__init__.py")) as f:
+            exec(f.read(), namespace)
+        return namespace["INTERFACES"]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        extra_file = os.path.join(output_dir, "scanner-extra.xml")
+        with open(extra_file, "w") as f:
+            f.write(EXTRA_PROTOCOL)
+        package_dir = os.path.join(output_dir, "package")
+
+        scan("-i", input_file, extra_file)
+        assert index()["wl_extra"] == ("scanner_extra", "WlExtra")
+
+        # the protocols of an earlier run are kept, and are still in the index
+        scan("-i", input_file)
+        assert os.path.exists(os.path.join(package_dir, "scanner_extra.py"))
+        assert index()["wl_extra"] == ("scanner_extra", "WlExtra")
+        assert index()["wl_core"] == ("scanner_test_v1", "WlCore")
+
+        # unless they are pruned
+        scan("-i", input_file, "--prune")
+        assert not os.path.exists(os.path.join(package_dir, "scanner_extra.py"))
+        assert "wl_extra" not in index()
+        assert index()["wl_core"] == ("scanner_test_v1", "WlCore")
+
+
+def test_prune_protocols():
+    protocol = Protocol.parse_file(input_file)
+
+    (pruned,) = prune_protocols([protocol], ["wl_events"])
+    assert {interface.name for interface in pruned.interface} == {
+        "wl_core",
+        "wl_events",
+        "wl_requests",
+    }
+
+    (pruned,) = prune_protocols([protocol], ["wl_xfail"])
+    assert [interface.name for interface in pruned.interface] == ["wl_xfail"]
+
+    with pytest.raises(ValueError):
+        prune_protocols([protocol], ["wl_missing"])
@@ -0,0 +1,101 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from pywayland.client import Display, EventQueue
+from pywayland.protocol.wayland import WlSeat
+from pywayland.server import Client
+from pywayland.server import Display as ServerDisplay
+
+
+def _run_server(server, stop):
+    event_loop = server.get_event_loop()
+    while not stop.is_set():
+        event_loop.dispatch(10)
+        server.flush_clients()
+
+
+def test_timeout_stalled_server():
+    # nothing answers on the other end of the socket
+    server_socket, client_socket = socket.socketpair()
+    display = Display(client_socket.detach())
+    display.connect()
+    try:
+        start = time.monotonic()
+        assert display.dispatch(timeout=0.05) == 0
+        assert display._dispatch_timeout(None, 0.05) == 0
+        with pytest.raises(TimeoutError):
+            display.roundtrip(timeout=0.05)
+        assert time.monotonic() - start < 5
+    finally:
+        display.disconnect()
+        server_socket.close()
+
+
+def test_timeout():
+    server = ServerDisplay()
+    seat = WlSeat.global_class(server)
+    seat.bind_func = lambda resource: resource.capabilities(WlSeat.capability.touch)
+
+    server_socket, client_socket = socket.socketpair()
+    client = Client(server, server_socket.detach())  # noqa: F841
+
+    stop = threading.Event()
+    thread = threading.Thread(target=_run_server, args=(server, stop))
+    thread.start()
+
+    display = Display(client_socket.detach())
+    display.connect()
+    try:
+        seats = []
+
+        def handle_global(registry, name, interface, version):
+            if interface == "wl_seat":
+                seats.append(registry.bind(name, WlSeat, version))
+
+        capabilities = []
+
+        def handle_capabilities(seat, value):
+            capabilities.append(value)
+
+        registry = display.get_registry()
+        registry.dispatcher["global"] = handle_global
+        assert display.roundtrip(timeout=5) > 0
+        assert len(seats) == 1
+
+        seats[0].dispatcher["capabilities"] = handle_capabilities
+        assert display.dispatch(timeout=5) == 1
+        assert capabilities == [WlSeat.capability.touch]
+
+        # the fallback for libwayland without dispatch timeouts
+        seats.clear()
+        registry = display.get_registry()
+        registry.dispatcher["global"] = handle_global
+        assert display._dispatch_timeout(None, 5) == 1
+        assert len(seats) == 1
+
+        # the done event of a roundtrip on a queue is not queued onto the
+        # default queue, which is dispatched by another thread
+        queue = EventQueue(display)
+        stop_dispatch = threading.Event()
+
+        def dispatch_default():
+            while not stop_dispatch.is_set():
+                display.dispatch(timeout=0.01)
+
+        dispatch_thread = threading.Thread(target=dispatch_default)
+        dispatch_thread.start()
+        try:
+            for _ in range(20):
+                assert display.roundtrip(queue=queue, timeout=5) >= 1
+        finally:
+            stop_dispatch.set()
+            dispatch_thread.join()
+            queue.destroy()
+    finally:
+        display.disconnect()
+        stop.set()
+        thread.join()
+        server.destroy()
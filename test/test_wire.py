@@ -0,0 +1,153 @@
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from pywayland.client import Display
+from pywayland.protocol.wayland import (
+    WlCallback,
+    WlDisplay,
+    WlRegistry,
+    WlSeat,
+    WlShm,
+    WlSurface,
+)
+from pywayland.protocol_core import WireCodec
+from pywayland.protocol_core.wire import (
+    HEADER_SIZE,
+    WireFd,
+    decode_arguments,
+    encode_message,
+    scan_headers,
+)
+
+INTERFACES = {iface.name: iface for iface in (WlSeat, WlShm)}
+
+
+def test_encode_decode():
+    attach = WlSurface.requests[1]
+    data, fds = encode_message(5, 1, attach, [7, -2, 3])
+    assert len(data) == HEADER_SIZE + 12
+    assert fds == []
+
+    headers, consumed = scan_headers(data)
+    assert consumed == len(data)
+    assert [(h.object_id, h.opcode, h.size) for h in headers] == [(5, 1, 20)]
+    assert decode_arguments(attach, data[HEADER_SIZE:]) == ([7, -2, 3], 0)
+
+    # strings are null terminated and padded, fds are passed separately
+    create_pool = WlShm.requests[0]
+    data, fds = encode_message(4, 0, create_pool, [6, 9, 4096])
+    assert fds == [9]
+    args, nfds = decode_arguments(create_pool, data[HEADER_SIZE:], fd_index=2)
+    assert args == [6, WireFd(2), 4096]
+    assert nfds == 1
+
+    bind = WlRegistry.requests[0]
+    data, _ = encode_message(2, 0, bind, [1, "wl_seat", 7, 10])
+    assert len(data) == HEADER_SIZE + 4 + 12 + 4 + 4
+    assert decode_arguments(bind, data[HEADER_SIZE:])[0] == [1, "wl_seat", 7, 10]
+
+    with pytest.raises(ValueError):
+        decode_arguments(bind, data[HEADER_SIZE:-4])
+
+
+def test_scan_partial():
+    data = b"".join(
+        encode_message(1, 0, WlDisplay.requests[0], [3 + i])[0] for i in range(3)
+    )
+
+    headers, consumed = scan_headers(data[:-2])
+    assert len(headers) == 2
+    assert consumed == 24
+
+    headers, consumed = scan_headers(data, consumed)
+    assert [h.offset for h in headers] == [24]
+    assert consumed == len(data)
+
+
+def test_codec_connection():
+    client_socket, server_socket = socket.socketpair(
+        socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC
+    )
+    codec = WireCodec(WlDisplay, INTERFACES.__getitem__)
+
+    display = Display(client_socket.detach())
+    display.connect()
+    try:
+        registry = display.get_registry()
+        callback = display.sync()
+        display.flush()
+
+        # the requests are decoded from the raw bytes sent by libwayland
+        data = server_socket.recv(4096)
+        messages, consumed = codec.decode(data, request=True)
+        assert consumed == len(data)
+        assert [(m.object_id, m.name, m.args) for m in messages] == [
+            (1, "wl_display.get_registry", [2]),
+            (1, "wl_display.sync", [3]),
+        ]
+        assert codec.objects[2] is WlRegistry
+        assert codec.objects[3] is WlCallback
+
+        # events encoded by the codec are dispatched by libwayland
+        globals_ = []
+        registry.dispatcher["global"] = lambda registry, *args: globals_.append(args)
+        done = []
+        callback.dispatcher["done"] = lambda callback, data: done.append(data)
+
+        events = [
+            codec.encode(2, 0, [1, "wl_seat", 7], request=False),
+            codec.encode(3, 0, [42], request=False),
+            codec.encode(1, 1, [3], request=False),
+        ]
+        server_socket.sendall(b"".join(data for data, _ in events))
+        assert 3 not in codec.objects
+
+        while not done:
+            display.dispatch(block=True)
+        assert globals_ == [(1, "wl_seat", 7)]
+        assert done == [42]
+
+        # objects bound from the registry get the interface by name
+        registry.bind(1, WlSeat, 7)
+        display.flush()
+        messages, _ = codec.decode(server_socket.recv(4096), request=True)
+        assert messages[0].name == "wl_registry.bind"
+        name, interface, version, new_id = messages[0].args
+        assert (name, interface, version) == (1, "wl_seat", 7)
+        assert codec.objects[new_id] is WlSeat
+    finally:
+        display.disconnect()
+        server_socket.close()
+
+
+def test_codec_unknown_interface():
+    codec = WireCodec(WlDisplay, INTERFACES.__getitem__)
+    data = b"".join(
+        [
+            encode_message(1, 1, WlDisplay.requests[1], [2])[0],
+            encode_message(2, 0, WlRegistry.requests[0], [1, "wl_unknown", 1, 3])[0],
+        ]
+    )
+
+    with pytest.raises(ValueError, match="wl_unknown"):
+        codec.decode(data, request=True)
+    assert codec.objects[2] is WlRegistry
+    assert 3 not in codec.objects
+
+
+def test_protocol_core_lazy_import():
+    # the wire codec, descriptors and docs are imported on first use, and the
+    # protocol modules do not import the scanner
+    code = """
+import sys
+import pywayland.protocol.wayland
+for name in ("wire", "descriptors", "docs"):
+    assert f"pywayland.protocol_core.{name}" not in sys.modules
+assert "pywayland.scanner.protocol" not in sys.modules
+import pywayland.protocol_core
+assert pywayland.protocol_core.WireCodec is sys.modules["pywayland.protocol_core.wire"].WireCodec
+"""
+    subprocess.check_call([sys.executable, "-c", code])